@@ -0,0 +1,99 @@
+import time
+from datetime import timedelta
+from itertools import count as counter
+
+from fastapi.testclient import TestClient
+from sqlalchemy import insert
+
+from benchmarks.common import SEED_CHUNK_SIZE, clear_tables, seed_tasks, summarize
+from core.models import ExecutedTask, ScheduledTask, utc_now
+from core.tasks import scheduler
+from job_scheduler.constants import ResultStatus
+from job_scheduler.database import SessionLocal
+from job_scheduler.main import app
+
+BATCH_SIZE = 100
+
+
+def seed_results(task_slug: str, count: int):
+    now = utc_now()
+    with SessionLocal() as db:
+        task_id = db.query(ScheduledTask.scheduled_task_id).filter(ScheduledTask.slug == task_slug).scalar()
+        for start in range(0, count, SEED_CHUNK_SIZE):
+            rows = [
+                {
+                    "task_id": task_id,
+                    "executed_at": now - timedelta(minutes=start + i),
+                    "status": ResultStatus.Done,
+                    "result": "bench result",
+                }
+                for i in range(min(SEED_CHUNK_SIZE, count - start))
+            ]
+            db.execute(insert(ExecutedTask), rows)
+        db.commit()
+
+
+def measure(request, requests: int) -> list[float]:
+    seconds = []
+    for i in range(requests):
+        started_at = time.perf_counter()
+        response = request(i)
+        seconds.append(time.perf_counter() - started_at)
+        if response.status_code >= 400:
+            raise RuntimeError(f"{response.request.method} {response.request.url} failed: {response.text}")
+    return seconds
+
+
+def bench_api(tasks: int, results: int, requests: int) -> list[dict]:
+    """Measures the latency of every route of `core/api.py` against tables of `tasks` tasks and `results` results.
+
+    The app runs without its lifespan and with a paused scheduler, so only the request path is measured.
+    """
+    clear_tables()
+    slugs = seed_tasks(tasks)
+    polled_slug = slugs[0]
+    seed_results(polled_slug, results)
+
+    client = TestClient(app)
+    scheduler.pause()
+    names = counter()
+    created: list[str] = []
+
+    tasks_cursor = client.get("/tasks?limit=10&include_count=false").json()["next_cursor"]
+    results_cursor = client.get(f"/tasks/{polled_slug}/results?limit=10&include_count=false").json()["next_cursor"]
+
+    def create_task(i):
+        response = client.post("/tasks", json={"name": f"api task {next(names)}", "cron_expression": "*/5 * * * *"})
+        created.append(response.json()["slug"])
+        return response
+
+    batch = [{"name": "api batch task", "cron_expression": "0 * * * *"}] * BATCH_SIZE
+    routes = [
+        ("POST /tasks", create_task),
+        (f"POST /tasks:batch ({BATCH_SIZE} tasks)", lambda i: client.post("/tasks:batch", json={"tasks": batch})),
+        ("GET /tasks", lambda i: client.get("/tasks?skip=0&limit=10")),
+        ("GET /tasks (cursor)", lambda i: client.get(f"/tasks?limit=10&after={tasks_cursor}&include_count=false")),
+        ("GET /tasks/{slug}/results", lambda i: client.get(f"/tasks/{polled_slug}/results?skip=0&limit=10")),
+        (
+            "GET /tasks/{slug}/results (cursor)",
+            lambda i: client.get(f"/tasks/{polled_slug}/results?limit=10&after={results_cursor}"),
+        ),
+        ("GET /tasks/{slug}/results/daily", lambda i: client.get(f"/tasks/{polled_slug}/results/daily")),
+        ("GET /tasks/{slug}/upcoming", lambda i: client.get(f"/tasks/{polled_slug}/upcoming?n=10")),
+        ("GET /schedule/forecast", lambda i: client.get("/schedule/forecast")),
+        ("GET /scheduler/stats", lambda i: client.get("/scheduler/stats")),
+        ("DELETE /tasks/{slug}", lambda i: client.delete(f"/tasks/{created[i]}")),
+    ]
+
+    measurements = []
+    try:
+        for route, request in routes:
+            seconds = measure(request, requests)
+            measurements.append({"route": route, "requests": requests, **summarize(seconds)})
+            print(f"api: {route} p50 {measurements[-1]['p50_ms']}ms p99 {measurements[-1]['p99_ms']}ms")
+    finally:
+        scheduler.remove_all_jobs()
+        scheduler.resume()
+        clear_tables()
+
+    return measurements
@@ -0,0 +1,94 @@
+import time
+from contextlib import contextmanager
+
+from sqlalchemy import delete, event, insert
+
+from core.cron import get_cron_trigger
+from core.models import (
+    Base,
+    ExecutedTask,
+    ExecutedTaskRollup,
+    ScheduledTask,
+    generate_slug,
+    utc_now,
+)
+from job_scheduler.database import SessionLocal, engine
+
+SEED_CHUNK_SIZE = 10_000
+CRON_EXPRESSIONS = ("*/5 * * * *", "0 * * * *", "30 2 * * *", "*/15 9-17 * * 1-5")
+
+
+def percentile(values: list[float], percent: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(percent / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(seconds: list[float]) -> dict:
+    return {
+        "p50_ms": round(percentile(seconds, 50) * 1000, 3),
+        "p99_ms": round(percentile(seconds, 99) * 1000, 3),
+        "max_ms": round(max(seconds) * 1000, 3),
+    }
+
+
+def create_tables():
+    Base.metadata.create_all(bind=engine)
+
+
+def clear_tables():
+    with SessionLocal() as db:
+        for model in (ExecutedTaskRollup, ExecutedTask, ScheduledTask):
+            db.execute(delete(model))
+        db.commit()
+
+
+def seed_tasks(count: int) -> list[str]:
+    """Bulk inserts `count` tasks spread over a few cron expressions and returns their slugs."""
+    slugs = []
+    now = utc_now()
+    next_runs = {
+        expression: get_cron_trigger(expression).get_next_fire_time(None, now) for expression in CRON_EXPRESSIONS
+    }
+    with SessionLocal() as db:
+        for start in range(0, count, SEED_CHUNK_SIZE):
+            rows = [
+                {
+                    "slug": generate_slug(),
+                    "name": f"bench task {start + i}",
+                    "cron_expression": CRON_EXPRESSIONS[(start + i) % len(CRON_EXPRESSIONS)],
+                    "created_at": now,
+                    "updated_at": now,
+                    "next_run_at": next_runs[CRON_EXPRESSIONS[(start + i) % len(CRON_EXPRESSIONS)]],
+                }
+                for i in range(min(SEED_CHUNK_SIZE, count - start))
+            ]
+            db.execute(insert(ScheduledTask), rows)
+            db.commit()
+            slugs.extend(row["slug"] for row in rows)
+    return slugs
+
+
+@contextmanager
+def count_checkouts():
+    """Counts the connections checked out of the engine's pool inside the block."""
+    checkouts = {"count": 0}
+
+    def on_checkout(*args):
+        checkouts["count"] += 1
+
+    event.listen(engine, "checkout", on_checkout)
+    try:
+        yield checkouts
+    finally:
+        event.remove(engine, "checkout", on_checkout)
+
+
+@contextmanager
+def timer():
+    elapsed = {"seconds": 0.0}
+    started_at = time.perf_counter()
+    try:
+        yield elapsed
+    finally:
+        elapsed["seconds"] = time.perf_counter() - started_at
@@ -0,0 +1,37 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def configure(db_url: str | None, redis_url: str | None, workdir: str | None = None) -> str:
+    """Points the app at the benchmark stand-ins. Must run before any `core` or `job_scheduler` import.
+
+    Without `db_url` the `local` phase is used, whose SQLite file is created in `workdir` (a temporary
+    directory by default) so the benchmark never touches `./test.db`. Without `redis_url` Redis is replaced
+    by fakeredis. Returns the directory the benchmark runs in.
+    """
+    sys.path.insert(0, str(ROOT))
+
+    workdir = workdir or tempfile.mkdtemp(prefix="job-scheduler-bench-")
+    os.chdir(workdir)
+
+    os.environ["PHASE"] = "production" if db_url else "local"
+    os.environ["DB_URL"] = db_url or "sqlite:///./test.db"
+    os.environ["REDIS_URL"] = redis_url or "redis://localhost:6379/0"
+
+    if redis_url is None:
+        import fakeredis
+
+        import job_scheduler.redis_client as redis_module
+
+        redis_module.redis_client = fakeredis.FakeRedis()
+
+    import logging
+
+    from job_scheduler.logger import logger
+
+    logger.setLevel(logging.WARNING)
+    return workdir
@@ -0,0 +1,69 @@
+import threading
+import time
+from datetime import timedelta
+
+from apscheduler.triggers.date import DateTrigger
+
+from benchmarks.common import clear_tables, count_checkouts, seed_tasks, summarize
+from core.models import utc_now
+from core.results import result_sink
+from core.tasks import run_task, scheduler
+from job_scheduler.config import settings
+
+# Seconds allowed per added job before the common fire time, so every job is added before it fires
+ADD_BUDGET_PER_JOB = 0.0002
+FIRE_TIMEOUT = 600
+
+lags: list[float] = []
+fired = threading.Semaphore(0)
+
+
+def timed_run_task(task_slug: str, fire_at: float):
+    lags.append(time.time() - fire_at)
+    try:
+        run_task(task_slug)
+    finally:
+        fired.release()
+
+
+def bench_fire_lag(counts: list[int]) -> list[dict]:
+    """Fires `count` tasks at the same instant and measures how late `run_task` starts for each of them.
+
+    DB connections checked out per fire include the amortized result sink flushes.
+    """
+    results = []
+    for count in counts:
+        clear_tables()
+        slugs = seed_tasks(count)
+        lags.clear()
+
+        fire_time = utc_now() + timedelta(seconds=2 + count * ADD_BUDGET_PER_JOB)
+        with count_checkouts() as checkouts:
+            for slug in slugs:
+                scheduler.add_job(
+                    timed_run_task,
+                    trigger=DateTrigger(fire_time),
+                    args=[slug, fire_time.timestamp()],
+                    id=slug,
+                    misfire_grace_time=None,
+                )
+            if utc_now() >= fire_time:
+                print(f"fire lag: adding {count} jobs took past the fire time, lags include the overrun")
+
+            for _ in range(count):
+                if not fired.acquire(timeout=FIRE_TIMEOUT):
+                    raise TimeoutError(f"{count} fires did not complete within {FIRE_TIMEOUT}s")
+            result_sink.flush()
+
+        results.append(
+            {
+                "fires": count,
+                "max_workers": settings.scheduler_max_workers,
+                **summarize(lags),
+                "db_checkouts_per_fire": round(checkouts["count"] / count, 3),
+            }
+        )
+        print(f"fire lag: {count} fires, p99 {results[-1]['p99_ms']}ms")
+
+    clear_tables()
+    return results
@@ -0,0 +1,37 @@
+from benchmarks.common import clear_tables, seed_tasks, timer
+from core.recovery import recover_scheduled_tasks
+from core.tasks import scheduler
+
+
+def bench_recovery(sizes: list[int]) -> list[dict]:
+    """Times `recover_scheduled_tasks` on growing tables; rows are added on top of the previous size."""
+    clear_tables()
+    scheduler.pause()
+    results = []
+    seeded = 0
+
+    try:
+        for size in sorted(sizes):
+            seed_tasks(size - seeded)
+            seeded = size
+
+            scheduler.remove_all_jobs()
+            with timer() as elapsed:
+                recover_scheduled_tasks()
+
+            jobs = len(scheduler.get_jobs())
+            results.append(
+                {
+                    "tasks": size,
+                    "jobs": jobs,
+                    "seconds": round(elapsed["seconds"], 3),
+                    "tasks_per_second": round(size / elapsed["seconds"]),
+                }
+            )
+            print(f"recovery: {size} tasks in {elapsed['seconds']:.2f}s")
+    finally:
+        scheduler.remove_all_jobs()
+        scheduler.resume()
+        clear_tables()
+
+    return results
@@ -0,0 +1,83 @@
+"""Runs the benchmark suite and writes its results as JSON.
+
+    python -m benchmarks.run --output bench.json
+    python -m benchmarks.run --only recovery --recovery-sizes 10000 100000 1000000
+
+By default everything runs offline on SQLite and fakeredis; pass `--db-url` (e.g. a local PostgreSQL
+container) and `--redis-url` to measure against real services.
+"""
+
+import argparse
+import json
+import platform
+import subprocess
+from datetime import datetime, timezone
+from pathlib import Path
+
+from benchmarks.environment import ROOT, configure
+
+SUITES = ("recovery", "fire_lag", "api")
+
+
+def get_commit() -> str | None:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], cwd=ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", default="bench.json", help="JSON file the results are written to")
+    parser.add_argument("--only", nargs="+", choices=SUITES, default=list(SUITES))
+    parser.add_argument("--db-url", help="SQLAlchemy URL of the database (default: SQLite in a temporary dir)")
+    parser.add_argument("--redis-url", help="URL of a Redis server (default: fakeredis)")
+    parser.add_argument("--recovery-sizes", nargs="+", type=int, default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--fire-counts", nargs="+", type=int, default=[1_000, 10_000, 50_000])
+    parser.add_argument("--api-tasks", type=int, default=100_000, help="Tasks in the table during API runs")
+    parser.add_argument("--api-results", type=int, default=10_000, help="Results of the polled task")
+    parser.add_argument("--api-requests", type=int, default=200, help="Requests measured per route")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    output = Path(args.output).resolve()
+    workdir = configure(args.db_url, args.redis_url)
+
+    from benchmarks.common import create_tables
+
+    create_tables()
+    report = {
+        "metadata": {
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "commit": get_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "database": args.db_url or "sqlite",
+            "redis": "redis" if args.redis_url else "fakeredis",
+            "workdir": workdir,
+        }
+    }
+
+    if "recovery" in args.only:
+        from benchmarks.recovery import bench_recovery
+
+        report["recovery"] = bench_recovery(args.recovery_sizes)
+
+    if "fire_lag" in args.only:
+        from benchmarks.fire_lag import bench_fire_lag
+
+        report["fire_lag"] = bench_fire_lag(args.fire_counts)
+
+    if "api" in args.only:
+        from benchmarks.api_latency import bench_api
+
+        report["api"] = bench_api(args.api_tasks, args.api_results, args.api_requests)
+
+    output.write_text(json.dumps(report, indent=2))
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,38 @@
+from datetime import datetime
+
 from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
 
 from core.schemas import (
+    DailyTaskResults,
     PaginatedExecutedTasks,
     PaginatedScheduledTasks,
     ScheduledTaskRead,
+    ScheduleForecast,
+    SchedulerStats,
+    TaskBatchCreate,
+    TaskBatchResult,
+    TaskBulkResult,
     TaskCreate,
+    TaskSelection,
+    TaskUpcoming,
+)
+from core.services import (
+    create_task,
+    create_tasks,
+    delete_task,
+    delete_tasks,
+    export_task_results,
+    get_schedule_forecast,
+    get_scheduler_stats,
+    get_task_upcoming,
+    list_task_daily_results,
+    list_task_results,
+    list_tasks,
+    pause_tasks,
+    resume_tasks,
 )
-from core.services import create_task, delete_task, list_task_results, list_tasks
+from job_scheduler.constants import ExportFormat
 from job_scheduler.dependencies import get_db
 
 router = APIRouter()
@@ -21,9 +46,35 @@ def create_task_api(task_data: TaskCreate, db: Session = Depends(get_db)):
     )
 
 
+@router.post("/tasks:batch", response_model=TaskBatchResult)
+def create_tasks_api(batch: TaskBatchCreate, db: Session = Depends(get_db)):
+    return create_tasks(db=db, items=batch.tasks)
+
+
+@router.post("/tasks:pause", response_model=TaskBulkResult)
+def pause_tasks_api(selection: TaskSelection, db: Session = Depends(get_db)):
+    return pause_tasks(db=db, selection=selection)
+
+
+@router.post("/tasks:resume", response_model=TaskBulkResult)
+def resume_tasks_api(selection: TaskSelection, db: Session = Depends(get_db)):
+    return resume_tasks(db=db, selection=selection)
+
+
+@router.post("/tasks:delete", response_model=TaskBulkResult)
+def delete_tasks_api(selection: TaskSelection, db: Session = Depends(get_db)):
+    return delete_tasks(db=db, selection=selection)
+
+
 @router.get("/tasks", response_model=PaginatedScheduledTasks)
-def list_tasks_api(db: Session = Depends(get_db), skip: int = Query(0, ge=0), limit: int = Query(10, le=100)):
-    return list_tasks(db=db, skip=skip, limit=limit)
+def list_tasks_api(
+    db: Session = Depends(get_db),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(10, le=100),
+    after: str | None = Query(None),
+    include_count: bool = Query(True),
+):
+    return list_tasks(db=db, skip=skip, limit=limit, after=after, include_count=include_count)
 
 
 @router.delete("/tasks/{task_slug}")
@@ -33,6 +84,56 @@ def delete_task_api(task_slug: str, db: Session = Depends(get_db)):
 
 @router.get("/tasks/{task_slug}/results", response_model=PaginatedExecutedTasks)
 def list_task_results_api(
-    task_slug: str, db: Session = Depends(get_db), skip: int = Query(0, ge=0), limit: int = Query(10, le=100)
+    task_slug: str,
+    db: Session = Depends(get_db),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(10, le=100),
+    after: str | None = Query(None),
+    include_count: bool = Query(True),
+):
+    return list_task_results(
+        db=db, task_slug=task_slug, skip=skip, limit=limit, after=after, include_count=include_count
+    )
+
+
+@router.get("/tasks/{task_slug}/results/export")
+def export_task_results_api(
+    task_slug: str,
+    db: Session = Depends(get_db),
+    format: ExportFormat = Query(ExportFormat.NDJSON),
+    since: datetime | None = Query(None),
+    until: datetime | None = Query(None),
+    gzip: bool = Query(False),
 ):
-    return list_task_results(db=db, task_slug=task_slug, skip=skip, limit=limit)
+    return export_task_results(
+        db=db, task_slug=task_slug, export_format=format, since=since, until=until, compress=gzip
+    )
+
+
+@router.get("/tasks/{task_slug}/results/daily", response_model=list[DailyTaskResults])
+def list_task_daily_results_api(
+    task_slug: str,
+    db: Session = Depends(get_db),
+    days: int = Query(30, ge=1, le=366),
+):
+    return list_task_daily_results(db=db, task_slug=task_slug, days=days)
+
+
+@router.get("/tasks/{task_slug}/upcoming", response_model=TaskUpcoming)
+def get_task_upcoming_api(task_slug: str, db: Session = Depends(get_db), n: int = Query(10, ge=1, le=100)):
+    return get_task_upcoming(db=db, task_slug=task_slug, n=n)
+
+
+@router.get("/schedule/forecast", response_model=ScheduleForecast)
+def get_schedule_forecast_api(
+    db: Session = Depends(get_db),
+    start: datetime | None = Query(None, alias="from"),
+    end: datetime | None = Query(None, alias="to"),
+    bucket: int = Query(60, ge=1),
+):
+    return get_schedule_forecast(db=db, start=start, end=end, bucket=bucket)
+
+
+@router.get("/scheduler/stats", response_model=SchedulerStats)
+def scheduler_stats_api():
+    return get_scheduler_stats()
@@ -0,0 +1,65 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.async_services import (
+    create_task,
+    create_tasks,
+    delete_task,
+    list_task_results,
+    list_tasks,
+)
+from core.schemas import (
+    PaginatedExecutedTasks,
+    PaginatedScheduledTasks,
+    ScheduledTaskRead,
+    TaskBatchCreate,
+    TaskBatchResult,
+    TaskCreate,
+)
+from job_scheduler.dependencies import get_async_db
+
+# Async versions of the routes in `core.api`; routes without an async version are served by the sync router
+router = APIRouter()
+
+
+@router.post("/tasks", response_model=ScheduledTaskRead)
+async def create_task_api(task_data: TaskCreate, db: AsyncSession = Depends(get_async_db)):
+    return await create_task(
+        db=db,
+        task_data=task_data,
+    )
+
+
+@router.post("/tasks:batch", response_model=TaskBatchResult)
+async def create_tasks_api(batch: TaskBatchCreate, db: AsyncSession = Depends(get_async_db)):
+    return await create_tasks(db=db, items=batch.tasks)
+
+
+@router.get("/tasks", response_model=PaginatedScheduledTasks)
+async def list_tasks_api(
+    db: AsyncSession = Depends(get_async_db),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(10, le=100),
+    after: str | None = Query(None),
+    include_count: bool = Query(True),
+):
+    return await list_tasks(db=db, skip=skip, limit=limit, after=after, include_count=include_count)
+
+
+@router.delete("/tasks/{task_slug}")
+async def delete_task_api(task_slug: str, db: AsyncSession = Depends(get_async_db)):
+    return await delete_task(db=db, task_slug=task_slug)
+
+
+@router.get("/tasks/{task_slug}/results", response_model=PaginatedExecutedTasks)
+async def list_task_results_api(
+    task_slug: str,
+    db: AsyncSession = Depends(get_async_db),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(10, le=100),
+    after: str | None = Query(None),
+    include_count: bool = Query(True),
+):
+    return await list_task_results(
+        db=db, task_slug=task_slug, skip=skip, limit=limit, after=after, include_count=include_count
+    )
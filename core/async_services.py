@@ -0,0 +1,186 @@
+from uuid import UUID
+
+from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.counters import (
+    get_result_count,
+    get_task_count,
+    increment_task_count,
+    remove_result_counts,
+    set_result_count,
+    set_task_count,
+)
+from core.models import ExecutedTask, ScheduledTask
+from core.pagination import get_next_cursor, page_statement
+from core.results_cache import (
+    get_cached_page,
+    invalidate_pages,
+    is_cacheable,
+    store_page,
+)
+from core.schemas import (
+    PaginatedExecutedTasks,
+    PaginatedScheduledTasks,
+    ScheduledTaskRead,
+    TaskBatchResult,
+    TaskCreate,
+)
+from core.services import build_tasks, get_history_deletes, get_task_rows
+from core.slug_cache import slug_cache
+from core.tasks import remove_task, remove_tasks, schedule_task, schedule_tasks
+from job_scheduler.exceptions import (
+    TaskCreationFailed,
+    TaskDeletionFailed,
+    TaskNotFound,
+)
+from job_scheduler.logger import logger
+
+
+def forget_task(task_slug: str, task_id: UUID):
+    """Drops the counters and cached entries of a deleted task."""
+    increment_task_count(-1)
+    remove_result_counts(task_id)
+    invalidate_pages([task_slug])
+    slug_cache.invalidate(task_slug)
+
+
+async def get_task_by_slug(db: AsyncSession, task_slug: str) -> ScheduledTask | None:
+    return await db.scalar(select(ScheduledTask).where(ScheduledTask.slug == task_slug))
+
+
+async def create_task(db: AsyncSession, task_data: TaskCreate):
+    try:
+        task = ScheduledTask(**task_data.model_dump())
+
+        db.add(task)
+        await db.flush()
+        await db.refresh(task)
+
+        await run_in_threadpool(schedule_task, task)
+
+        await db.commit()
+        await run_in_threadpool(increment_task_count, 1)
+
+        logger.info(f"Created and scheduled task {task.slug} ({task.name})")
+        return task
+
+    except Exception as e:
+        await db.rollback()
+        logger.error(f"Failed to create/schedule task: {e}")
+        raise TaskCreationFailed()
+
+
+async def create_tasks(db: AsyncSession, items: list[dict]):
+    tasks, errors = build_tasks(items)
+
+    if not tasks:
+        return TaskBatchResult(created=[], errors=errors)
+
+    try:
+        await run_in_threadpool(schedule_tasks, tasks)
+
+        await db.execute(insert(ScheduledTask), get_task_rows(tasks))
+        await db.commit()
+        await run_in_threadpool(increment_task_count, len(tasks))
+
+        logger.info(f"Created and scheduled {len(tasks)} tasks ({len(errors)} rejected)")
+        return TaskBatchResult(created=[ScheduledTaskRead.model_validate(task) for task in tasks], errors=errors)
+
+    except Exception as e:
+        await db.rollback()
+        await run_in_threadpool(remove_tasks, [task.slug for task in tasks])
+        logger.error(f"Failed to create/schedule task batch: {e}")
+        raise TaskCreationFailed()
+
+
+async def count_tasks(db: AsyncSession) -> int:
+    count = await run_in_threadpool(get_task_count)
+    if count is None:
+        count = await db.scalar(select(func.count()).select_from(ScheduledTask))
+        await run_in_threadpool(set_task_count, count)
+    return count
+
+
+async def count_task_results(db: AsyncSession, task_id: UUID) -> int:
+    count = await run_in_threadpool(get_result_count, task_id)
+    if count is None:
+        count = await db.scalar(select(func.count()).select_from(ExecutedTask).where(ExecutedTask.task_id == task_id))
+        await run_in_threadpool(set_result_count, task_id, count)
+    return count
+
+
+async def resolve_task_id(db: AsyncSession, task_slug: str) -> UUID:
+    task_id = slug_cache.get(task_slug)
+    if task_id is None:
+        task_id = await db.scalar(select(ScheduledTask.scheduled_task_id).where(ScheduledTask.slug == task_slug))
+        if task_id is None:
+            raise TaskNotFound()
+        slug_cache.set(task_slug, task_id)
+    return task_id
+
+
+async def list_tasks(db: AsyncSession, skip: int, limit: int, after: str | None = None, include_count: bool = True):
+    logger.info("Listing all tasks")
+    position, row_id = ScheduledTask.created_at, ScheduledTask.scheduled_task_id
+    statement = page_statement(select(ScheduledTask), position, row_id, skip=skip, limit=limit, after=after)
+    tasks = (await db.scalars(statement)).all()
+
+    count = await count_tasks(db) if include_count else None
+
+    return PaginatedScheduledTasks(
+        count=count, result=tasks, next_cursor=get_next_cursor(tasks, position, row_id, limit)
+    )
+
+
+async def delete_task(db: AsyncSession, task_slug: str):
+    try:
+        task = await get_task_by_slug(db=db, task_slug=task_slug)
+        if not task:
+            raise TaskNotFound()
+
+        await run_in_threadpool(remove_task, task_slug)
+
+        for statement in get_history_deletes([task.scheduled_task_id]):
+            await db.execute(statement)
+        await db.delete(task)
+        await db.commit()
+        await run_in_threadpool(forget_task, task_slug, task.scheduled_task_id)
+
+        logger.info(f"Deleted task {task_slug} from both DB and scheduler")
+        return {"message": f"Task {task_slug} deleted."}
+    except HTTPException:
+        raise
+    except Exception as e:
+        await db.rollback()
+        logger.error(f"Failed to delete task {task_slug}: {e}")
+        raise TaskDeletionFailed()
+
+
+async def list_task_results(
+    db: AsyncSession, task_slug: str, skip: int, limit: int, after: str | None = None, include_count: bool = True
+):
+    version = None
+    if is_cacheable(skip, after):
+        page, version = await run_in_threadpool(get_cached_page, task_slug, skip, limit, include_count)
+        if page is not None:
+            return page
+
+    task_id = await resolve_task_id(db, task_slug)
+
+    logger.info(f"Listing (Task {task_slug})'s results")
+    position, row_id = ExecutedTask.executed_at, ExecutedTask.executed_task_id
+    results_query = select(ExecutedTask).where(ExecutedTask.task_id == task_id)
+    statement = page_statement(results_query, position, row_id, skip=skip, limit=limit, after=after)
+    results = (await db.scalars(statement)).all()
+
+    count = await count_task_results(db, task_id) if include_count else None
+
+    page = PaginatedExecutedTasks(
+        count=count, result=results, next_cursor=get_next_cursor(results, position, row_id, limit)
+    )
+    if version is not None:
+        await run_in_threadpool(store_page, task_slug, version, skip, limit, include_count, page)
+    return page
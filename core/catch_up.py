@@ -0,0 +1,161 @@
+import time
+from bisect import bisect_left
+from collections import Counter, defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+from apscheduler.triggers.base import BaseTrigger
+from sqlalchemy import Row, select
+
+from core.claims import claim_batcher, get_claim_key
+from core.cron import get_offset_trigger
+from core.dispatch import Fire
+from core.models import ScheduledTask, utc_now
+from core.results import result_sink
+from core.sharding import replica_membership
+from core.tasks import (
+    fire_dispatcher,
+    get_result_for_error,
+    get_task_offset,
+    get_task_priority,
+)
+from job_scheduler.config import settings
+from job_scheduler.constants import PastTaskPolicy, ResultStatus
+from job_scheduler.database import SessionLocal
+from job_scheduler.logger import logger
+
+# Span before the catch-up time the missed fires are first looked for in
+FIRST_LOOKBACK = timedelta(minutes=1)
+
+
+def as_utc(value: datetime) -> datetime:
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def list_fire_times(trigger: BaseTrigger, since: datetime, until: datetime, limit: int) -> list[datetime]:
+    fire_times = deque(maxlen=limit)
+    fire_time = trigger.get_next_fire_time(None, since)
+    while fire_time is not None and fire_time <= until:
+        fire_times.append(fire_time)
+        fire_time = trigger.get_next_fire_time(fire_time, fire_time + timedelta(microseconds=1))
+    return list(fire_times)
+
+
+def get_missed_fire_times(trigger: BaseTrigger, since: datetime, until: datetime, limit: int) -> list[datetime]:
+    """Returns the latest `limit` fire times of `trigger` from `since` to `until`, both included.
+
+    Fires are listed back from `until` over a lookback doubled until it holds `limit` fires or reaches `since`, so
+    a long outage costs about the `limit` latest fires instead of every fire missed since `since`.
+    """
+    lookback = FIRST_LOOKBACK
+    while True:
+        start = max(since, until - lookback)
+        fire_times = list_fire_times(trigger, start, until, limit)
+        if len(fire_times) >= limit or start == since:
+            return fire_times
+        lookback *= 2
+
+
+def apply_missed_fire(task: Row, fire_time: datetime, policy: PastTaskPolicy, next_run_at: datetime | None):
+    """Records a claimed missed fire as failed, or runs it like a regular fire.
+
+    A run goes through the dispatcher like a scheduled fire, so the task's handler runs in a dispatcher slot and
+    its result is written by the result sink.
+    """
+    if policy == PastTaskPolicy.Fail:
+        result = get_result_for_error(f"Missed fire at {fire_time} while the scheduler was down")
+        result_sink.add(
+            task.scheduled_task_id, ResultStatus.Failed, result, next_run_at=next_run_at, task_slug=task.slug
+        )
+        return
+
+    fire_dispatcher.dispatch(
+        Fire(task.slug, task.scheduled_task_id, get_task_priority(task), fire_time, time.monotonic())
+    )
+
+
+def catch_up_cron_expression(
+    cron_expression: str, tasks: list[Row], until: datetime, policy: PastTaskPolicy, offset: int = 0
+) -> int:
+    """Applies `policy` to the missed fires of tasks sharing `cron_expression` and jitter `offset`; returns the
+    fires applied.
+
+    Fire times are listed once for the whole group. Each fire is claimed like a regular run, so a fire
+    already run by the scheduler or by another replica is not applied twice. Fires are claimed and their
+    results written one flush at a time, which bounds the load a long outage puts on the database.
+    """
+    trigger = get_offset_trigger(cron_expression, offset)
+    since = min(as_utc(task.next_run_at) for task in tasks)
+    fire_times = get_missed_fire_times(trigger, since, until, settings.catch_up_max_fires)
+    next_run_at = trigger.get_next_fire_time(None, until + timedelta(microseconds=1))
+
+    fires = []
+    for task in tasks:
+        task_fire_times = fire_times[bisect_left(fire_times, as_utc(task.next_run_at)) :]
+        if policy == PastTaskPolicy.RunOnce:
+            task_fire_times = task_fire_times[-1:]
+        fires.extend((task, fire_time) for fire_time in task_fire_times)
+
+    applied = 0
+    for start in range(0, len(fires), settings.result_flush_size):
+        chunk = fires[start : start + settings.result_flush_size]
+        claimed = claim_batcher.claim_many([get_claim_key(task.slug, fire_time) for task, fire_time in chunk])
+
+        for (task, fire_time), is_claimed in zip(chunk, claimed):
+            if is_claimed:
+                apply_missed_fire(task, fire_time, policy, next_run_at)
+                applied += 1
+        result_sink.flush()
+
+    return applied
+
+
+def catch_up_missed_fires(until: datetime | None = None):
+    """Applies the `RECOVER_PAST_TASKS` policy to the fires missed by the tasks this replica owns."""
+    policy = settings.recover_past_tasks
+    if policy == PastTaskPolicy.Skip:
+        return
+
+    until = until or utc_now()
+    started_at = time.perf_counter()
+    groups: dict[tuple[str, int], list[Row]] = defaultdict(list)
+
+    db = SessionLocal()
+    try:
+        rows = db.execute(
+            select(
+                ScheduledTask.scheduled_task_id,
+                ScheduledTask.slug,
+                ScheduledTask.name,
+                ScheduledTask.cron_expression,
+                ScheduledTask.jitter_seconds,
+                ScheduledTask.priority,
+                ScheduledTask.next_run_at,
+            )
+            .where(ScheduledTask.next_run_at <= until)
+            .execution_options(yield_per=settings.recovery_chunk_size)
+        )
+        for row in rows:
+            if replica_membership.owns(row.slug):
+                groups[row.cron_expression, get_task_offset(row)].append(row)
+    finally:
+        db.close()
+
+    def catch_up(group: tuple[tuple[str, int], list[Row]]) -> Counter:
+        (cron_expression, offset), tasks = group
+        try:
+            return Counter(applied=catch_up_cron_expression(cron_expression, tasks, until, policy, offset))
+        except Exception as e:
+            logger.error(f"Failed to catch up tasks with cron {cron_expression!r}: {e}")
+            return Counter(failed=len(tasks))
+
+    outcomes = Counter()
+    with ThreadPoolExecutor(max_workers=settings.catch_up_workers, thread_name_prefix="catch-up") as pool:
+        for outcome in pool.map(catch_up, groups.items()):
+            outcomes.update(outcome)
+
+    elapsed = time.perf_counter() - started_at
+    logger.info(
+        f"Caught up {outcomes['applied']} missed fires ({policy.value}) of {sum(map(len, groups.values()))} tasks "
+        f"({outcomes['failed']} failed) in {elapsed:.2f}s"
+    )
@@ -0,0 +1,99 @@
+import os
+import threading
+from concurrent.futures import Future
+from datetime import datetime
+
+from job_scheduler.config import settings
+from job_scheduler.logger import logger
+from job_scheduler.redis_client import redis_client
+
+
+def get_claim_key(task_slug: str, fire_time: datetime) -> str:
+    return f"claim:task:{task_slug}:{int(fire_time.timestamp())}"
+
+
+class ClaimBatcher:
+    """Claims task fires with `SET key NX EX`, a single atomic non-blocking call per fire.
+
+    Claims requested within `window` seconds of each other are sent in one pipelined round trip,
+    so the burst of jobs firing in the same second costs one call to Redis instead of one per job.
+    """
+
+    def __init__(self, owner: str, ttl: int, window: float, max_batch: int):
+        self.owner = owner
+        self.ttl = ttl
+        self.window = window
+        self.max_batch = max_batch
+
+        self._lock = threading.Lock()
+        self._pending: list[tuple[str, Future]] = []
+        self._wakeup = threading.Event()
+        self._full = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._pid: int | None = None
+
+    def claim(self, key: str) -> bool:
+        """Returns whether this replica won the claim. Never waits for another replica."""
+        if self.window <= 0:
+            return bool(redis_client.set(key, self.owner, nx=True, ex=self.ttl))
+
+        future = Future()
+        with self._lock:
+            self._pending.append((key, future))
+            if len(self._pending) >= self.max_batch:
+                self._full.set()
+
+        self._start()
+        self._wakeup.set()
+        return future.result()
+
+    def claim_many(self, keys: list[str]) -> list[bool]:
+        pipe = redis_client.pipeline(transaction=False)
+        for key in keys:
+            pipe.set(key, self.owner, nx=True, ex=self.ttl)
+        return [bool(result) for result in pipe.execute()]
+
+    def _start(self):
+        # A forked worker process inherits the thread object but not the running thread
+        if self._thread is not None and self._pid == os.getpid():
+            return
+
+        with self._lock:
+            if self._thread is None or self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._run, name="claim-batcher", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait()
+            self._full.wait(self.window)
+            self._wakeup.clear()
+            self._full.clear()
+            self._flush()
+
+    def _flush(self):
+        with self._lock:
+            batch, self._pending = self._pending, []
+
+        if not batch:
+            return
+
+        try:
+            results = self.claim_many([key for key, _ in batch])
+        except Exception as e:
+            logger.error(f"Failed to claim {len(batch)} task fires: {e}")
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
+
+
+claim_batcher = ClaimBatcher(
+    owner=settings.replica_id,
+    ttl=settings.claim_ttl,
+    window=settings.claim_batch_window,
+    max_batch=settings.claim_batch_max_size,
+)
@@ -0,0 +1,139 @@
+from collections import Counter
+from uuid import UUID
+
+from redis import RedisError
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from core.models import ExecutedTask, ScheduledTask
+from job_scheduler.config import settings
+from job_scheduler.database import SessionLocal
+from job_scheduler.logger import logger
+from job_scheduler.redis_client import redis_client
+
+TASK_COUNT_KEY = "counters:tasks"
+RESULT_COUNTS_KEY = "counters:task-results"
+
+# Counters are only moved once initialized, a missing counter is counted in the database on its first read
+_increment_task_count = redis_client.register_script(
+    "if redis.call('EXISTS', KEYS[1]) == 1 then return redis.call('INCRBY', KEYS[1], ARGV[1]) end"
+)
+_increment_result_counts = redis_client.register_script(
+    "for i = 1, #ARGV, 2 do "
+    "if redis.call('HEXISTS', KEYS[1], ARGV[i]) == 1 then redis.call('HINCRBY', KEYS[1], ARGV[i], ARGV[i + 1]) end "
+    "end"
+)
+
+
+def get_task_count() -> int | None:
+    """Returns the maintained number of tasks, or None when it is not initialized or Redis is unavailable."""
+    try:
+        count = redis_client.get(TASK_COUNT_KEY)
+    except RedisError as e:
+        logger.warning(f"Failed to read the task count: {e}")
+        return None
+    return int(count) if count is not None else None
+
+
+def set_task_count(count: int):
+    try:
+        redis_client.set(TASK_COUNT_KEY, count, nx=True)
+    except RedisError as e:
+        logger.warning(f"Failed to initialize the task count: {e}")
+
+
+def increment_task_count(amount: int):
+    try:
+        _increment_task_count(keys=[TASK_COUNT_KEY], args=[amount])
+    except RedisError as e:
+        logger.warning(f"Failed to update the task count by {amount}: {e}")
+
+
+def get_result_count(task_id: UUID) -> int | None:
+    try:
+        count = redis_client.hget(RESULT_COUNTS_KEY, str(task_id))
+    except RedisError as e:
+        logger.warning(f"Failed to read the result count of task {task_id}: {e}")
+        return None
+    return int(count) if count is not None else None
+
+
+def set_result_count(task_id: UUID, count: int):
+    try:
+        redis_client.hsetnx(RESULT_COUNTS_KEY, str(task_id), count)
+    except RedisError as e:
+        logger.warning(f"Failed to initialize the result count of task {task_id}: {e}")
+
+
+def increment_result_counts(counts: Counter):
+    args = [value for task_id, amount in counts.items() for value in (str(task_id), amount)]
+    if not args:
+        return
+    try:
+        _increment_result_counts(keys=[RESULT_COUNTS_KEY], args=args)
+    except RedisError as e:
+        logger.warning(f"Failed to update the result counts of {len(counts)} tasks: {e}")
+
+
+def remove_result_counts(*task_ids: UUID):
+    try:
+        if task_ids:
+            redis_client.hdel(RESULT_COUNTS_KEY, *(str(task_id) for task_id in task_ids))
+        else:
+            redis_client.delete(RESULT_COUNTS_KEY)
+    except RedisError as e:
+        logger.warning(f"Failed to remove result counts: {e}")
+
+
+def reset_counters():
+    try:
+        redis_client.delete(TASK_COUNT_KEY, RESULT_COUNTS_KEY)
+    except RedisError as e:
+        logger.warning(f"Failed to reset counters: {e}")
+
+
+def remove_drifted_result_counts(db: Session, counters: dict[bytes, bytes]) -> int:
+    """Removes the result counters of `counters` that differ from the database; returns how many."""
+    task_ids = {field: UUID(field.decode()) for field in counters}
+    counts = dict(
+        db.execute(
+            select(ExecutedTask.task_id, func.count())
+            .where(ExecutedTask.task_id.in_(task_ids.values()))
+            .group_by(ExecutedTask.task_id)
+        ).all()
+    )
+    drifted = [field for field, value in counters.items() if int(value) != counts.get(task_ids[field], 0)]
+    if drifted:
+        redis_client.hdel(RESULT_COUNTS_KEY, *drifted)
+    return len(drifted)
+
+
+def reconcile_counters():
+    """Removes the counters that drifted from the database, so their next read counts them again.
+
+    Only initialized counters are checked, `COUNTER_RECONCILE_BATCH_SIZE` result counters at a time through the
+    task id index, instead of grouping every result. A drifted counter is removed rather than overwritten: a
+    result flushed between the count and the write would otherwise be lost or counted twice.
+    """
+    db = SessionLocal()
+    try:
+        task_count = get_task_count()
+        if task_count is not None and task_count != db.scalar(select(func.count()).select_from(ScheduledTask)):
+            redis_client.delete(TASK_COUNT_KEY)
+            logger.warning(f"Removed the drifted task count {task_count}")
+
+        checked = drifted = 0
+        cursor = 0
+        while True:
+            cursor, counters = redis_client.hscan(
+                RESULT_COUNTS_KEY, cursor, count=settings.counter_reconcile_batch_size
+            )
+            if counters:
+                checked += len(counters)
+                drifted += remove_drifted_result_counts(db, counters)
+            if cursor == 0:
+                break
+    finally:
+        db.close()
+
+    logger.info(f"Reconciled counters, removed {drifted} of {checked} result counts that drifted")
@@ -0,0 +1,80 @@
+import hashlib
+from datetime import datetime, timedelta
+from functools import lru_cache
+
+from apscheduler.triggers.base import BaseTrigger
+from apscheduler.triggers.cron import CronTrigger
+
+from job_scheduler.config import settings
+
+
+def normalize_cron_expression(cron_expression: str) -> str:
+    return " ".join(cron_expression.split())
+
+
+@lru_cache(maxsize=settings.cron_cache_size)
+def _compile_cron_expression(cron_expression: str) -> CronTrigger:
+    return CronTrigger.from_crontab(cron_expression)
+
+
+def get_cron_trigger(cron_expression: str) -> CronTrigger:
+    """Returns the compiled trigger of `cron_expression`, shared by every task using the same expression.
+
+    Triggers are never modified after they are built, so one instance can drive any number of jobs.
+    Raises `ValueError` for invalid expressions; those are not cached.
+    """
+    return _compile_cron_expression(normalize_cron_expression(cron_expression))
+
+
+class OffsetTrigger(BaseTrigger):
+    """Fires `offset` after each fire of `trigger`, to spread tasks sharing a cron expression over a window.
+
+    Equal triggers compare and hash equal, so the compact engine still groups the tasks sharing an offset.
+    """
+
+    def __init__(self, trigger: BaseTrigger, offset: timedelta):
+        self.trigger = trigger
+        self.offset = offset
+
+    def get_next_fire_time(self, previous_fire_time: datetime | None, now: datetime) -> datetime | None:
+        previous = previous_fire_time - self.offset if previous_fire_time is not None else None
+        fire_time = self.trigger.get_next_fire_time(previous, now - self.offset)
+        return fire_time + self.offset if fire_time is not None else None
+
+    def __eq__(self, other):
+        return isinstance(other, OffsetTrigger) and repr(self) == repr(other)
+
+    def __hash__(self):
+        return hash(repr(self))
+
+    def __repr__(self):
+        return f"<OffsetTrigger ({self.trigger!r}, offset='{self.offset}')>"
+
+
+def get_fire_offset(task_slug: str, window: int) -> int:
+    """Returns the seconds the fires of `task_slug` are delayed by: stable, and uniform over `[0, window)`."""
+    if window <= 0:
+        return 0
+    return int.from_bytes(hashlib.md5(task_slug.encode()).digest()[:8], "big") % window
+
+
+@lru_cache(maxsize=settings.cron_cache_size)
+def _build_offset_trigger(cron_expression: str, offset: int) -> OffsetTrigger:
+    return OffsetTrigger(_compile_cron_expression(cron_expression), timedelta(seconds=offset))
+
+
+def get_offset_trigger(cron_expression: str, offset: int) -> BaseTrigger:
+    """Returns the trigger of `cron_expression` delayed by `offset` seconds, shared like `get_cron_trigger`."""
+    if not offset:
+        return get_cron_trigger(cron_expression)
+    return _build_offset_trigger(normalize_cron_expression(cron_expression), offset)
+
+
+def get_cron_cache_stats() -> dict[str, int]:
+    info = _compile_cron_expression.cache_info()
+    return {"hits": info.hits, "misses": info.misses, "size": info.currsize, "max_size": info.maxsize}
+
+
+def clear_cron_cache():
+    _compile_cron_expression.cache_clear()
+    _build_offset_trigger.cache_clear()
@@ -0,0 +1,144 @@
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Callable, NamedTuple
+from uuid import UUID
+
+from sqlalchemy.pool import QueuePool
+
+from job_scheduler.config import settings
+from job_scheduler.constants import TaskPriority
+from job_scheduler.database import engine
+from job_scheduler.logger import logger
+
+# Order in which queued fires are started
+PRIORITIES = (TaskPriority.High, TaskPriority.Normal, TaskPriority.Low)
+
+
+class Fire(NamedTuple):
+    task_slug: str
+    task_id: UUID | None
+    priority: TaskPriority
+    fire_time: datetime
+    queued_at: float
+
+
+def get_max_concurrency() -> int:
+    """Returns the fires run at once: the DB pool's connections minus the ones kept for the API, and at most one
+    less than the executor's workers.
+
+    Fires waiting for a slot are only ordered by priority once they reached the dispatcher. With a slot per worker,
+    or more, every worker would be busy running a fire and new fires would wait in the executor's FIFO queue
+    instead, so one worker is kept free to claim new fires and queue them by priority.
+    """
+    worker_limit = max(settings.scheduler_max_workers - 1, 1)
+    if settings.dispatch_max_concurrency is not None:
+        return min(settings.dispatch_max_concurrency, worker_limit)
+
+    pool = engine.pool
+    # A negative max overflow means the pool is unbounded
+    if not isinstance(pool, QueuePool) or pool._max_overflow < 0:
+        return worker_limit
+    return min(max(pool.size() + pool._max_overflow - settings.dispatch_reserved_connections, 1), worker_limit)
+
+
+class FireDispatcher:
+    """Caps the fires running at once and starts the waiting ones by priority.
+
+    A fire runs right away on the calling executor worker while a slot is free; otherwise it waits in the queue of
+    its priority, and the worker finishing a fire starts the next one, highest priority first. High and normal
+    priority fires only wait. Low priority fires are shed when their queue is full or when they waited longer than
+    `low_priority_max_wait`, so a backlog of them cannot push the others or the DB pool past their limits.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        delay_threshold: float,
+        low_priority_queue_size: int,
+        low_priority_max_wait: float,
+        run: Callable[[Fire, bool], None],
+        shed: Callable[[Fire, str], None],
+    ):
+        self.max_concurrency = max_concurrency
+        self.delay_threshold = delay_threshold
+        self.low_priority_queue_size = low_priority_queue_size
+        self.low_priority_max_wait = low_priority_max_wait
+        self.run = run
+        self.shed = shed
+
+        self._lock = threading.Lock()
+        self._queues: dict[TaskPriority, deque[Fire]] = {priority: deque() for priority in PRIORITIES}
+        self._active = 0
+        # Set by `close()`, fires dispatched after it are shed
+        self._closed = False
+
+    def dispatch(self, fire: Fire):
+        with self._lock:
+            closed = self._closed
+            is_free = not closed and self._active < self.max_concurrency
+            queue = self._queues[fire.priority]
+            is_full = fire.priority == TaskPriority.Low and len(queue) >= self.low_priority_queue_size
+            if is_free:
+                self._active += 1
+            elif not closed and not is_full:
+                queue.append(fire)
+                return
+
+        if is_free:
+            self._work(fire)
+        elif closed:
+            self.shed(fire, "the scheduler shut down")
+        else:
+            self.shed(fire, "the low priority queue is full")
+
+    def close(self):
+        """Sheds the fires still waiting and the ones dispatched from now on, so each claimed fire has a result.
+
+        Called once the scheduler shut down, after its workers ran the fires queued behind theirs.
+        """
+        with self._lock:
+            self._closed = True
+            queued = [fire for priority in PRIORITIES for fire in self._queues[priority]]
+            for queue in self._queues.values():
+                queue.clear()
+
+        for fire in queued:
+            self.shed(fire, "the scheduler shut down before it started")
+
+    def open(self):
+        self._closed = False
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {
+                "max_concurrency": self.max_concurrency,
+                "active": self._active,
+                "queued": {priority.value: len(queue) for priority, queue in self._queues.items()},
+            }
+
+    def _work(self, fire: Fire):
+        # The worker keeps its slot while fires are waiting, so a queued fire never waits for a free slot twice
+        while fire is not None:
+            self._start(fire)
+            fire = self._next()
+
+    def _start(self, fire: Fire):
+        waited = time.monotonic() - fire.queued_at
+        if fire.priority == TaskPriority.Low and waited > self.low_priority_max_wait:
+            self.shed(fire, f"it waited {waited:.1f}s for a free slot")
+            return
+
+        try:
+            self.run(fire, waited > self.delay_threshold)
+        except Exception as e:
+            logger.error(f"Fire of task {fire.task_slug} at {fire.fire_time} raised an exception: {e}")
+
+    def _next(self) -> Fire | None:
+        with self._lock:
+            for priority in PRIORITIES:
+                if self._queues[priority]:
+                    return self._queues[priority].popleft()
+            self._active -= 1
+            return None
@@ -0,0 +1,380 @@
+import heapq
+import threading
+from collections import Counter
+from concurrent.futures import Executor, Future
+from datetime import datetime, timedelta, timezone
+from itertools import count
+from typing import Callable
+
+from apscheduler.events import EVENT_JOB_MISSED, JobExecutionEvent
+from apscheduler.executors.base import run_job
+from apscheduler.executors.pool import (
+    BasePoolExecutor,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
+from apscheduler.job import Job
+from apscheduler.jobstores.base import ConflictingIdError, JobLookupError
+from apscheduler.triggers.base import BaseTrigger
+from apscheduler.util import undefined
+
+from job_scheduler.logger import logger
+
+# Jobs declaring this keyword argument are called with the run time they fire for, instead of reconstructing it
+FIRE_TIME_KWARG = "fire_time"
+
+
+def copy_job(job: Job) -> Job:
+    # `copy.copy` goes through `Job.__getstate__`, which rejects callables without a textual reference
+    fire = Job.__new__(Job)
+    for slot in Job.__slots__:
+        if slot != "__weakref__" and hasattr(job, slot):
+            setattr(fire, slot, getattr(job, slot))
+    return fire
+
+
+def run_job_at_fire_times(job: Job, jobstore_alias: str, run_times: list[datetime], logger_name: str):
+    """Runs `job` like APScheduler's `run_job`, passing each run time to jobs declaring a `fire_time` keyword."""
+    if FIRE_TIME_KWARG not in job.kwargs:
+        return run_job(job, jobstore_alias, run_times, logger_name)
+
+    events = []
+    for run_time in run_times:
+        fire = copy_job(job)
+        fire.kwargs = {**job.kwargs, FIRE_TIME_KWARG: run_time}
+        events.extend(run_job(fire, jobstore_alias, [run_time], logger_name))
+    return events
+
+
+class FireTimePoolExecutor(BasePoolExecutor):
+    """Pool executor running jobs with `run_job_at_fire_times`; the rest is APScheduler's `BasePoolExecutor`."""
+
+    def _do_submit_job(self, job: Job, run_times: list[datetime]):
+        def callback(future: Future):
+            exception = future.exception()
+            if exception:
+                self._run_job_error(job.id, exception, exception.__traceback__)
+            else:
+                self._run_job_success(job.id, future.result())
+
+        future = self._pool.submit(run_job_at_fire_times, job, job._jobstore_alias, run_times, self._logger.name)
+        future.add_done_callback(callback)
+
+
+class FireTimeThreadPoolExecutor(ThreadPoolExecutor, FireTimePoolExecutor):
+    pass
+
+
+class FireTimeProcessPoolExecutor(ProcessPoolExecutor, FireTimePoolExecutor):
+    # Submits through `FireTimePoolExecutor` and keeps the replacement of a broken process pool
+    pass
+
+
+class CompactJob:
+    """A job reduced to what is needed to run it; the trigger is shared by every job of its group."""
+
+    __slots__ = ("id", "func", "args", "kwargs", "group", "max_instances", "coalesce", "misfire_grace_time", "paused")
+
+    def __init__(self, id, func, args, kwargs, group, max_instances, coalesce, misfire_grace_time, paused=False):
+        self.id = id
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.group = group
+        self.max_instances = max_instances
+        self.coalesce = coalesce
+        self.misfire_grace_time = misfire_grace_time
+        # A paused job keeps its group for the trigger but is not among the group's jobs
+        self.paused = paused
+
+    @property
+    def trigger(self) -> BaseTrigger:
+        return self.group.trigger
+
+    @property
+    def next_run_time(self) -> datetime | None:
+        return None if self.paused else self.group.next_fire_time
+
+
+class TriggerGroup:
+    """Jobs sharing one trigger, so a fire time is computed once for all of them."""
+
+    __slots__ = ("key", "trigger", "next_fire_time", "jobs")
+
+    def __init__(self, key: str, trigger: BaseTrigger, next_fire_time: datetime | None):
+        self.key = key
+        self.trigger = trigger
+        self.next_fire_time = next_fire_time
+        self.jobs: dict[str, CompactJob] = {}
+
+
+class CompactExecutor:
+    """Runs fires on a `concurrent.futures` pool and tracks running instances per job like APScheduler executors."""
+
+    def __init__(self, pool: Executor):
+        self.pool = pool
+        self._instances: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def submit(self, job: CompactJob, run_time: datetime) -> bool:
+        with self._lock:
+            if self._instances[job.id] >= job.max_instances:
+                return False
+            self._instances[job.id] += 1
+
+        kwargs = {**job.kwargs, FIRE_TIME_KWARG: run_time} if FIRE_TIME_KWARG in job.kwargs else job.kwargs
+        future = self.pool.submit(job.func, *job.args, **kwargs)
+        future.add_done_callback(lambda done: self._on_done(job.id, done))
+        return True
+
+    def shutdown(self, wait: bool):
+        self.pool.shutdown(wait=wait)
+
+    def _on_done(self, job_id: str, future: Future):
+        with self._lock:
+            self._instances[job_id] -= 1
+            if self._instances[job_id] <= 0:
+                del self._instances[job_id]
+
+        if future.exception() is not None:
+            logger.error(f"Job {job_id} raised an exception: {future.exception()}")
+
+
+class CompactScheduler:
+    """Scheduler engine for millions of jobs, with the subset of the APScheduler interface this app uses.
+
+    Jobs are `__slots__` objects grouped by trigger: a min-heap holds one entry per group, keyed by the group's
+    next fire time, and a single dispatcher thread pops due groups and submits all of their jobs. Adding or
+    removing a job only touches its group, and a cron expression is evaluated once per fire for all its jobs.
+    """
+
+    def __init__(self, executor: CompactExecutor, job_defaults: dict):
+        self.executor = executor
+        self.job_defaults = job_defaults
+
+        self._lock = threading.RLock()
+        self._jobs: dict[str, CompactJob] = {}
+        self._groups: dict[str, TriggerGroup] = {}
+        self._heap: list[tuple[datetime, int, str]] = []
+        self._sequence = count()
+        self._listeners: list[tuple[Callable, int]] = []
+
+        self._wakeup = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._paused = False
+        self.running = False
+
+    def start(self, paused: bool = False):
+        self._paused = paused
+        self.running = True
+        self._thread = threading.Thread(target=self._run, name="compact-scheduler", daemon=True)
+        self._thread.start()
+
+    def shutdown(self, wait: bool = True):
+        self.running = False
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.executor.shutdown(wait=wait)
+
+    def pause(self):
+        self._paused = True
+
+    def resume(self):
+        self._paused = False
+        self._wakeup.set()
+
+    def add_listener(self, callback: Callable, mask: int):
+        self._listeners.append((callback, mask))
+
+    def add_job(
+        self,
+        func: Callable,
+        trigger: BaseTrigger,
+        args=(),
+        kwargs=None,
+        id: str = None,
+        replace_existing=False,
+        next_run_time=undefined,
+        **options,
+    ):
+        """Adds a job; like APScheduler, `next_run_time=None` adds it paused."""
+        job_options = {**self.job_defaults, **options}
+        paused = next_run_time is None
+
+        with self._lock:
+            if id in self._jobs:
+                if not replace_existing:
+                    raise ConflictingIdError(id)
+                self._remove(id)
+
+            group = TriggerGroup(repr(trigger), trigger, None) if paused else self._get_group(trigger)
+            if group is None:
+                return None
+
+            job = CompactJob(
+                id,
+                func,
+                tuple(args),
+                dict(kwargs or {}),
+                group,
+                job_options["max_instances"],
+                job_options["coalesce"],
+                job_options["misfire_grace_time"],
+                paused,
+            )
+            if not paused:
+                group.jobs[id] = job
+            self._jobs[id] = job
+            return job
+
+    def get_job(self, job_id: str) -> CompactJob | None:
+        return self._jobs.get(job_id)
+
+    def get_jobs(self) -> list[CompactJob]:
+        with self._lock:
+            return list(self._jobs.values())
+
+    def remove_job(self, job_id: str):
+        with self._lock:
+            if job_id not in self._jobs:
+                raise JobLookupError(job_id)
+            self._remove(job_id)
+
+    def pause_job(self, job_id: str) -> CompactJob:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                raise JobLookupError(job_id)
+            if not job.paused:
+                self._detach(job)
+                job.paused = True
+            return job
+
+    def resume_job(self, job_id: str) -> CompactJob | None:
+        """Resumes a paused job, or removes it if its trigger has no fire left, like APScheduler."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                raise JobLookupError(job_id)
+            if not job.paused:
+                return job
+
+            group = self._get_group(job.group.trigger)
+            if group is None:
+                del self._jobs[job_id]
+                return None
+            job.group = group
+            job.paused = False
+            group.jobs[job_id] = job
+            return job
+
+    def remove_all_jobs(self):
+        with self._lock:
+            self._jobs.clear()
+            self._groups.clear()
+            self._heap.clear()
+
+    def _lookup_executor(self, alias: str) -> CompactExecutor:
+        return self.executor
+
+    def _lookup_jobstore(self, alias: str):
+        # Jobs are only kept in memory
+        return None
+
+    def _get_group(self, trigger: BaseTrigger) -> TriggerGroup | None:
+        # The repr holds the trigger's fields and timezone, so equal triggers share a group even if built twice
+        key = repr(trigger)
+        group = self._groups.get(key)
+        if group is not None:
+            return group
+
+        next_fire_time = trigger.get_next_fire_time(None, datetime.now(timezone.utc))
+        if next_fire_time is None:
+            return None
+
+        group = self._groups[key] = TriggerGroup(key, trigger, next_fire_time)
+        self._push(group)
+        return group
+
+    def _push(self, group: TriggerGroup):
+        was_next = not self._heap or group.next_fire_time < self._heap[0][0]
+        heapq.heappush(self._heap, (group.next_fire_time, next(self._sequence), group.key))
+        if was_next:
+            self._wakeup.set()
+
+    def _remove(self, job_id: str):
+        self._detach(self._jobs.pop(job_id))
+
+    def _detach(self, job: CompactJob):
+        group = job.group
+        group.jobs.pop(job.id, None)
+        # A paused job's group may have been dropped and rebuilt since, the rebuilt group must be kept
+        if not group.jobs and self._groups.get(group.key) is group:
+            # The group's heap entry is dropped lazily when it is popped
+            del self._groups[group.key]
+
+    def _pop_due(self, now: datetime) -> list[tuple[list[CompactJob], list[datetime]]]:
+        due = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                fire_time, _, key = heapq.heappop(self._heap)
+                group = self._groups.get(key)
+                if group is None or group.next_fire_time != fire_time:
+                    continue
+
+                run_times = []
+                next_fire_time = fire_time
+                while next_fire_time is not None and next_fire_time <= now:
+                    run_times.append(next_fire_time)
+                    next_fire_time = group.trigger.get_next_fire_time(next_fire_time, now)
+
+                due.append((list(group.jobs.values()), run_times))
+                group.next_fire_time = next_fire_time
+                if next_fire_time is not None:
+                    self._push(group)
+                else:
+                    for job_id in list(group.jobs):
+                        self._remove(job_id)
+        return due
+
+    def _dispatch(self, job: CompactJob, run_times: list[datetime], now: datetime):
+        if job.misfire_grace_time is not None:
+            grace = timedelta(seconds=job.misfire_grace_time)
+            missed = [run_time for run_time in run_times if now - run_time > grace]
+            run_times = [run_time for run_time in run_times if now - run_time <= grace]
+            for run_time in missed:
+                self._emit(JobExecutionEvent(EVENT_JOB_MISSED, job.id, "default", run_time))
+
+        if job.coalesce:
+            run_times = run_times[-1:]
+
+        for run_time in run_times:
+            if not self.executor.submit(job, run_time):
+                logger.warning(f"Job {job.id} skipped its fire at {run_time}: max instances reached")
+
+    def _emit(self, event: JobExecutionEvent):
+        for callback, mask in self._listeners:
+            if event.code & mask:
+                try:
+                    callback(event)
+                except Exception as e:
+                    logger.error(f"Scheduler listener failed: {e}")
+
+    def _run(self):
+        while self.running:
+            if not self._paused:
+                now = datetime.now(timezone.utc)
+                for jobs, run_times in self._pop_due(now):
+                    for job in jobs:
+                        self._dispatch(job, run_times, now)
+
+            with self._lock:
+                next_fire_time = self._heap[0][0] if self._heap else None
+            timeout = None
+            if next_fire_time is not None and not self._paused:
+                timeout = max((next_fire_time - datetime.now(timezone.utc)).total_seconds(), 0)
+
+            self._wakeup.wait(timeout)
+            self._wakeup.clear()
@@ -0,0 +1,79 @@
+import csv
+import io
+import json
+import zlib
+from datetime import datetime, timezone
+from typing import Iterator
+from uuid import UUID
+
+from sqlalchemy import select
+
+from core.models import ExecutedTask
+from job_scheduler.config import settings
+from job_scheduler.constants import ExportFormat
+from job_scheduler.database import SessionLocal
+
+EXPORT_COLUMNS = ("executed_at", "status", "result")
+MEDIA_TYPES = {ExportFormat.NDJSON: "application/x-ndjson", ExportFormat.CSV: "text/csv"}
+
+
+def to_utc(value: datetime) -> datetime:
+    return value.astimezone(timezone.utc) if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def format_ndjson(rows) -> str:
+    return "".join(
+        json.dumps({"executed_at": executed_at.isoformat(), "status": status, "result": result}) + "\n"
+        for executed_at, status, result in rows
+    )
+
+
+def format_csv(rows) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows((executed_at.isoformat(), status, result) for executed_at, status, result in rows)
+    return buffer.getvalue()
+
+
+def get_csv_header() -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(EXPORT_COLUMNS)
+    return buffer.getvalue()
+
+
+def iter_result_chunks(task_id: UUID, since: datetime | None, until: datetime | None) -> Iterator[list]:
+    """Yields the task's results oldest first, `export_chunk_size` rows at a time from a server-side cursor."""
+    statement = select(ExecutedTask.executed_at, ExecutedTask.status, ExecutedTask.result).where(
+        ExecutedTask.task_id == task_id
+    )
+    if since is not None:
+        statement = statement.where(ExecutedTask.executed_at >= to_utc(since))
+    if until is not None:
+        statement = statement.where(ExecutedTask.executed_at < to_utc(until))
+    statement = statement.order_by(ExecutedTask.executed_at, ExecutedTask.executed_task_id)
+
+    # The request's session is closed once the handler returns, before the body is streamed
+    with SessionLocal() as db:
+        result = db.execute(statement.execution_options(yield_per=settings.export_chunk_size))
+        for rows in result.partitions():
+            yield rows
+
+
+def export_results(
+    task_id: UUID, export_format: ExportFormat, since: datetime | None, until: datetime | None, compress: bool
+) -> Iterator[bytes]:
+    """Streams the task's results encoded as `export_format`, so memory stays flat whatever the history size."""
+    format_rows = format_csv if export_format == ExportFormat.CSV else format_ndjson
+    compressor = zlib.compressobj(wbits=31) if compress else None  # wbits=31 writes a gzip container
+
+    def encode(text: str) -> bytes:
+        data = text.encode()
+        return compressor.compress(data) if compressor else data
+
+    if export_format == ExportFormat.CSV:
+        yield encode(get_csv_header())
+    for rows in iter_result_chunks(task_id, since, until):
+        chunk = encode(format_rows(rows))
+        if chunk:
+            yield chunk
+    if compressor:
+        yield compressor.flush()
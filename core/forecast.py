@@ -0,0 +1,215 @@
+import math
+from bisect import bisect_left
+from datetime import date, datetime, timedelta, timezone
+from functools import lru_cache
+from itertools import islice
+from typing import NamedTuple
+
+from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.cron.fields import MIN_VALUES, BaseField
+
+from core.cron import get_cron_trigger, normalize_cron_expression
+from job_scheduler.config import settings
+
+# Long enough to find the next fire of any valid expression, e.g. `0 0 29 2 mon` fires once in 28 years; the fires
+# after it are found with the trigger
+UPCOMING_HORIZON = timedelta(days=366 * 28)
+
+
+class ForecastGroup(NamedTuple):
+    """Tasks sharing a cron expression and a jitter window, counted once and weighted by `count`."""
+
+    cron_expression: str
+    jitter_window: int
+    count: int
+
+
+class _Probe:
+    """Stands in for a datetime whose field under test is `value`, so a field's expressions can be evaluated."""
+
+    __slots__ = ("year", "month", "day", "hour", "minute", "second")
+
+    def __init__(self, field: BaseField, year: int, month: int, value: int):
+        self.year = year
+        # Only the day field reads the month as context, the month field reads its own value
+        self.month = value if field.name == "month" else month
+        self.day = self.hour = self.minute = self.second = value
+
+    def weekday(self) -> int:
+        return self.day
+
+
+def get_field_mask(field: BaseField, year: int = 2000, month: int = 1) -> int:
+    """Returns the values `field` matches as a bitmask; `year` and `month` only matter for the day field.
+
+    The field's own expressions are evaluated, so steps, ranges, names and `last` behave exactly as in APScheduler.
+    """
+    mask = 0
+    start = MIN_VALUES[field.name]
+    value = field.get_next_value(_Probe(field, year, month, start))
+    # `last` answers the month's last day whatever the day probed, so a value before the probe ends the scan
+    while value is not None and value >= start:
+        mask |= 1 << value
+        start = value + 1
+        value = field.get_next_value(_Probe(field, year, month, start))
+    return mask
+
+
+def iter_bits(mask: int):
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+class CronExpansion:
+    """A cron expression as bitmasks of matching months, days and weekdays, and its sorted fire seconds in a day.
+
+    Like APScheduler, and unlike Vixie cron, a day has to match both the day of month and the day of week fields.
+    """
+
+    def __init__(self, trigger: CronTrigger):
+        fields = {field.name: field for field in trigger.fields}
+        self.timezone = trigger.timezone
+        self.months = get_field_mask(fields["month"])
+        self.weekdays = get_field_mask(fields["day_of_week"])
+        self.day_field = fields["day"]
+        self.day_seconds = [
+            hour * 3600 + minute * 60 + second
+            for hour in iter_bits(get_field_mask(fields["hour"]))
+            for minute in iter_bits(get_field_mask(fields["minute"]))
+            for second in iter_bits(get_field_mask(fields["second"]))
+        ]
+        self._days: dict[tuple[int, int], int] = {}
+
+    def matches(self, day: date) -> bool:
+        if not (self.months >> day.month & 1 and self.weekdays >> day.weekday() & 1):
+            return False
+        # The day field's `last` and weekday positions depend on the month
+        days = self._days.get((day.year, day.month))
+        if days is None:
+            days = self._days[(day.year, day.month)] = get_field_mask(self.day_field, day.year, day.month)
+        return bool(days >> day.day & 1)
+
+    def iter_days(self, start: int, end: int):
+        """Yields each matching local day overlapping `[start, end)` as its midnight timestamp and fire seconds.
+
+        On a day with a UTC offset change the fire seconds are resolved one by one from their wall-clock time,
+        like APScheduler: a time skipped by the change does not fire, a repeated one fires twice.
+        """
+        day = datetime.fromtimestamp(start, self.timezone).date()
+        last_day = datetime.fromtimestamp(end, self.timezone).date()
+        while day <= last_day:
+            if self.matches(day):
+                midnight = datetime(day.year, day.month, day.day, tzinfo=self.timezone)
+                next_midnight = midnight + timedelta(days=1)
+                if midnight.utcoffset() == next_midnight.utcoffset():
+                    yield int(midnight.timestamp()), self.day_seconds
+                else:
+                    base = int(midnight.timestamp())
+                    yield base, sorted({at - base for s in self.day_seconds for at in self._resolve(midnight, s)})
+            day += timedelta(days=1)
+
+    def _resolve(self, midnight: datetime, second: int) -> list[int]:
+        """Returns the timestamps of a wall-clock time: none if skipped by a forward shift, two if repeated."""
+        wall = (midnight + timedelta(seconds=second)).replace(tzinfo=None)
+        timestamps = []
+        for fold in (0, 1):
+            at = int(wall.replace(tzinfo=self.timezone, fold=fold).timestamp())
+            if datetime.fromtimestamp(at, self.timezone).replace(tzinfo=None) == wall:
+                timestamps.append(at)
+        return timestamps
+
+
+@lru_cache(maxsize=settings.cron_cache_size)
+def _expand_cron_expression(cron_expression: str) -> CronExpansion:
+    return CronExpansion(get_cron_trigger(cron_expression))
+
+
+def get_cron_expansion(cron_expression: str) -> CronExpansion:
+    return _expand_cron_expression(normalize_cron_expression(cron_expression))
+
+
+def to_timestamp(value: datetime) -> int:
+    # Fires are on whole seconds, so `start <= fire < end` holds for the same fires with both bounds rounded up
+    return math.ceil(value.timestamp())
+
+
+def iter_fire_times(cron_expression: str, start: datetime, end: datetime):
+    """Yields the fire times of `cron_expression` in `[start, end)`, in UTC."""
+    start_at, end_at = to_timestamp(start), to_timestamp(end)
+    for base, seconds in get_cron_expansion(cron_expression).iter_days(start_at, end_at):
+        for second in seconds[bisect_left(seconds, start_at - base) : bisect_left(seconds, end_at - base)]:
+            yield datetime.fromtimestamp(base + second, timezone.utc)
+
+
+def count_fires(counts: list[float], group: ForecastGroup, start: int, end: int, bucket: int):
+    """Adds the fires of `group` in `[start, end)` to the per-bucket `counts`.
+
+    A day with more fires than buckets is counted per bucket with two bisects instead of per fire. A jittered fire
+    lands at a stable but unknown offset in its window, so it is spread evenly over the buckets it may land in.
+    """
+    window = group.jitter_window
+    # A jittered fire from before the forecast may land in it
+    for base, seconds in get_cron_expansion(group.cron_expression).iter_days(start - window, end):
+        low = bisect_left(seconds, start - window - base)
+        high = bisect_left(seconds, end - base)
+        if low == high:
+            continue
+
+        if window:
+            for second in seconds[low:high]:
+                spread_fire(counts, base + second, group.count / window, window, start, end, bucket)
+            continue
+
+        first = (base + seconds[low] - start) // bucket
+        last = (base + seconds[high - 1] - start) // bucket
+        if high - low <= last - first + 1:
+            for second in seconds[low:high]:
+                counts[(base + second - start) // bucket] += group.count
+            continue
+
+        position = low
+        for index in range(first, last + 1):
+            next_position = bisect_left(seconds, start + (index + 1) * bucket - base, position, high)
+            counts[index] += group.count * (next_position - position)
+            position = next_position
+
+
+def spread_fire(counts: list[float], fire_at: int, weight: float, window: int, start: int, end: int, bucket: int):
+    first = max((fire_at - start) // bucket, 0)
+    last = min((fire_at + window - 1 - start) // bucket, len(counts) - 1)
+    for index in range(first, last + 1):
+        bucket_start = start + index * bucket
+        overlap = min(fire_at + window, bucket_start + bucket, end) - max(fire_at, bucket_start)
+        counts[index] += weight * overlap
+
+
+def forecast_fires(groups: list[ForecastGroup], start: datetime, end: datetime, bucket: int) -> list[float]:
+    """Returns the expected fires per `bucket` seconds in `[start, end)` of every task in `groups`.
+
+    Each cron expression is expanded once per distinct jitter window and weighted by its number of tasks,
+    so the cost depends on the distinct expressions and the window, not on the number of tasks.
+    """
+    start_at, end_at = to_timestamp(start), to_timestamp(end)
+    counts = [0.0] * -(-(end_at - start_at) // bucket)
+    for group in groups:
+        count_fires(counts, group, start_at, end_at, bucket)
+    return counts
+
+
+def get_upcoming_fire_times(cron_expression: str, offset: int, now: datetime, n: int) -> list[datetime]:
+    """Returns the next `n` fire times from `now` of `cron_expression` delayed by `offset` seconds.
+
+    Yearly or leap day expressions fire fewer than `n` times within `UPCOMING_HORIZON`, their later fires are
+    found with the expression's trigger one by one.
+    """
+    delay = timedelta(seconds=offset)
+    fire_times = list(islice(iter_fire_times(cron_expression, now - delay, now + UPCOMING_HORIZON), n))
+    if fire_times and len(fire_times) < n:
+        trigger = get_cron_trigger(cron_expression)
+        fire_time = trigger.get_next_fire_time(fire_times[-1], fire_times[-1] + timedelta(seconds=1))
+        while fire_time is not None and len(fire_times) < n:
+            fire_times.append(fire_time)
+            fire_time = trigger.get_next_fire_time(fire_time, fire_time + timedelta(seconds=1))
+    return [fire_time + delay for fire_time in fire_times]
@@ -0,0 +1,87 @@
+import hashlib
+import importlib
+from datetime import datetime, timezone
+from typing import Any, Callable, NamedTuple
+
+from pydantic import BaseModel
+
+
+class HandlerContext(NamedTuple):
+    """What a handler knows about the task it runs for; sent to worker processes, so it must stay picklable."""
+
+    task_slug: str
+    task_name: str
+
+
+HandlerFunc = Callable[[HandlerContext, dict[str, Any]], str]
+
+
+class Handler(NamedTuple):
+    name: str
+    func: HandlerFunc
+    # CPU-bound handlers run in the handler worker processes, so they do not hold the GIL of the scheduler
+    cpu_bound: bool
+    # Validates the task's `handler_params` when the task is created
+    params_model: type[BaseModel] | None = None
+
+
+class HandlerError(Exception):
+    pass
+
+
+class HandlerTimeout(HandlerError):
+    pass
+
+
+class HandlerCancelled(HandlerError):
+    pass
+
+
+DEFAULT_HANDLER = "default"
+# Modules of the handlers shipped with the app, imported with the ones of TASK_HANDLER_MODULES
+BUILTIN_HANDLER_MODULES = ["core.webhooks"]
+
+_handlers: dict[str, Handler] = {}
+
+
+def register_handler(
+    name: str, cpu_bound: bool = False, params_model: type[BaseModel] | None = None
+) -> Callable[[HandlerFunc], HandlerFunc]:
+    """Registers the decorated function as the handler `name`; its return value is stored as the fire's result."""
+
+    def decorator(func: HandlerFunc) -> HandlerFunc:
+        _handlers[name] = Handler(name=name, func=func, cpu_bound=cpu_bound, params_model=params_model)
+        return func
+
+    return decorator
+
+
+def get_handler(name: str | None) -> Handler:
+    try:
+        return _handlers[name or DEFAULT_HANDLER]
+    except KeyError:
+        raise HandlerError(f"Unknown handler {name!r}") from None
+
+
+def get_handler_names() -> list[str]:
+    return sorted(_handlers)
+
+
+def import_handler_modules(modules: list[str]):
+    """Imports the modules registering the app's handlers, in the app and in every handler worker process."""
+    for module in [*BUILTIN_HANDLER_MODULES, *modules]:
+        importlib.import_module(module)
+
+
+@register_handler(DEFAULT_HANDLER)
+def report_execution(context: HandlerContext, params: dict[str, Any]) -> str:
+    return f"Task '{context.task_name}' executed at {datetime.now(timezone.utc)}"
+
+
+@register_handler("sha256", cpu_bound=True)
+def hash_rounds(context: HandlerContext, params: dict[str, Any]) -> str:
+    """Hashes `data` `rounds` times; a CPU-bound reference handler."""
+    digest = str(params.get("data", context.task_slug)).encode()
+    for _ in range(int(params.get("rounds", 1))):
+        digest = hashlib.sha256(digest).digest()
+    return digest.hex()
@@ -0,0 +1,72 @@
+from datetime import datetime
+
+from apscheduler.triggers.interval import IntervalTrigger
+from redis import RedisError
+
+from core.claims import claim_batcher, get_claim_key
+from core.counters import reconcile_counters
+from core.cron import get_cron_trigger
+from core.engine import FIRE_TIME_KWARG
+from core.models import utc_now
+from core.recovery import owned_task_sync
+from core.retention import run_result_maintenance
+from core.tasks import INTERNAL_JOB_PREFIX, get_scheduled_fire_time, scheduler
+from job_scheduler.config import settings
+from job_scheduler.logger import logger
+
+RESULT_MAINTENANCE_JOB_ID = f"{INTERNAL_JOB_PREFIX}result-maintenance"
+COUNTER_RECONCILIATION_JOB_ID = f"{INTERNAL_JOB_PREFIX}counter-reconciliation"
+TASK_SYNC_JOB_ID = f"{INTERNAL_JOB_PREFIX}task-sync"
+
+
+def claim_internal_fire(job_id: str, fire_time: datetime | None) -> bool:
+    """Claims the fire of an internal job, so only one replica runs it."""
+    fire_time = fire_time or get_scheduled_fire_time(job_id, utc_now())
+    try:
+        return claim_batcher.claim(get_claim_key(job_id, fire_time))
+    except RedisError as e:
+        logger.error(f"Failed to claim internal job {job_id} for {fire_time}: {e}")
+        return False
+
+
+def run_result_maintenance_job(fire_time: datetime | None = None):
+    if claim_internal_fire(RESULT_MAINTENANCE_JOB_ID, fire_time):
+        run_result_maintenance()
+
+
+def run_counter_reconciliation_job(fire_time: datetime | None = None):
+    if not claim_internal_fire(COUNTER_RECONCILIATION_JOB_ID, fire_time):
+        return
+    try:
+        reconcile_counters()
+    except Exception as e:
+        logger.error(f"Counter reconciliation failed: {e}")
+
+
+def run_task_sync_job():
+    # Every replica syncs its own jobs, so the fire is not claimed
+    try:
+        owned_task_sync.sync()
+    except Exception as e:
+        logger.error(f"Task sync failed: {e}")
+
+
+def schedule_internal_jobs():
+    if settings.sharding_enabled:
+        scheduler.add_job(
+            run_task_sync_job,
+            trigger=IntervalTrigger(seconds=settings.task_sync_interval),
+            id=TASK_SYNC_JOB_ID,
+            replace_existing=True,
+        )
+    for job_id, func, cron_expression in [
+        (RESULT_MAINTENANCE_JOB_ID, run_result_maintenance_job, settings.result_maintenance_cron),
+        (COUNTER_RECONCILIATION_JOB_ID, run_counter_reconciliation_job, settings.counter_reconcile_cron),
+    ]:
+        scheduler.add_job(
+            func,
+            trigger=get_cron_trigger(cron_expression),
+            kwargs={FIRE_TIME_KWARG: None},
+            id=job_id,
+            replace_existing=True,
+        )
@@ -0,0 +1,120 @@
+from typing import NamedTuple
+
+from sqlalchemy import Connection, Engine, Table, inspect, text
+from sqlalchemy.schema import CreateColumn
+
+from core.models import Base, ExecutedTask
+from core.retention import DEFAULT_PARTITION
+from job_scheduler.logger import logger
+
+RESULTS_TABLE = ExecutedTask.__tablename__
+UNPARTITIONED_RESULTS_TABLE = f"{RESULTS_TABLE}_unpartitioned"
+# Key of the advisory lock replicas starting together take, so they migrate one after the other
+MIGRATION_LOCK_KEY = 7_301_921
+
+
+class Migration(NamedTuple):
+    """Columns of the model added to a table after it was first released."""
+
+    table: str
+    columns: tuple[str, ...]
+
+
+# `create_all` only creates missing tables, so columns added to existing tables are listed here in release order
+MIGRATIONS = [
+    # Per-task scheduler options
+    Migration("scheduled_tasks", ("max_instances", "coalesce", "misfire_grace_time")),
+    # Per-task result retention
+    Migration("scheduled_tasks", ("retention_days",)),
+    # Change tracking of the persistent job store reconcile, rows created before it stay NULL
+    Migration("scheduled_tasks", ("updated_at",)),
+    # Bulk pause and resume, existing tasks are active
+    Migration("scheduled_tasks", ("paused",)),
+    Migration("scheduled_tasks", ("jitter_seconds",)),
+    Migration("scheduled_tasks", ("priority",)),
+    Migration("scheduled_tasks", ("handler", "handler_params", "timeout_seconds")),
+    # Schedule changes applied by the reconcile and the task sync, rows created before it stay NULL
+    Migration("scheduled_tasks", ("config_changed_at",)),
+]
+
+
+def add_missing_columns(connection: Connection, table: Table, columns: tuple[str, ...]) -> list[str]:
+    """Adds the `columns` of `table` the database does not have yet, as the model declares them."""
+    existing = {column["name"] for column in inspect(connection).get_columns(table.name)}
+    added = []
+    for name in columns:
+        if name in existing:
+            continue
+        # Columns added as NOT NULL declare a server default, so the existing rows get a value
+        column = CreateColumn(table.c[name]).compile(dialect=connection.dialect)
+        connection.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column}"))
+        added.append(name)
+    return added
+
+
+def rename_unpartitioned_results(connection: Connection) -> bool:
+    """Renames an `executed_tasks` table created before partitioning, and its indexes, out of the way.
+
+    Returns whether there was one; its rows are copied into the partitioned table by `copy_unpartitioned_results`.
+    """
+    kind = connection.scalar(
+        text("SELECT relkind FROM pg_class WHERE oid = to_regclass(:table)"), {"table": RESULTS_TABLE}
+    )
+    if kind != "r":
+        return False
+
+    connection.execute(text(f"ALTER TABLE {RESULTS_TABLE} RENAME TO {UNPARTITIONED_RESULTS_TABLE}"))
+    # Index names are unique per schema, the partitioned table creates indexes with the same names
+    indexes = connection.scalars(
+        text("SELECT indexname FROM pg_indexes WHERE tablename = :table"), {"table": UNPARTITIONED_RESULTS_TABLE}
+    ).all()
+    for index in indexes:
+        connection.execute(text(f"ALTER INDEX {index} RENAME TO {index}_unpartitioned"))
+    return True
+
+
+def copy_unpartitioned_results(connection: Connection):
+    """Copies the rows of the renamed table into the partitioned one and drops it.
+
+    The rows land in the DEFAULT partition; the next `ensure_partitions` moves recent days into daily partitions.
+    """
+    copied = connection.execute(
+        text(
+            f"INSERT INTO {RESULTS_TABLE} (executed_task_id, task_id, executed_at, status, result) "
+            f"SELECT executed_task_id, task_id, COALESCE(executed_at, now() AT TIME ZONE 'UTC'), status, result "
+            f"FROM {UNPARTITIONED_RESULTS_TABLE}"
+        )
+    ).rowcount
+    connection.execute(text(f"DROP TABLE {UNPARTITIONED_RESULTS_TABLE}"))
+    logger.info(f"Converted {RESULTS_TABLE} to a partitioned table, copied {copied} results")
+
+
+def migrate_schema(engine: Engine):
+    """Creates missing tables and applies the migrations; steps only add what is missing, so reruns are no-ops.
+
+    On PostgreSQL a results table created before partitioning is converted to a partitioned one, and the DEFAULT
+    partition is created. Converting copies every result, so on a large table run `migrate.py` before upgrading.
+    """
+    with engine.begin() as connection:
+        partitioned = connection.dialect.name == "postgresql"
+        converted = False
+        if partitioned:
+            connection.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
+            converted = rename_unpartitioned_results(connection)
+
+        Base.metadata.create_all(bind=connection)
+        for migration in MIGRATIONS:
+            added = add_missing_columns(connection, Base.metadata.tables[migration.table], migration.columns)
+            if added:
+                logger.info(f"Added columns {', '.join(added)} to {migration.table}")
+        for table in Base.metadata.sorted_tables:
+            # Like columns, indexes added to existing tables are not created by `create_all`
+            for index in table.indexes:
+                index.create(connection, checkfirst=True)
+
+        if partitioned:
+            connection.execute(
+                text(f"CREATE TABLE IF NOT EXISTS {DEFAULT_PARTITION} PARTITION OF {RESULTS_TABLE} DEFAULT")
+            )
+            if converted:
+                copy_unpartitioned_results(connection)
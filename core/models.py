@@ -2,10 +2,23 @@ from datetime import datetime, timezone
 from uuid import uuid4
 
 from nanoid import generate as slug_generator
-from sqlalchemy import Column, DateTime, ForeignKey, String
+from sqlalchemy import (
+    JSON,
+    Boolean,
+    Column,
+    Date,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    false,
+)
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import declarative_base, relationship
 
+from job_scheduler.constants import TaskPriority
+
 Base = declarative_base()
 
 
@@ -13,26 +26,74 @@ def generate_slug():
     return slug_generator(size=10)
 
 
+def utc_now():
+    return datetime.now(timezone.utc)
+
+
 class ScheduledTask(Base):
     __tablename__ = "scheduled_tasks"
+    __table_args__ = (
+        Index("ix_scheduled_tasks_created_at_id", "created_at", "scheduled_task_id"),
+        # Finds the tasks whose schedule changed since the last reconcile or sync
+        Index("ix_scheduled_tasks_config_changed_at", "config_changed_at"),
+    )
 
     scheduled_task_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4)
     slug = Column(String, index=True, unique=True, default=generate_slug)
     name = Column(String, nullable=False)
-    created_at = Column(DateTime, default=datetime.now(timezone.utc))
+    created_at = Column(DateTime, default=utc_now)
+    updated_at = Column(DateTime, default=utc_now, onupdate=utc_now)
+    # Set when the task is created, paused or resumed, unlike `updated_at` which every fire's `next_run_at` bumps
+    config_changed_at = Column(DateTime, default=utc_now)
     cron_expression = Column(String, nullable=False)
+    # None while the task is paused
     next_run_at = Column(DateTime, nullable=True)
+    paused = Column(Boolean, nullable=False, default=False, server_default=false())
+    # Scheduler options overriding the global settings, None means the global value is used
+    max_instances = Column(Integer, nullable=True)
+    coalesce = Column(Boolean, nullable=True)
+    misfire_grace_time = Column(Integer, nullable=True)
+    # Registered handler run on each fire, None means the default handler
+    handler = Column(String, nullable=True)
+    handler_params = Column(JSON, nullable=True)
+    # Seconds the handler may run in a worker process, None means HANDLER_TIMEOUT is used
+    timeout_seconds = Column(Integer, nullable=True)
+    # A TaskPriority, deciding which fires wait or are shed when the dispatcher is saturated
+    priority = Column(
+        String, nullable=False, default=TaskPriority.Normal.value, server_default=TaskPriority.Normal.value
+    )
+    # Window in seconds the task's fires are delayed within, None means FIRE_JITTER_SECONDS is used
+    jitter_seconds = Column(Integer, nullable=True)
+    # Days raw results are kept, can only be shorter than RESULT_RETENTION_DAYS
+    retention_days = Column(Integer, nullable=True)
 
     results = relationship("ExecutedTask", back_populates="task", lazy="dynamic")
 
 
 class ExecutedTask(Base):
     __tablename__ = "executed_tasks"
+    # On PostgreSQL the table is range-partitioned by day, see core/retention.py
+    __table_args__ = (
+        Index("ix_executed_tasks_task_id_executed_at_id", "task_id", "executed_at", "executed_task_id"),
+        {"postgresql_partition_by": "RANGE (executed_at)"},
+    )
 
     executed_task_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4)
     task_id = Column(UUID(as_uuid=True), ForeignKey("scheduled_tasks.scheduled_task_id"), index=True)
-    executed_at = Column(DateTime, default=datetime.now(timezone.utc))
+    # Part of the primary key because PostgreSQL requires the partition key in it
+    executed_at = Column(DateTime, primary_key=True, default=utc_now)
     status = Column(String, nullable=False)
     result = Column(String, nullable=False)
 
     task = relationship("ScheduledTask", back_populates="results")
+
+
+class ExecutedTaskRollup(Base):
+    __tablename__ = "executed_task_rollups"
+
+    task_id = Column(UUID(as_uuid=True), primary_key=True)
+    day = Column(Date, primary_key=True)
+    status = Column(String, primary_key=True)
+    count = Column(Integer, nullable=False)
+    first_executed_at = Column(DateTime, nullable=False)
+    last_executed_at = Column(DateTime, nullable=False)
@@ -0,0 +1,52 @@
+import base64
+import json
+from datetime import datetime
+from uuid import UUID
+
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Query
+
+from job_scheduler.exceptions import InvalidCursor
+
+
+def encode_cursor(position: datetime, row_id: UUID) -> str:
+    payload = json.dumps([position.isoformat(), str(row_id)]).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    try:
+        payload = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        position, row_id = json.loads(payload)
+        return datetime.fromisoformat(position), UUID(row_id)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor() from e
+
+
+def page_statement(statement, position_column, id_column, skip: int, limit: int, after: str | None):
+    """Restricts a `Query` or `Select` to one page ordered by (position, id).
+
+    With `after` the page starts right behind the cursor (keyset pagination) and `skip` is ignored,
+    so deep pages cost the same as the first one.
+    """
+    statement = statement.order_by(position_column, id_column)
+    if after:
+        statement = statement.filter(tuple_(position_column, id_column) > decode_cursor(after))
+    else:
+        statement = statement.offset(skip)
+
+    return statement.limit(limit)
+
+
+def get_next_cursor(rows: list, position_column, id_column, limit: int) -> str | None:
+    if not rows or len(rows) < limit:
+        return None
+
+    last = rows[-1]
+    return encode_cursor(getattr(last, position_column.key), getattr(last, id_column.key))
+
+
+def paginate(query: Query, position_column, id_column, skip: int, limit: int, after: str | None):
+    """Returns one page of `query` and the cursor of the following page."""
+    rows = page_statement(query, position_column, id_column, skip=skip, limit=limit, after=after).all()
+    return rows, get_next_cursor(rows, position_column, id_column, limit)
@@ -1,23 +1,208 @@
-from datetime import datetime, timezone
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
 
-from core.models import ScheduledTask
-from core.tasks import schedule_task
+from apscheduler.jobstores.base import JobLookupError
+from redis import RedisError
+from sqlalchemy import ColumnElement, exists, or_, select
+
+from core.catch_up import catch_up_missed_fires
+from core.models import ScheduledTask, utc_now
+from core.sharding import replica_membership
+from core.tasks import (
+    INTERNAL_JOB_PREFIX,
+    JOB_OPTIONS,
+    add_task_job,
+    get_task_trigger,
+    handler_pool,
+    scheduler,
+)
+from job_scheduler.config import settings
 from job_scheduler.database import SessionLocal
 from job_scheduler.logger import logger
+from job_scheduler.redis_client import redis_client
+
+RECONCILED_AT_KEY = "scheduler:reconciled-at"
+# Tasks stamped shortly before a reconcile may commit after it started
+RECONCILE_MARGIN = timedelta(minutes=1)
+
+
+def recover_task(task) -> bool:
+    try:
+        add_task_job(task, get_task_trigger(task))
+        return True
+    except Exception as e:
+        logger.error(f"Failed to recover task {task.slug}: {e}")
+        return False
+
 
+def recover_scheduled_tasks(skip: frozenset[str] = frozenset(), condition: ColumnElement[bool] | None = None):
+    """Streams the scheduled tasks in chunks and re-registers the ones this replica owns with the scheduler.
 
-def recover_scheduled_tasks():
+    Only the columns needed to build a job are loaded. Each chunk is handed to the worker pool
+    while the next one is being fetched from the database. Tasks in `skip`, or not matching `condition`,
+    are left untouched.
+    """
     db = SessionLocal()
-    now = datetime.now(timezone.utc)
+    started_at = time.perf_counter()
+    outcomes = Counter()
 
     try:
-        tasks = db.query(ScheduledTask).all()
+        statement = select(
+            ScheduledTask.scheduled_task_id,
+            ScheduledTask.slug,
+            ScheduledTask.name,
+            ScheduledTask.cron_expression,
+            ScheduledTask.paused,
+            ScheduledTask.jitter_seconds,
+            ScheduledTask.priority,
+            *(getattr(ScheduledTask, option) for option in JOB_OPTIONS),
+        )
+        if condition is not None:
+            statement = statement.where(condition)
+        rows = db.execute(statement.execution_options(yield_per=settings.recovery_chunk_size))
+
+        with ThreadPoolExecutor(max_workers=settings.recovery_workers, thread_name_prefix="task-recovery") as pool:
+            pending = None
+            for chunk in rows.partitions():
+                owned = [row for row in chunk if row.slug not in skip and replica_membership.owns(row.slug)]
+                submitted = pool.map(recover_task, owned)
+
+                if pending is not None:
+                    outcomes.update(pending)
+                    logger.info(f"Recovered {outcomes[True]} tasks so far ({outcomes[False]} failed)")
+
+                pending = submitted
+
+            if pending is not None:
+                outcomes.update(pending)
+    finally:
+        db.close()
+
+    elapsed = time.perf_counter() - started_at
+    logger.info(f"Recovered {outcomes[True]} tasks ({outcomes[False]} failed) in {elapsed:.2f}s")
+
+
+def rebalance_scheduled_tasks():
+    """Drops the jobs this replica no longer owns and recovers the tasks it took over."""
+    scheduled = frozenset(job.id for job in scheduler.get_jobs() if not job.id.startswith(INTERNAL_JOB_PREFIX))
+
+    released = [task_slug for task_slug in scheduled if not replica_membership.owns(task_slug)]
+    for task_slug in released:
+        try:
+            scheduler.remove_job(task_slug)
+        except JobLookupError:
+            pass
+    logger.info(f"Released {len(released)} tasks to other replicas")
+
+    recover_scheduled_tasks(skip=scheduled)
+    # Tasks taken over from a replica that left may have missed fires since it stopped
+    catch_up_missed_fires()
+
+
+def find_missing_tasks(task_slugs: list[str]) -> set[str]:
+    """Returns the slugs in `task_slugs` that no task has, looked up in chunks of `RECOVERY_CHUNK_SIZE`."""
+    missing = set()
+    db = SessionLocal()
+    try:
+        for start in range(0, len(task_slugs), settings.recovery_chunk_size):
+            chunk = task_slugs[start : start + settings.recovery_chunk_size]
+            found = db.scalars(select(ScheduledTask.slug).where(ScheduledTask.slug.in_(chunk))).all()
+            missing.update(set(chunk) - set(found))
+    finally:
+        db.close()
+    return missing
 
-        for task in tasks:
+
+class OwnedTaskSync:
+    """Applies the task changes this replica may have missed to its jobs, as published task events can be lost.
+
+    Pub/sub delivers at most once, so an event published while the owner was reconnecting is gone. Each sync
+    re-adds the owned tasks whose config changed since the previous one, and removes the jobs whose task was missing on two
+    consecutive syncs: a task is scheduled before its creation commits, so a single miss may be a task in flight.
+    """
+
+    def __init__(self):
+        # Changes before the replica started are applied by the startup recovery
+        self.synced_at = utc_now()
+        self.missing: set[str] = set()
+
+    def sync(self):
+        started_at = utc_now()
+        scheduled = [job.id for job in scheduler.get_jobs() if not job.id.startswith(INTERNAL_JOB_PREFIX)]
+        missing = find_missing_tasks(scheduled)
+
+        removed = missing & self.missing
+        for task_slug in removed:
+            handler_pool.cancel(task_slug)
             try:
-                schedule_task(task)
-                logger.info(f"Recovered task {task.slug} ({task.name})")
-            except Exception as e:
-                logger.error(f"Failed to recover task {task.slug}: {e}")
+                scheduler.remove_job(task_slug)
+            except JobLookupError:
+                pass
+        self.missing = missing - removed
+        if removed:
+            logger.warning(f"Removed {len(removed)} jobs of deleted tasks missed by this replica")
+
+        # Tasks that only fired since keep their job, so their upcoming fires are not dropped by a replacement
+        recover_scheduled_tasks(condition=ScheduledTask.config_changed_at > self.synced_at - RECONCILE_MARGIN)
+        self.synced_at = started_at
+
+
+owned_task_sync = OwnedTaskSync()
+
+
+def get_reconciled_at() -> datetime | None:
+    try:
+        reconciled_at = redis_client.get(RECONCILED_AT_KEY)
+    except RedisError as e:
+        logger.warning(f"Failed to read the last reconcile time, recovering every task: {e}")
+        return None
+    return datetime.fromisoformat(reconciled_at.decode()) if reconciled_at else None
+
+
+def set_reconciled_at(reconciled_at: datetime):
+    try:
+        redis_client.set(RECONCILED_AT_KEY, reconciled_at.isoformat())
+    except RedisError as e:
+        logger.warning(f"Failed to store the reconcile time: {e}")
+
+
+def reconcile_scheduled_tasks():
+    """Applies the tasks added, changed or removed since the last reconcile to the persistent job store.
+
+    Jobs without a task and tasks without a job are found with anti-joins against the job store table.
+    Changed tasks are the ones whose `config_changed_at` is after the last reconcile, so tasks that only fired are
+    not re-applied; without a last reconcile every task is recovered.
+    """
+    started_at = utc_now()
+    jobs = scheduler._lookup_jobstore("default").jobs_t
+    reconciled_at = get_reconciled_at()
+
+    db = SessionLocal()
+    try:
+        removed = db.scalars(
+            select(jobs.c.id).where(
+                ~jobs.c.id.startswith(INTERNAL_JOB_PREFIX),
+                ~exists().where(ScheduledTask.slug == jobs.c.id),
+            )
+        ).all()
     finally:
         db.close()
+
+    for task_slug in removed:
+        try:
+            scheduler.remove_job(task_slug)
+        except JobLookupError:
+            pass
+    logger.info(f"Removed {len(removed)} jobs of deleted tasks")
+
+    condition = None
+    if reconciled_at is not None:
+        condition = or_(
+            ~exists().where(jobs.c.id == ScheduledTask.slug),
+            ScheduledTask.config_changed_at > reconciled_at - RECONCILE_MARGIN,
+        )
+    recover_scheduled_tasks(condition=condition)
+
+    set_reconciled_at(started_at)
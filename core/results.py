@@ -0,0 +1,188 @@
+import multiprocessing
+import os
+import threading
+from collections import Counter
+from datetime import datetime
+from multiprocessing.util import Finalize
+from uuid import UUID
+
+from sqlalchemy import insert, select, update
+
+from core.counters import increment_result_counts
+from core.models import ExecutedTask, ScheduledTask, utc_now
+from core.results_cache import invalidate_pages
+from job_scheduler.config import settings
+from job_scheduler.constants import ResultStatus
+from job_scheduler.database import SessionLocal
+from job_scheduler.logger import logger
+from job_scheduler.metrics import result_flush_seconds, results_dropped_total
+
+
+class ResultSink:
+    """Buffers `ExecutedTask` rows and `next_run_at` updates in memory and writes them in bulk.
+
+    A flush happens when `flush_size` rows are buffered, every `flush_interval` seconds and on `close()`.
+    Flushing runs on a background thread, so callers of `add()` never wait for a commit. Rows of failed flushes
+    are kept for the next one, but at most `max_size` rows are buffered: past it the oldest rows are dropped,
+    so an outage of the DB costs the oldest results instead of the process's memory.
+    """
+
+    def __init__(self, flush_size: int, flush_interval: float, max_size: int):
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.max_size = max_size
+
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._results: list[dict] = []
+        self._next_runs: dict[UUID, datetime] = {}
+        self._slugs: dict[UUID, str] = {}
+
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._pid: int | None = None
+        # Set by `close()`, fires finishing after it write their row right away instead of restarting the thread
+        self._closed = False
+
+    def add(
+        self,
+        task_id: UUID,
+        status: ResultStatus,
+        result: str,
+        next_run_at: datetime | None = None,
+        task_slug: str | None = None,
+    ):
+        with self._lock:
+            self._results.append({"task_id": task_id, "executed_at": utc_now(), "status": status, "result": result})
+            if task_slug is not None:
+                self._slugs[task_id] = task_slug
+            if next_run_at is not None:
+                self._next_runs[task_id] = next_run_at
+            self._drop_overflow()
+            is_full = len(self._results) >= self.flush_size
+            closed = self._closed
+
+        if closed:
+            logger.warning(f"Result of task {task_slug or task_id} added after the result sink closed, writing it")
+            self.flush()
+            return
+
+        self._start()
+        if is_full:
+            self._wakeup.set()
+
+    def flush(self):
+        with self._flush_lock:
+            with self._lock:
+                results, self._results = self._results, []
+                next_runs, self._next_runs = self._next_runs, {}
+                slugs, self._slugs = self._slugs, {}
+
+            if not results and not next_runs:
+                return
+
+            try:
+                self._write(results, next_runs)
+            except Exception as e:
+                logger.error(f"Failed to flush {len(results)} results, retrying without deleted tasks: {e}")
+                try:
+                    self._write(*self._without_deleted_tasks(results, next_runs))
+                except Exception as e:
+                    logger.critical(f"Failed to flush {len(results)} results, requeueing them: {e}")
+                    self._requeue(results, next_runs, slugs)
+                    return
+
+            invalidate_pages(slugs.values())
+
+    def open(self):
+        self._closed = False
+
+    def close(self):
+        self._closed = True
+        self._stopped.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    def _start(self):
+        # A forked worker process inherits the thread object but not the running thread
+        if self._closed or (self._thread is not None and self._pid == os.getpid()):
+            return
+
+        with self._lock:
+            if not self._closed and (self._thread is None or self._pid != os.getpid()):
+                self._pid = os.getpid()
+                self._stopped.clear()
+                self._thread = threading.Thread(target=self._run, name="result-sink", daemon=True)
+                self._thread.start()
+                if multiprocessing.parent_process() is not None:
+                    # Executor worker processes exit without the app's shutdown, flush their rows when they do
+                    Finalize(self, self.close, exitpriority=10)
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+    @result_flush_seconds.time()
+    def _write(self, results: list[dict], next_runs: dict[UUID, datetime]):
+        db = SessionLocal()
+        try:
+            if results:
+                db.execute(insert(ExecutedTask), results)
+            if next_runs:
+                db.execute(
+                    update(ScheduledTask),
+                    [{"scheduled_task_id": task_id, "next_run_at": run_at} for task_id, run_at in next_runs.items()],
+                )
+            db.commit()
+            increment_result_counts(Counter(row["task_id"] for row in results))
+            logger.debug(f"Flushed {len(results)} results and {len(next_runs)} next runs")
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _without_deleted_tasks(self, results: list[dict], next_runs: dict[UUID, datetime]):
+        task_ids = {row["task_id"] for row in results} | set(next_runs)
+
+        db = SessionLocal()
+        try:
+            existing = set(
+                db.scalars(select(ScheduledTask.scheduled_task_id).where(ScheduledTask.scheduled_task_id.in_(task_ids)))
+            )
+        finally:
+            db.close()
+
+        return (
+            [row for row in results if row["task_id"] in existing],
+            {task_id: run_at for task_id, run_at in next_runs.items() if task_id in existing},
+        )
+
+    def _requeue(self, results: list[dict], next_runs: dict[UUID, datetime], slugs: dict[UUID, str]):
+        with self._lock:
+            self._results[:0] = results
+            self._slugs.update(slugs)
+            for task_id, run_at in next_runs.items():
+                self._next_runs.setdefault(task_id, run_at)
+            self._drop_overflow()
+
+    def _drop_overflow(self):
+        # Called with `_lock` held
+        overflow = len(self._results) - self.max_size
+        if overflow > 0:
+            del self._results[:overflow]
+            results_dropped_total.inc(overflow)
+            logger.error(f"Result buffer is full, dropped the {overflow} oldest results")
+
+
+result_sink = ResultSink(
+    flush_size=settings.result_flush_size,
+    flush_interval=settings.result_flush_interval,
+    max_size=settings.result_buffer_max_size,
+)
@@ -0,0 +1,71 @@
+from redis import RedisError
+
+from core.schemas import PaginatedExecutedTasks
+from job_scheduler.config import settings
+from job_scheduler.logger import logger
+from job_scheduler.redis_client import redis_client
+
+
+def get_version_key(task_slug: str) -> str:
+    return f"results-cache:{task_slug}:version"
+
+
+def get_page_key(task_slug: str, version: int, skip: int, limit: int, include_count: bool) -> str:
+    return f"results-cache:{task_slug}:{version}:{skip}:{limit}:{int(include_count)}"
+
+
+def is_cacheable(skip: int, after: str | None) -> bool:
+    """Only the first pages are cached, they are the ones dashboards poll."""
+    return settings.results_cache_ttl > 0 and after is None and skip < settings.results_cache_max_skip
+
+
+def get_cached_page(task_slug: str, skip: int, limit: int, include_count: bool):
+    """Returns the cached page (or None) and the version a freshly built page must be stored under.
+
+    Invalidation bumps the version, so a page built while results were being written is stored under a
+    stale version and never served.
+    """
+    try:
+        version = int(redis_client.get(get_version_key(task_slug)) or 0)
+        page = redis_client.get(get_page_key(task_slug, version, skip, limit, include_count))
+    except RedisError as e:
+        logger.warning(f"Failed to read cached results of task {task_slug}: {e}")
+        return None, None
+
+    return (PaginatedExecutedTasks.model_validate_json(page) if page else None), version
+
+
+def store_page(task_slug: str, version: int, skip: int, limit: int, include_count: bool, page: PaginatedExecutedTasks):
+    ttl = settings.results_cache_ttl
+    try:
+        pipe = redis_client.pipeline(transaction=False)
+        pipe.set(get_page_key(task_slug, version, skip, limit, include_count), page.model_dump_json(), ex=ttl)
+        # The version must outlive its pages, otherwise it could restart at a version whose pages still exist
+        pipe.expire(get_version_key(task_slug), 2 * ttl)
+        pipe.execute()
+    except RedisError as e:
+        logger.warning(f"Failed to cache results of task {task_slug}: {e}")
+
+
+def invalidate_pages(task_slugs):
+    task_slugs = set(task_slugs)
+    if not task_slugs or settings.results_cache_ttl <= 0:
+        return
+
+    try:
+        pipe = redis_client.pipeline(transaction=False)
+        for task_slug in task_slugs:
+            pipe.incr(get_version_key(task_slug))
+            pipe.expire(get_version_key(task_slug), 2 * settings.results_cache_ttl)
+        pipe.execute()
+    except RedisError as e:
+        logger.warning(f"Failed to invalidate cached results of {len(task_slugs)} tasks: {e}")
+
+
+def clear_cache():
+    try:
+        keys = list(redis_client.scan_iter("results-cache:*", count=1000))
+        if keys:
+            redis_client.delete(*keys)
+    except RedisError as e:
+        logger.warning(f"Failed to clear cached results: {e}")
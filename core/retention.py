@@ -0,0 +1,236 @@
+import re
+from datetime import date, datetime, time, timedelta
+
+from sqlalchemy import and_, delete, func, insert, literal, select, text
+from sqlalchemy.orm import Session
+
+from core.counters import remove_result_counts
+from core.models import ExecutedTask, ExecutedTaskRollup, ScheduledTask, utc_now
+from job_scheduler.config import settings
+from job_scheduler.database import SessionLocal
+from job_scheduler.logger import logger
+
+PARTITION_NAME = re.compile(rf"^{ExecutedTask.__tablename__}_p(\d{{8}})$")
+# Receives the results of days without a partition, so inserts keep working if maintenance stalls
+DEFAULT_PARTITION = f"{ExecutedTask.__tablename__}_default"
+# Key of the advisory lock replicas take to create partitions, so they do not create the same one together
+PARTITION_LOCK_KEY = 7_301_922
+
+
+def uses_partitions(db: Session) -> bool:
+    return db.get_bind().dialect.name == "postgresql"
+
+
+def get_partition_name(day: date) -> str:
+    return f"{ExecutedTask.__tablename__}_p{day:%Y%m%d}"
+
+
+def day_start(day: date) -> datetime:
+    return datetime.combine(day, time.min)
+
+
+def list_partitions(db: Session) -> dict[date, str]:
+    names = db.scalars(
+        text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class parent ON pg_inherits.inhparent = parent.oid "
+            "JOIN pg_class child ON pg_inherits.inhrelid = child.oid "
+            "WHERE parent.relname = :table"
+        ),
+        {"table": ExecutedTask.__tablename__},
+    )
+
+    partitions = {}
+    for name in names:
+        match = PARTITION_NAME.match(name)
+        if match:
+            partitions[datetime.strptime(match.group(1), "%Y%m%d").date()] = name
+    return partitions
+
+
+def ensure_partitions(db: Session, today: date):
+    """Creates the daily partitions from yesterday (for late results) to `RESULT_PARTITIONS_AHEAD_DAYS` ahead.
+
+    Results of the day already written to the DEFAULT partition are moved into the new partition before it is
+    attached, as PostgreSQL refuses to attach a partition whose rows the DEFAULT partition holds. Each partition
+    is created under an advisory lock, and skipped if another replica created it while this one waited for the lock.
+    """
+    if not uses_partitions(db):
+        return
+
+    table = ExecutedTask.__tablename__
+    existing = list_partitions(db)
+    for offset in range(-1, settings.result_partitions_ahead_days + 1):
+        day = today + timedelta(days=offset)
+        if day in existing:
+            continue
+
+        db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": PARTITION_LOCK_KEY})
+        if day in list_partitions(db):
+            db.commit()
+            continue
+
+        name = get_partition_name(day)
+        bounds = {"start": day_start(day), "end": day_start(day + timedelta(days=1))}
+        # Attaching locks the DEFAULT partition anyway, taking the lock first keeps rows from landing in it meanwhile
+        db.execute(text(f"LOCK TABLE {DEFAULT_PARTITION} IN ACCESS EXCLUSIVE MODE"))
+        db.execute(text(f"CREATE TABLE {name} (LIKE {table} INCLUDING DEFAULTS)"))
+        db.execute(
+            text(
+                f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} "
+                f"WHERE executed_at >= :start AND executed_at < :end RETURNING *) "
+                f"INSERT INTO {name} SELECT * FROM moved"
+            ),
+            bounds,
+        )
+        db.execute(
+            text(
+                f"ALTER TABLE {table} ATTACH PARTITION {name} FOR VALUES FROM ('{bounds['start']}') TO ('{bounds['end']}')"
+            )
+        )
+        db.commit()
+        logger.info(f"Created result partition for {day}")
+
+
+def get_oldest_result_day(db: Session) -> date | None:
+    if uses_partitions(db):
+        days = list(list_partitions(db))
+        oldest = db.scalar(text(f"SELECT min(executed_at) FROM {DEFAULT_PARTITION}"))
+        if oldest:
+            days.append(oldest.date())
+        return min(days, default=None)
+
+    oldest = db.scalar(select(func.min(ExecutedTask.executed_at)))
+    return oldest.date() if oldest else None
+
+
+def rollup_day(db: Session, day: date):
+    """Summarizes the raw results of `day` per task and status.
+
+    Only tasks that still have raw results that day are summarized again, so summaries of tasks whose raw
+    results already expired are kept.
+    """
+    in_day = and_(ExecutedTask.executed_at >= day_start(day), ExecutedTask.executed_at < day_start(day) + timedelta(1))
+
+    db.execute(
+        delete(ExecutedTaskRollup).where(
+            ExecutedTaskRollup.day == day,
+            ExecutedTaskRollup.task_id.in_(select(ExecutedTask.task_id).where(in_day).distinct()),
+        )
+    )
+    db.execute(
+        insert(ExecutedTaskRollup).from_select(
+            ["task_id", "day", "status", "count", "first_executed_at", "last_executed_at"],
+            select(
+                ExecutedTask.task_id,
+                literal(day, ExecutedTaskRollup.day.type),
+                ExecutedTask.status,
+                func.count(),
+                func.min(ExecutedTask.executed_at),
+                func.max(ExecutedTask.executed_at),
+            )
+            .where(in_day)
+            .group_by(ExecutedTask.task_id, ExecutedTask.status),
+        )
+    )
+
+
+def rollup_results(db: Session, today: date):
+    """Rolls up every finished day since the last rolled up one."""
+    last_rolled_up = db.scalar(select(func.max(ExecutedTaskRollup.day)))
+    day = last_rolled_up + timedelta(days=1) if last_rolled_up else get_oldest_result_day(db)
+
+    while day is not None and day < today:
+        rollup_day(db, day)
+        day += timedelta(days=1)
+
+    db.commit()
+
+
+def expire_results(db: Session, today: date):
+    """Removes raw results past their retention, after rolling them up one last time for late results."""
+    expired = False
+    if settings.result_retention_days:
+        cutoff = today - timedelta(days=settings.result_retention_days)
+
+        day = get_oldest_result_day(db)
+        while day is not None and day < cutoff:
+            rollup_day(db, day)
+            day += timedelta(days=1)
+
+        if uses_partitions(db):
+            for day, name in sorted(list_partitions(db).items()):
+                if day < cutoff:
+                    db.execute(text(f"DROP TABLE IF EXISTS {name}"))
+                    logger.info(f"Dropped result partition for {day}")
+            # Only holds the results of days that had no partition, usually none
+            db.execute(
+                text(f"DELETE FROM {DEFAULT_PARTITION} WHERE executed_at < :cutoff"), {"cutoff": day_start(cutoff)}
+            )
+        else:
+            db.execute(delete(ExecutedTask).where(ExecutedTask.executed_at < day_start(cutoff)))
+        expired = True
+
+    db.commit()
+    if expire_task_results(db, today):
+        expired = True
+
+    # Result counts are recounted on their next read
+    if expired:
+        remove_result_counts()
+
+
+def expire_task_results(db: Session, today: date) -> bool:
+    """Deletes the raw results of tasks whose `retention_days` is shorter than the global retention.
+
+    Unlike whole partitions these are row deletes, so they run in batches of `RESULT_EXPIRY_BATCH_SIZE`, each in its
+    own transaction, and stop after `RESULT_EXPIRY_MAX_ROWS` rows; whatever is left is deleted by the next run.
+    Returns whether any row was deleted.
+    """
+    shorter_retention = ScheduledTask.retention_days.isnot(None)
+    if settings.result_retention_days:
+        shorter_retention = and_(shorter_retention, ScheduledTask.retention_days < settings.result_retention_days)
+
+    tasks = db.execute(
+        select(ScheduledTask.scheduled_task_id, ScheduledTask.retention_days).where(shorter_retention)
+    ).all()
+    budget = settings.result_expiry_max_rows
+    for task_id, retention_days in tasks:
+        expired = and_(
+            ExecutedTask.task_id == task_id,
+            ExecutedTask.executed_at < day_start(today - timedelta(days=retention_days)),
+        )
+        while budget > 0:
+            # Walks the (task_id, executed_at) index, so a batch costs the rows it deletes, not the task's history
+            batch = (
+                select(ExecutedTask.executed_task_id)
+                .where(expired)
+                .order_by(ExecutedTask.executed_at)
+                .limit(min(settings.result_expiry_batch_size, budget))
+            )
+            deleted = db.execute(delete(ExecutedTask).where(expired, ExecutedTask.executed_task_id.in_(batch))).rowcount
+            db.commit()
+            budget -= deleted
+            if deleted < settings.result_expiry_batch_size:
+                break
+
+    if budget <= 0:
+        logger.warning(
+            f"Per-task result expiry stopped after {settings.result_expiry_max_rows} rows, resuming next run"
+        )
+    return budget < settings.result_expiry_max_rows
+
+
+def run_result_maintenance(today: date | None = None):
+    today = today or utc_now().date()
+    db = SessionLocal()
+    try:
+        ensure_partitions(db, today)
+        rollup_results(db, today)
+        expire_results(db, today)
+        logger.info(f"Result maintenance for {today} completed")
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Result maintenance failed: {e}")
+    finally:
+        db.close()
@@ -1,39 +1,115 @@
-from datetime import datetime
+from datetime import date, datetime
+from typing import Any
 
-from croniter import CroniterBadCronError, croniter
-from pydantic import BaseModel, field_validator
+from pydantic import BaseModel, Field, field_validator, model_validator
 
-from job_scheduler.constants import ResultStatus
+from core.cron import get_cron_trigger
+from core.handlers import HandlerError, get_handler
+from job_scheduler.config import settings
+from job_scheduler.constants import ResultStatus, TaskPriority
 
 
 class TaskCreate(BaseModel):
     name: str
     cron_expression: str
+    max_instances: int | None = Field(default=None, ge=1)
+    coalesce: bool | None = None
+    misfire_grace_time: int | None = Field(default=None, ge=1)
+    jitter_seconds: int | None = Field(default=None, ge=0)
+    priority: TaskPriority = TaskPriority.Normal
+    handler: str | None = None
+    handler_params: dict[str, Any] | None = None
+    timeout_seconds: int | None = Field(default=None, ge=1)
+    retention_days: int | None = Field(default=None, ge=1)
 
     @field_validator("cron_expression")
     def validate_cron_format(cls, v):
         if v is None:
             return v
         try:
-            croniter(v)
-        except (CroniterBadCronError, ValueError) as e:
+            get_cron_trigger(v)
+        except ValueError as e:
             raise ValueError(f"Invalid cron expression: {v!r}") from e
         return v
 
+    @field_validator("handler")
+    def validate_handler(cls, v):
+        if v is None:
+            return v
+        try:
+            get_handler(v)
+        except HandlerError as e:
+            raise ValueError(str(e)) from e
+        return v
+
+    @model_validator(mode="after")
+    def validate_handler_params(self):
+        handler = get_handler(self.handler)
+        if handler.params_model is not None:
+            handler.params_model.model_validate(self.handler_params or {})
+        # A handler running in a thread cannot be stopped, only the worker processes enforce a timeout
+        if self.timeout_seconds is not None and not (handler.cpu_bound and settings.handler_workers > 0):
+            raise ValueError("timeout_seconds is only supported for CPU-bound handlers run in handler workers")
+        return self
+
+
+class TaskBatchCreate(BaseModel):
+    # Items are validated one by one in the service, so a bad item does not reject the whole batch
+    tasks: list[dict[str, Any]] = Field(..., min_length=1, max_length=settings.task_batch_max_size)
+
 
 class ScheduledTaskRead(BaseModel):
     slug: str
     name: str
     cron_expression: str
     created_at: datetime
-    next_run_at: datetime
+    next_run_at: datetime | None = None
+    paused: bool = False
+    max_instances: int | None = None
+    coalesce: bool | None = None
+    misfire_grace_time: int | None = None
+    jitter_seconds: int | None = None
+    priority: TaskPriority = TaskPriority.Normal
+    handler: str | None = None
+    handler_params: dict[str, Any] | None = None
+    timeout_seconds: int | None = None
+    retention_days: int | None = None
 
     model_config = {"from_attributes": True}
 
 
-class PaginatedScheduledTasks(BaseModel):
+class TaskBatchError(BaseModel):
+    index: int
+    errors: list[str]
+
+
+class TaskBatchResult(BaseModel):
+    created: list[ScheduledTaskRead]
+    errors: list[TaskBatchError]
+
+
+class TaskSelection(BaseModel):
+    """Tasks targeted by a bulk action: the given slugs, the names containing `name_contains`, or both."""
+
+    slugs: list[str] | None = Field(default=None, min_length=1, max_length=settings.task_batch_max_size)
+    name_contains: str | None = Field(default=None, min_length=1)
+
+    @model_validator(mode="after")
+    def validate_not_empty(self):
+        if self.slugs is None and self.name_contains is None:
+            raise ValueError("Either slugs or name_contains is required")
+        return self
+
+
+class TaskBulkResult(BaseModel):
     count: int
+    slugs: list[str]
+
+
+class PaginatedScheduledTasks(BaseModel):
+    count: int | None
     result: list[ScheduledTaskRead]
+    next_cursor: str | None = None
 
 
 class ExecutedTaskRead(BaseModel):
@@ -45,5 +121,64 @@ class ExecutedTaskRead(BaseModel):
 
 
 class PaginatedExecutedTasks(BaseModel):
-    count: int
+    count: int | None
     result: list[ExecutedTaskRead]
+    next_cursor: str | None = None
+
+
+class DailyTaskResults(BaseModel):
+    day: date
+    status: ResultStatus
+    count: int
+    first_executed_at: datetime
+    last_executed_at: datetime
+
+    model_config = {"from_attributes": True}
+
+
+class TaskUpcoming(BaseModel):
+    slug: str
+    paused: bool
+    # Empty while the task is paused
+    fire_times: list[datetime]
+
+
+class ForecastBucket(BaseModel):
+    start: datetime
+    fires: int
+
+
+class ScheduleForecast(BaseModel):
+    start: datetime
+    end: datetime
+    bucket_seconds: int
+    tasks: int
+    fires: int
+    buckets: list[ForecastBucket]
+
+
+class ExecutorStats(BaseModel):
+    executor: str
+    max_workers: int
+    active_workers: int
+    queued: int
+    missed_fires: int
+
+
+class DispatchStats(BaseModel):
+    max_concurrency: int
+    active: int
+    queued: dict[TaskPriority, int]
+
+
+class CronCacheStats(BaseModel):
+    hits: int
+    misses: int
+    size: int
+    max_size: int
+
+
+class SchedulerStats(BaseModel):
+    executor: ExecutorStats
+    dispatch: DispatchStats
+    cron_cache: CronCacheStats
@@ -1,23 +1,91 @@
+from datetime import datetime, timedelta
+from uuid import UUID, uuid4
+
 from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy import (
+    ColumnElement,
+    and_,
+    case,
+    delete,
+    func,
+    insert,
+    select,
+    union_all,
+    update,
+)
 from sqlalchemy.orm import Session
 
-from core.models import ScheduledTask
-from core.schemas import PaginatedExecutedTasks, PaginatedScheduledTasks, TaskCreate
-from core.tasks import ExecutedTask, remove_task, schedule_task
+from core.counters import (
+    get_result_count,
+    get_task_count,
+    increment_task_count,
+    remove_result_counts,
+    set_result_count,
+    set_task_count,
+)
+from core.cron import get_cron_cache_stats, get_cron_trigger
+from core.export import MEDIA_TYPES, export_results, to_utc
+from core.forecast import ForecastGroup, forecast_fires, get_upcoming_fire_times
+from core.models import (
+    ExecutedTask,
+    ExecutedTaskRollup,
+    ScheduledTask,
+    generate_slug,
+    utc_now,
+)
+from core.pagination import paginate
+from core.results_cache import (
+    get_cached_page,
+    invalidate_pages,
+    is_cacheable,
+    store_page,
+)
+from core.schemas import (
+    DailyTaskResults,
+    ForecastBucket,
+    PaginatedExecutedTasks,
+    PaginatedScheduledTasks,
+    ScheduledTaskRead,
+    ScheduleForecast,
+    SchedulerStats,
+    TaskBatchError,
+    TaskBatchResult,
+    TaskBulkResult,
+    TaskCreate,
+    TaskSelection,
+    TaskUpcoming,
+)
+from core.slug_cache import slug_cache
+from core.tasks import (
+    JOB_OPTIONS,
+    fire_dispatcher,
+    get_executor_stats,
+    get_task_next_run_at,
+    get_task_offset,
+    pause_task_jobs,
+    remove_task,
+    remove_tasks,
+    resume_task_jobs,
+    schedule_task,
+    schedule_tasks,
+)
+from job_scheduler.config import settings
+from job_scheduler.constants import ExportFormat
 from job_scheduler.exceptions import (
+    InvalidForecastWindow,
     TaskCreationFailed,
     TaskDeletionFailed,
     TaskNotFound,
+    TaskUpdateFailed,
 )
 from job_scheduler.logger import logger
 
 
 def create_task(db: Session, task_data: TaskCreate):
     try:
-        task = ScheduledTask(
-            name=task_data.name,
-            cron_expression=task_data.cron_expression,
-        )
+        task = ScheduledTask(**task_data.model_dump())
 
         db.add(task)
         db.flush()
@@ -26,6 +94,7 @@ def create_task(db: Session, task_data: TaskCreate):
         schedule_task(task)
 
         db.commit()
+        increment_task_count(1)
 
         logger.info(f"Created and scheduled task {task.slug} ({task.name})")
         return task
@@ -36,12 +105,99 @@ def create_task(db: Session, task_data: TaskCreate):
         raise TaskCreationFailed()
 
 
-def list_tasks(db: Session, skip: int, limit: int):
+def build_tasks(items: list[dict]) -> tuple[list[ScheduledTask], list[TaskBatchError]]:
+    tasks: list[ScheduledTask] = []
+    errors: list[TaskBatchError] = []
+    created_at = utc_now()
+
+    for index, item in enumerate(items):
+        try:
+            task_data = TaskCreate.model_validate(item)
+        except ValidationError as e:
+            errors.append(TaskBatchError(index=index, errors=[error["msg"] for error in e.errors()]))
+            continue
+
+        tasks.append(
+            ScheduledTask(
+                scheduled_task_id=uuid4(),
+                slug=generate_slug(),
+                created_at=created_at,
+                updated_at=created_at,
+                config_changed_at=created_at,
+                paused=False,
+                **task_data.model_dump(),
+            )
+        )
+
+    return tasks, errors
+
+
+def get_task_rows(tasks: list[ScheduledTask]) -> list[dict]:
+    return [{column.key: getattr(task, column.key) for column in ScheduledTask.__table__.columns} for task in tasks]
+
+
+def create_tasks(db: Session, items: list[dict]):
+    tasks, errors = build_tasks(items)
+
+    if not tasks:
+        return TaskBatchResult(created=[], errors=errors)
+
+    try:
+        schedule_tasks(tasks)
+
+        db.execute(insert(ScheduledTask), get_task_rows(tasks))
+        db.commit()
+        increment_task_count(len(tasks))
+
+        logger.info(f"Created and scheduled {len(tasks)} tasks ({len(errors)} rejected)")
+        return TaskBatchResult(created=[ScheduledTaskRead.model_validate(task) for task in tasks], errors=errors)
+
+    except Exception as e:
+        db.rollback()
+        remove_tasks([task.slug for task in tasks])
+        logger.error(f"Failed to create/schedule task batch: {e}")
+        raise TaskCreationFailed()
+
+
+def count_tasks(db: Session) -> int:
+    count = get_task_count()
+    if count is None:
+        count = db.query(ScheduledTask).count()
+        set_task_count(count)
+    return count
+
+
+def count_task_results(db: Session, task_id: UUID) -> int:
+    count = get_result_count(task_id)
+    if count is None:
+        count = db.scalar(select(func.count()).select_from(ExecutedTask).where(ExecutedTask.task_id == task_id))
+        set_result_count(task_id, count)
+    return count
+
+
+def resolve_task_id(db: Session, task_slug: str) -> UUID:
+    task_id = slug_cache.get(task_slug)
+    if task_id is None:
+        task_id = db.scalar(select(ScheduledTask.scheduled_task_id).where(ScheduledTask.slug == task_slug))
+        if task_id is None:
+            raise TaskNotFound()
+        slug_cache.set(task_slug, task_id)
+    return task_id
+
+
+def list_tasks(db: Session, skip: int, limit: int, after: str | None = None, include_count: bool = True):
     logger.info("Listing all tasks")
-    tasks = db.query(ScheduledTask).order_by(ScheduledTask.created_at).offset(skip).limit(limit).all()
-    count = db.query(ScheduledTask).count()
+    tasks, next_cursor = paginate(
+        db.query(ScheduledTask),
+        ScheduledTask.created_at,
+        ScheduledTask.scheduled_task_id,
+        skip=skip,
+        limit=limit,
+        after=after,
+    )
+    count = count_tasks(db) if include_count else None
 
-    return PaginatedScheduledTasks(count=count, result=tasks)
+    return PaginatedScheduledTasks(count=count, result=tasks, next_cursor=next_cursor)
 
 
 def delete_task(db: Session, task_slug: str):
@@ -52,8 +208,14 @@ def delete_task(db: Session, task_slug: str):
 
         remove_task(task_slug)
 
+        for statement in get_history_deletes([task.scheduled_task_id]):
+            db.execute(statement)
         db.delete(task)
         db.commit()
+        increment_task_count(-1)
+        remove_result_counts(task.scheduled_task_id)
+        invalidate_pages([task_slug])
+        slug_cache.invalidate(task_slug)
 
         logger.info(f"Deleted task {task_slug} from both DB and scheduler")
         return {"message": f"Task {task_slug} deleted."}
@@ -65,21 +227,263 @@ def delete_task(db: Session, task_slug: str):
         raise TaskDeletionFailed()
 
 
-def list_task_results(db: Session, task_slug: str, skip: int, limit: int):
-    task = db.query(ScheduledTask).filter(ScheduledTask.slug == task_slug).first()
-    if not task:
-        raise TaskNotFound()
+def get_history_deletes(task_ids) -> tuple:
+    """Returns the statements deleting the results and rollups of `task_ids`, a list of ids or a subquery."""
+    return (
+        delete(ExecutedTask).where(ExecutedTask.task_id.in_(task_ids)),
+        delete(ExecutedTaskRollup).where(ExecutedTaskRollup.task_id.in_(task_ids)),
+    )
+
+
+def get_selection_condition(selection: TaskSelection) -> ColumnElement[bool]:
+    conditions = []
+    if selection.slugs is not None:
+        conditions.append(ScheduledTask.slug.in_(selection.slugs))
+    if selection.name_contains is not None:
+        conditions.append(ScheduledTask.name.contains(selection.name_contains, autoescape=True))
+    return and_(*conditions)
+
+
+def pause_tasks(db: Session, selection: TaskSelection) -> TaskBulkResult:
+    try:
+        statement = (
+            update(ScheduledTask)
+            .where(get_selection_condition(selection), ScheduledTask.paused.is_(False))
+            .values(paused=True, next_run_at=None, config_changed_at=utc_now())
+            .returning(ScheduledTask.slug)
+            .execution_options(synchronize_session=False)
+        )
+        slugs = db.scalars(statement).all()
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Failed to pause tasks: {e}")
+        raise TaskUpdateFailed()
+
+    # Jobs are paused in place, so resuming them does not rebuild them
+    pause_task_jobs(slugs)
+    return TaskBulkResult(count=len(slugs), slugs=slugs)
+
+
+def resume_tasks(db: Session, selection: TaskSelection) -> TaskBulkResult:
+    condition = and_(get_selection_condition(selection), ScheduledTask.paused.is_(True))
+    try:
+        # Fires missed while paused are skipped: each cron expression resumes at its next fire from now
+        now = utc_now()
+        cron_expressions = db.scalars(select(ScheduledTask.cron_expression).where(condition).distinct()).all()
+        if not cron_expressions:
+            return TaskBulkResult(count=0, slugs=[])
+        next_runs = {
+            cron_expression: get_cron_trigger(cron_expression).get_next_fire_time(None, now)
+            for cron_expression in cron_expressions
+        }
+
+        statement = (
+            update(ScheduledTask)
+            .where(condition)
+            .values(
+                paused=False,
+                next_run_at=case(next_runs, value=ScheduledTask.cron_expression, else_=None),
+                config_changed_at=now,
+            )
+            .returning(
+                ScheduledTask.scheduled_task_id,
+                ScheduledTask.slug,
+                ScheduledTask.cron_expression,
+                ScheduledTask.jitter_seconds,
+                ScheduledTask.priority,
+                *(getattr(ScheduledTask, option) for option in JOB_OPTIONS),
+            )
+            .execution_options(synchronize_session=False)
+        )
+        tasks = db.execute(statement).all()
+        # Fires delayed by jitter are not shared per cron expression, they are set by primary key
+        jittered = [
+            {"scheduled_task_id": task.scheduled_task_id, "next_run_at": get_task_next_run_at(task)}
+            for task in tasks
+            if get_task_offset(task)
+        ]
+        if jittered:
+            db.execute(update(ScheduledTask), jittered)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Failed to resume tasks: {e}")
+        raise TaskUpdateFailed()
+
+    resume_task_jobs(tasks)
+    return TaskBulkResult(count=len(tasks), slugs=[task.slug for task in tasks])
+
+
+def delete_tasks(db: Session, selection: TaskSelection) -> TaskBulkResult:
+    condition = get_selection_condition(selection)
+    try:
+        for statement in get_history_deletes(select(ScheduledTask.scheduled_task_id).where(condition)):
+            db.execute(statement)
+        statement = (
+            delete(ScheduledTask)
+            .where(condition)
+            .returning(ScheduledTask.scheduled_task_id, ScheduledTask.slug)
+            .execution_options(synchronize_session=False)
+        )
+        tasks = db.execute(statement).all()
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Failed to delete tasks: {e}")
+        raise TaskDeletionFailed()
+
+    slugs = [task.slug for task in tasks]
+    if tasks:
+        remove_tasks(slugs)
+        increment_task_count(-len(tasks))
+        remove_result_counts(*(task.scheduled_task_id for task in tasks))
+        invalidate_pages(slugs)
+        slug_cache.invalidate(*slugs)
+
+    logger.info(f"Deleted {len(tasks)} tasks with their results")
+    return TaskBulkResult(count=len(tasks), slugs=slugs)
+
+
+def list_task_results(
+    db: Session, task_slug: str, skip: int, limit: int, after: str | None = None, include_count: bool = True
+):
+    version = None
+    if is_cacheable(skip, after):
+        page, version = get_cached_page(task_slug, skip, limit, include_count)
+        if page is not None:
+            return page
+
+    task_id = resolve_task_id(db, task_slug)
 
     logger.info(f"Listing (Task {task_slug})'s results")
-    tasks = (
-        db.query(ExecutedTask)
-        .join(ExecutedTask.task)
-        .filter(ScheduledTask.slug == task_slug)
-        .order_by(ExecutedTask.executed_at)
-        .offset(skip)
-        .limit(limit)
-        .all()
+    tasks, next_cursor = paginate(
+        db.query(ExecutedTask).filter(ExecutedTask.task_id == task_id),
+        ExecutedTask.executed_at,
+        ExecutedTask.executed_task_id,
+        skip=skip,
+        limit=limit,
+        after=after,
+    )
+    count = None
+    if include_count:
+        count = count_task_results(db, task_id)
+
+    page = PaginatedExecutedTasks(count=count, result=tasks, next_cursor=next_cursor)
+    if version is not None:
+        store_page(task_slug, version, skip, limit, include_count, page)
+    return page
+
+
+def export_task_results(
+    db: Session,
+    task_slug: str,
+    export_format: ExportFormat,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    compress: bool = False,
+) -> StreamingResponse:
+    # Resolved before streaming starts, so an unknown slug is still answered with a 404
+    task_id = resolve_task_id(db, task_slug)
+
+    logger.info(f"Exporting (Task {task_slug})'s results as {export_format.value}")
+    filename = f"{task_slug}-results.{export_format.value}"
+    media_type = MEDIA_TYPES[export_format]
+    if compress:
+        filename, media_type = f"{filename}.gz", "application/gzip"
+    return StreamingResponse(
+        export_results(task_id, export_format, since, until, compress),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+def list_task_daily_results(db: Session, task_slug: str, days: int) -> list[DailyTaskResults]:
+    task_id = resolve_task_id(db, task_slug)
+
+    logger.info(f"Listing (Task {task_slug})'s daily results")
+    since = utc_now().date() - timedelta(days=days - 1)
+    # Days not rolled up yet (usually only today) are summarized from the raw results
+    last_rolled_up = db.scalar(select(func.max(ExecutedTaskRollup.day)))
+    live_since = max(since, last_rolled_up + timedelta(days=1)) if last_rolled_up else since
+
+    day = func.date(ExecutedTask.executed_at)
+    statement = union_all(
+        select(
+            ExecutedTaskRollup.day,
+            ExecutedTaskRollup.status,
+            ExecutedTaskRollup.count,
+            ExecutedTaskRollup.first_executed_at,
+            ExecutedTaskRollup.last_executed_at,
+        ).where(ExecutedTaskRollup.task_id == task_id, ExecutedTaskRollup.day >= since),
+        select(
+            day,
+            ExecutedTask.status,
+            func.count(),
+            func.min(ExecutedTask.executed_at),
+            func.max(ExecutedTask.executed_at),
+        )
+        .where(ExecutedTask.task_id == task_id, ExecutedTask.executed_at >= live_since)
+        .group_by(day, ExecutedTask.status),
     )
-    count = db.query(ExecutedTask).join(ExecutedTask.task).filter(ScheduledTask.slug == task_slug).count()
+    rows = db.execute(statement.order_by("day", "status")).mappings()
+    return [DailyTaskResults.model_validate(dict(row)) for row in rows]
 
-    return PaginatedExecutedTasks(count=count, result=tasks)
+
+def get_task_upcoming(db: Session, task_slug: str, n: int) -> TaskUpcoming:
+    task = db.execute(
+        select(
+            ScheduledTask.slug, ScheduledTask.cron_expression, ScheduledTask.jitter_seconds, ScheduledTask.paused
+        ).where(ScheduledTask.slug == task_slug)
+    ).first()
+    if task is None:
+        raise TaskNotFound()
+
+    fire_times = []
+    if not task.paused:
+        fire_times = get_upcoming_fire_times(task.cron_expression, get_task_offset(task), utc_now(), n)
+    return TaskUpcoming(slug=task.slug, paused=task.paused, fire_times=fire_times)
+
+
+def get_schedule_forecast(
+    db: Session, start: datetime | None = None, end: datetime | None = None, bucket: int = 60
+) -> ScheduleForecast:
+    start = to_utc(start) if start else utc_now()
+    end = to_utc(end) if end else start + timedelta(days=1)
+    if (
+        end <= start
+        or end - start > timedelta(days=settings.forecast_max_window_days)
+        or (end - start).total_seconds() / bucket > settings.forecast_max_buckets
+    ):
+        raise InvalidForecastWindow()
+
+    # Tasks are counted per cron expression and jitter window, each group is expanded once however many tasks share it
+    rows = db.execute(
+        select(ScheduledTask.cron_expression, ScheduledTask.jitter_seconds, func.count())
+        .where(ScheduledTask.paused.is_(False))
+        .group_by(ScheduledTask.cron_expression, ScheduledTask.jitter_seconds)
+    ).all()
+    groups = [
+        ForecastGroup(cron_expression, settings.fire_jitter_seconds if jitter is None else jitter, count)
+        for cron_expression, jitter, count in rows
+    ]
+
+    logger.info(f"Forecasting fires of {len(groups)} cron groups from {start} to {end}")
+    counts = forecast_fires(groups, start, end, bucket)
+    return ScheduleForecast(
+        start=start,
+        end=end,
+        bucket_seconds=bucket,
+        tasks=sum(group.count for group in groups),
+        fires=round(sum(counts)),
+        buckets=[
+            ForecastBucket(start=start + timedelta(seconds=index * bucket), fires=round(count))
+            for index, count in enumerate(counts)
+        ],
+    )
+
+
+def get_scheduler_stats():
+    return SchedulerStats(
+        executor=get_executor_stats(), dispatch=fire_dispatcher.get_stats(), cron_cache=get_cron_cache_stats()
+    )
@@ -0,0 +1,145 @@
+import bisect
+import hashlib
+import json
+import threading
+import time
+from typing import Callable, Iterable
+
+from job_scheduler.config import settings
+from job_scheduler.logger import logger
+from job_scheduler.redis_client import redis_client
+
+REPLICAS_KEY = "scheduler:replicas"
+TASK_EVENTS_CHANNEL = "scheduler:task-events"
+
+
+def _hash(value: str) -> int:
+    return int.from_bytes(hashlib.md5(value.encode()).digest()[:8], "big")
+
+
+class HashRing:
+    """Consistent hash ring: each node owns the keys hashing between its virtual nodes and the previous ones.
+
+    Adding or removing a node only moves the keys of that node, roughly 1/N of them.
+    """
+
+    def __init__(self, nodes: Iterable[str], vnodes: int):
+        self.nodes = frozenset(nodes)
+        self._ring = sorted((_hash(f"{node}#{i}"), node) for node in self.nodes for i in range(vnodes))
+        self._hashes = [point for point, _ in self._ring]
+
+    def get_node(self, key: str) -> str | None:
+        if not self._ring:
+            return None
+        index = bisect.bisect(self._hashes, _hash(key)) % len(self._ring)
+        return self._ring[index][1]
+
+
+class ReplicaMembership:
+    """Registers this replica in Redis with a heartbeated lease and tracks which tasks it owns.
+
+    Members are kept in a sorted set scored by lease expiry; replicas that stop heartbeating drop out
+    once their lease expires. When sharding is disabled the replica owns every task.
+    """
+
+    def __init__(
+        self,
+        replica_id: str,
+        enabled: bool,
+        heartbeat_interval: float,
+        lease_ttl: float,
+        vnodes: int,
+        key: str = REPLICAS_KEY,
+        channel: str = TASK_EVENTS_CHANNEL,
+    ):
+        self.replica_id = replica_id
+        self.enabled = enabled
+        self.heartbeat_interval = heartbeat_interval
+        self.lease_ttl = lease_ttl
+        self.vnodes = vnodes
+        self.key = key
+        self.channel = channel
+
+        self.ring = HashRing([replica_id], vnodes)
+
+        self._stopped = threading.Event()
+        self._threads: list[threading.Thread] = []
+        self._pubsub = None
+
+    def owns(self, task_slug: str) -> bool:
+        return not self.enabled or self.ring.get_node(task_slug) == self.replica_id
+
+    def heartbeat(self) -> bool:
+        """Renews this replica's lease and refreshes the ring. Returns whether membership changed."""
+        now = time.time()
+        pipe = redis_client.pipeline()
+        pipe.zadd(self.key, {self.replica_id: now + self.lease_ttl})
+        pipe.zremrangebyscore(self.key, "-inf", now)
+        pipe.zrange(self.key, 0, -1)
+        members = {member.decode() for member in pipe.execute()[-1]}
+
+        if members == self.ring.nodes:
+            return False
+
+        logger.info(f"Replica membership changed: {sorted(members)}")
+        self.ring = HashRing(members, self.vnodes)
+        return True
+
+    def publish(self, action: str, **payload):
+        if self.enabled:
+            redis_client.publish(self.channel, json.dumps({"action": action, **payload}))
+
+    def start(self, on_change: Callable[[], None], on_event: Callable[[dict], None]):
+        if not self.enabled:
+            return
+
+        self._stopped.clear()
+        self.heartbeat()
+
+        self._pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+        self._pubsub.subscribe(self.channel)
+
+        self._threads = [
+            threading.Thread(target=self._heartbeat_loop, args=(on_change,), name="replica-heartbeat", daemon=True),
+            threading.Thread(target=self._listen_loop, args=(on_event,), name="replica-events", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self):
+        if not self.enabled:
+            return
+
+        self._stopped.set()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+        self._pubsub.close()
+
+        redis_client.zrem(self.key, self.replica_id)
+
+    def _heartbeat_loop(self, on_change: Callable[[], None]):
+        while not self._stopped.wait(self.heartbeat_interval):
+            try:
+                if self.heartbeat():
+                    on_change()
+            except Exception as e:
+                logger.error(f"Replica heartbeat failed: {e}")
+
+    def _listen_loop(self, on_event: Callable[[dict], None]):
+        while not self._stopped.is_set():
+            try:
+                message = self._pubsub.get_message(timeout=1.0)
+                if message:
+                    on_event(json.loads(message["data"]))
+            except Exception as e:
+                logger.error(f"Failed to handle task event: {e}")
+
+
+replica_membership = ReplicaMembership(
+    replica_id=settings.replica_id,
+    enabled=settings.sharding_enabled,
+    heartbeat_interval=settings.replica_heartbeat_interval,
+    lease_ttl=settings.replica_lease_ttl,
+    vnodes=settings.hash_ring_vnodes,
+)
@@ -0,0 +1,51 @@
+import threading
+import time
+from collections import OrderedDict
+from uuid import UUID
+
+from job_scheduler.config import settings
+
+
+class SlugCache:
+    """In-process LRU of slug → task id, so a slug is resolved once instead of on every request.
+
+    Deletes on this replica invalidate the entry right away; `ttl` bounds how long a task deleted through
+    another replica keeps resolving here.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: OrderedDict[str, tuple[UUID, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, task_slug: str) -> UUID | None:
+        with self._lock:
+            entry = self._entries.get(task_slug)
+            if entry is None:
+                return None
+            task_id, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[task_slug]
+                return None
+            self._entries.move_to_end(task_slug)
+            return task_id
+
+    def set(self, task_slug: str, task_id: UUID):
+        with self._lock:
+            self._entries[task_slug] = (task_id, time.monotonic() + self.ttl)
+            self._entries.move_to_end(task_slug)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, *task_slugs: str):
+        with self._lock:
+            for task_slug in task_slugs:
+                self._entries.pop(task_slug, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+slug_cache = SlugCache(max_size=settings.slug_cache_size, ttl=settings.slug_cache_ttl)
@@ -1,119 +1,396 @@
-from datetime import datetime, timezone
-
+import concurrent.futures
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from uuid import UUID
+
+from apscheduler.events import EVENT_JOB_MISSED, JobExecutionEvent
+from apscheduler.jobstores.base import BaseJobStore, JobLookupError
+from apscheduler.jobstores.memory import MemoryJobStore
+from apscheduler.jobstores.sqlalchemy import SQLAlchemyJobStore
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.schedulers.background import BackgroundScheduler
-from apscheduler.triggers.cron import CronTrigger
-from redis.exceptions import LockError
+from apscheduler.schedulers.base import BaseScheduler
+from apscheduler.triggers.base import BaseTrigger
+from redis.exceptions import RedisError
 from sqlalchemy.orm import Session
 
-from core.models import ExecutedTask, ScheduledTask
-from job_scheduler.constants import ResultStatus
-from job_scheduler.database import SessionLocal
+from core.claims import claim_batcher, get_claim_key
+from core.cron import get_fire_offset, get_offset_trigger
+from core.dispatch import PRIORITIES, Fire, FireDispatcher, get_max_concurrency
+from core.engine import (
+    FIRE_TIME_KWARG,
+    CompactExecutor,
+    CompactScheduler,
+    FireTimeProcessPoolExecutor,
+    FireTimeThreadPoolExecutor,
+)
+from core.handlers import HandlerContext, get_handler, import_handler_modules
+from core.models import ScheduledTask
+from core.results import result_sink
+from core.sharding import replica_membership
+from core.worker_pool import HandlerPool
+from job_scheduler.config import settings
+from job_scheduler.constants import (
+    ExecutorType,
+    JobStoreType,
+    ResultStatus,
+    SchedulerEngine,
+    SchedulerType,
+    TaskPriority,
+)
+from job_scheduler.database import SessionLocal, engine
 from job_scheduler.logger import logger
-from job_scheduler.redis_client import redis_client
+from job_scheduler.metrics import (
+    claims_total,
+    create_executed_task_seconds,
+    dispatch_active,
+    dispatch_fires_total,
+    dispatch_queued,
+    execute_task_seconds,
+    executor_active_workers,
+    executor_queued,
+    fire_lag_seconds,
+)
+
+JOB_OPTIONS = ("max_instances", "coalesce", "misfire_grace_time")
+# Jobs that are not tasks, such as maintenance jobs, have ids with this prefix; task slugs never contain ":"
+INTERNAL_JOB_PREFIX = "internal:"
+
+
+def create_job_store() -> BaseJobStore:
+    if settings.scheduler_job_store != JobStoreType.SQLAlchemy:
+        return MemoryJobStore()
+
+    # Settings only allow it with SINGLE_REPLICA, as every scheduler using the table runs every job in it
+    return SQLAlchemyJobStore(engine=engine)
+
+
+def create_compact_scheduler(job_defaults: dict) -> CompactScheduler:
+    if settings.scheduler_job_store != JobStoreType.Memory:
+        logger.warning("The compact engine keeps jobs in memory, ignoring SCHEDULER_JOB_STORE")
+
+    is_process_pool = settings.scheduler_executor == ExecutorType.ProcessPool
+    pool_class = concurrent.futures.ProcessPoolExecutor if is_process_pool else concurrent.futures.ThreadPoolExecutor
+    executor = CompactExecutor(pool_class(settings.scheduler_max_workers))
+    return CompactScheduler(executor=executor, job_defaults=job_defaults)
+
+
+def create_scheduler() -> BaseScheduler | CompactScheduler:
+    job_defaults = {
+        "max_instances": settings.scheduler_max_instances,
+        "coalesce": settings.scheduler_coalesce,
+        "misfire_grace_time": settings.scheduler_misfire_grace_time,
+    }
+    if settings.scheduler_engine == SchedulerEngine.Compact:
+        return create_compact_scheduler(job_defaults)
+
+    is_process_pool = settings.scheduler_executor == ExecutorType.ProcessPool
+    pool_class = FireTimeProcessPoolExecutor if is_process_pool else FireTimeThreadPoolExecutor
+    scheduler_class = AsyncIOScheduler if settings.scheduler_type == SchedulerType.AsyncIO else BackgroundScheduler
+    return scheduler_class(
+        jobstores={"default": create_job_store()},
+        executors={"default": pool_class(settings.scheduler_max_workers)},
+        job_defaults=job_defaults,
+    )
+
+
+def start_scheduler():
+    """Starts the scheduler; the asyncio scheduler must be started from the running event loop of the app."""
+    if not scheduler.running:
+        scheduler.start()
+
+
+def stop_scheduler():
+    """Stops the scheduler and waits for its fires, including the ones queued in the dispatcher meanwhile."""
+    if scheduler.running:
+        scheduler.shutdown(wait=True)
+
+
+scheduler = create_scheduler()
+if settings.scheduler_type == SchedulerType.Background:
+    start_scheduler()
+
+missed_fires = Counter()
+
+import_handler_modules(settings.task_handler_modules)
+# Started by the app's lifespan; until then, and with HANDLER_WORKERS=0, every handler runs in the calling thread
+handler_pool = HandlerPool(size=settings.handler_workers, modules=settings.task_handler_modules)
+
+
+def on_job_missed(event: JobExecutionEvent):
+    missed_fires[event.job_id] += 1
+    logger.warning(f"Task {event.job_id} missed its fire at {event.scheduled_run_time}")
 
-scheduler = BackgroundScheduler()
-scheduler.start()
 
+scheduler.add_listener(on_job_missed, EVENT_JOB_MISSED)
 
-def get_task_for_scheduler(db: Session, task_slug: str) -> ScheduledTask:
+
+def uses_persistent_job_store() -> bool:
+    return isinstance(scheduler._lookup_jobstore("default"), SQLAlchemyJobStore)
+
+
+def get_executor_stats() -> dict:
+    """Returns the size and load of the default executor; fires beyond `max_workers` wait in its queue."""
+    executor = scheduler._lookup_executor("default")
+    in_flight = sum(executor._instances.values())
+    max_workers = settings.scheduler_max_workers
+    return {
+        "executor": settings.scheduler_executor.value,
+        "max_workers": max_workers,
+        "active_workers": min(in_flight, max_workers),
+        "queued": max(in_flight - max_workers, 0),
+        "missed_fires": missed_fires.total(),
+    }
+
+
+executor_active_workers.set_function(lambda: get_executor_stats()["active_workers"])
+executor_queued.set_function(lambda: get_executor_stats()["queued"])
+
+
+def get_task_for_scheduler(db: Session, task_slug: str, task_id: UUID | None = None) -> ScheduledTask:
+    # Jobs added before they carried the task id still resolve the slug
+    if task_id is not None:
+        return db.get(ScheduledTask, task_id)
     return db.query(ScheduledTask).filter(ScheduledTask.slug == task_slug).first()
 
 
 def get_result(task: ScheduledTask) -> str:
-    return f"Task '{task.name}' executed at {datetime.now(timezone.utc)}"
+    """Runs the task's handler and returns its result; CPU-bound handlers run in the handler worker processes.
+
+    Exceptions of the handler, including timeouts and cancellations, are raised to the caller.
+    """
+    handler = get_handler(task.handler)
+    context = HandlerContext(task_slug=task.slug, task_name=task.name)
+    params = task.handler_params or {}
+    if handler.cpu_bound and handler_pool.running:
+        timeout = task.timeout_seconds or settings.handler_timeout
+        return handler_pool.run(handler.name, context, params, timeout)
+    return handler.func(context, params)
 
 
 def get_result_for_error(exception_text: str) -> str:
     return f"Error: {exception_text}"
 
 
+def get_task_offset(task: ScheduledTask) -> int:
+    window = getattr(task, "jitter_seconds", None)
+    return get_fire_offset(task.slug, settings.fire_jitter_seconds if window is None else window)
+
+
+def get_task_trigger(task: ScheduledTask) -> BaseTrigger:
+    """Returns the trigger of `task`: its cron expression, delayed by the task's stable jitter offset."""
+    return get_offset_trigger(task.cron_expression, get_task_offset(task))
+
+
 def get_task_next_run_at(task: ScheduledTask) -> datetime:
-    trigger = CronTrigger.from_crontab(task.cron_expression)
+    trigger = get_task_trigger(task)
     now = datetime.now(timezone.utc)
     return trigger.get_next_fire_time(None, now)
 
 
-def create_executed_task(task: ScheduledTask, status: ResultStatus, result: str):
-    db: Session = SessionLocal()
+@create_executed_task_seconds.time()
+def create_executed_task(task: ScheduledTask, status: ResultStatus, result: str, next_run_at: datetime | None = None):
+    result_sink.add(
+        task_id=task.scheduled_task_id, status=status, result=result, next_run_at=next_run_at, task_slug=task.slug
+    )
+
+
+def load_task(db: Session, task_slug: str, task_id: UUID | None = None) -> ScheduledTask | None:
     with db.begin():
-        executed_task = ExecutedTask(task_id=task.scheduled_task_id, status=status, result=result)
+        task = get_task_for_scheduler(db=db, task_slug=task_slug, task_id=task_id)
+        if task:
+            # Keep the loaded attributes usable after the read transaction releases its connection
+            db.expunge(task)
+    return task
 
-        db.add(executed_task)
-        db.commit()
 
+@execute_task_seconds.time()
+def execute_task(db: Session, task_slug: str, task_id: UUID | None = None, status: ResultStatus = ResultStatus.Done):
+    task = load_task(db=db, task_slug=task_slug, task_id=task_id)
 
-def execute_task(db: Session, task_slug: str):
-    with db.begin():
-        task = get_task_for_scheduler(db=db, task_slug=task_slug)
+    if not task:
+        logger.info(f"Task {task_slug} not found or already processed.")
+        return
 
-        if not task:
-            logger.info(f"Task {task_slug} not found or already processed.")
-            return
+    if task.paused:
+        # The job may fire once before a pause published by another replica is applied
+        logger.info(f"Task {task_slug} is paused.")
+        return
 
-        logger.info(f"Executing task {task.scheduled_task_id} - {task.name}")
+    logger.info(f"Executing task {task.scheduled_task_id} - {task.name}")
 
-        task.next_run_at = get_task_next_run_at(task)
-        create_executed_task(
-            task=task,
-            status=ResultStatus.Done,
-            result=get_result(task),
-        )
+    create_executed_task(
+        task=task,
+        status=status,
+        result=get_result(task),
+        next_run_at=get_task_next_run_at(task),
+    )
 
-        logger.info(f"Task {task_slug} completed successfully.")
+    logger.info(f"Task {task_slug} completed successfully.")
 
 
-def recover_task(db: Session, task_slug: str, exception_text: str):
+def recover_task(db: Session, task_slug: str, exception_text: str, task_id: UUID | None = None):
     try:
-        with db.begin():
-            task = get_task_for_scheduler(db=db, task_slug=task_slug)
-            if task:
-                task.next_run_at = get_task_next_run_at(task)
-                create_executed_task(
-                    task=task,
-                    status=ResultStatus.Failed,
-                    result=get_result_for_error(exception_text=exception_text),
-                )
+        task = load_task(db=db, task_slug=task_slug, task_id=task_id)
+        if task:
+            create_executed_task(
+                task=task,
+                status=ResultStatus.Failed,
+                result=get_result_for_error(exception_text=exception_text),
+                next_run_at=get_task_next_run_at(task),
+            )
     except Exception as rollback_err:
         logger.critical(f"Rollback failed: {rollback_err}")
 
 
-def run_task(task_slug: str):
-    lock_key = f"lock:task:{task_slug}"
-    lock = redis_client.lock(lock_key, timeout=300, blocking_timeout=5)
+def get_scheduled_fire_time(task_slug: str, now: datetime) -> datetime:
+    """Returns the fire time a run outside of the scheduler belongs to: the latest fire time of the task's trigger
+    at or before `now`. Runs started by the scheduler get their fire time passed instead.
+    """
+    job = scheduler.get_job(task_slug)
+    if job is None:
+        return now.replace(second=0, microsecond=0)
 
-    if not lock.acquire(blocking=True):
-        logger.warning(f"Task {task_slug} is already locked by another process.")
-        return
+    fire_time = None
+    next_fire_time = job.trigger.get_next_fire_time(None, now - timedelta(seconds=settings.claim_lookback))
+    while next_fire_time is not None and next_fire_time <= now:
+        fire_time = next_fire_time
+        next_fire_time = job.trigger.get_next_fire_time(fire_time, fire_time + timedelta(microseconds=1))
+
+    return fire_time or now.replace(second=0, microsecond=0)
+
+
+def get_task_priority(task: ScheduledTask) -> TaskPriority:
+    # Tasks built before they are inserted do not have the column default yet
+    return TaskPriority(getattr(task, "priority", None) or TaskPriority.Normal)
+
+
+def run_fire(fire: Fire, delayed: bool):
+    dispatch_fires_total.labels(priority=fire.priority.value, outcome="delayed" if delayed else "started").inc()
+    status = ResultStatus.Delayed if delayed else ResultStatus.Done
 
     db: Session = SessionLocal()
     try:
-        execute_task(db=db, task_slug=task_slug)
+        execute_task(db=db, task_slug=fire.task_slug, task_id=fire.task_id, status=status)
     except Exception as e:
         exception_text: str = str(e)
-        logger.error(f"Task {task_slug} failed: {exception_text}")
-        recover_task(db=db, task_slug=task_slug, exception_text=exception_text)
+        logger.error(f"Task {fire.task_slug} failed: {exception_text}")
+        recover_task(db=db, task_slug=fire.task_slug, exception_text=exception_text, task_id=fire.task_id)
 
     finally:
-        try:
-            lock.release()
-        except LockError:
-            logger.warning(f"Failed to release lock for task {task_slug}")
         db.close()
 
 
+def shed_fire(fire: Fire, reason: str):
+    dispatch_fires_total.labels(priority=fire.priority.value, outcome="shed").inc()
+    logger.warning(f"Shed the fire of task {fire.task_slug} at {fire.fire_time}: {reason}")
+    if fire.task_id is None:
+        # Jobs added before they carried the task id; the warning above is the only record
+        return
+
+    job = scheduler.get_job(fire.task_slug)
+    result_sink.add(
+        task_id=fire.task_id,
+        status=ResultStatus.Shed,
+        result=f"Shed the fire at {fire.fire_time}: {reason}",
+        next_run_at=job.next_run_time if job else None,
+        task_slug=fire.task_slug,
+    )
+
+
+fire_dispatcher = FireDispatcher(
+    max_concurrency=get_max_concurrency(),
+    delay_threshold=settings.dispatch_delay_threshold,
+    low_priority_queue_size=settings.dispatch_low_priority_queue_size,
+    low_priority_max_wait=settings.dispatch_low_priority_max_wait,
+    run=run_fire,
+    shed=shed_fire,
+)
+dispatch_active.set_function(lambda: fire_dispatcher.get_stats()["active"])
+for priority in PRIORITIES:
+    dispatch_queued.labels(priority=priority.value).set_function(
+        lambda priority=priority: fire_dispatcher.get_stats()["queued"][priority.value]
+    )
+
+
+def run_task(
+    task_slug: str,
+    task_id: UUID | None = None,
+    priority: str = TaskPriority.Normal.value,
+    fire_time: datetime | None = None,
+):
+    now = datetime.now(timezone.utc)
+    fire_time = fire_time or get_scheduled_fire_time(task_slug, now)
+    fire_lag_seconds.observe((now - fire_time).total_seconds())
+
+    try:
+        claimed = claim_batcher.claim(get_claim_key(task_slug, fire_time))
+    except RedisError as e:
+        claims_total.labels(outcome="failed").inc()
+        logger.error(f"Failed to claim task {task_slug} for {fire_time}: {e}")
+        return
+
+    if not claimed:
+        claims_total.labels(outcome="contended").inc()
+        logger.info(f"Task {task_slug} for {fire_time} was already claimed by another replica.")
+        return
+
+    claims_total.labels(outcome="acquired").inc()
+    fire_dispatcher.dispatch(Fire(task_slug, task_id, TaskPriority(priority), fire_time, time.monotonic()))
+
+
+def add_task_job(task: ScheduledTask, trigger: BaseTrigger) -> bool:
+    """Adds the job of `task` if this replica owns it. Returns whether the job was added."""
+    if not replica_membership.owns(task.slug):
+        return False
+
+    scheduler.add_job(
+        run_task,
+        trigger=trigger,
+        args=[task.slug, task.scheduled_task_id, get_task_priority(task).value],
+        # Replaced by the run time of each fire when the job is run
+        kwargs={FIRE_TIME_KWARG: None},
+        id=task.slug,
+        replace_existing=True,
+        **get_task_job_options(task),
+        # Paused tasks keep a paused job, so resuming them does not rebuild it
+        **({"next_run_time": None} if getattr(task, "paused", False) else {}),
+    )
+    return True
+
+
+def get_task_job_options(task: ScheduledTask) -> dict:
+    """Returns the scheduler options set on `task`; options left unset fall back to the scheduler's job defaults."""
+    options = {}
+    for option in JOB_OPTIONS:
+        value = getattr(task, option, None)
+        if value is not None:
+            options[option] = value
+    return options
+
+
+def get_task_job_fields(task: ScheduledTask) -> dict:
+    return {
+        "slug": task.slug,
+        "scheduled_task_id": str(task.scheduled_task_id),
+        "cron_expression": task.cron_expression,
+        "paused": bool(getattr(task, "paused", False)),
+        "jitter_seconds": getattr(task, "jitter_seconds", None),
+        "priority": get_task_priority(task).value,
+        **{option: getattr(task, option, None) for option in JOB_OPTIONS},
+    }
+
+
 def schedule_task(task: ScheduledTask):
     try:
-        trigger = CronTrigger.from_crontab(task.cron_expression)
+        trigger = get_task_trigger(task)
 
-        scheduler.add_job(
-            run_task,
-            trigger=trigger,
-            args=[task.slug],
-            id=task.slug,
-            replace_existing=True,
-        )
+        if not add_task_job(task, trigger):
+            replica_membership.publish("schedule", tasks=[get_task_job_fields(task)])
 
-        task.next_run_at = get_task_next_run_at(task=task)
+        task.next_run_at = trigger.get_next_fire_time(None, datetime.now(timezone.utc))
 
         logger.info(f"Scheduled task {task.slug} ({task.name})")
 
@@ -121,6 +398,118 @@ def schedule_task(task: ScheduledTask):
         logger.error(f"Failed to schedule task {task.slug}: {str(e)}")
 
 
+def schedule_tasks(tasks: list[ScheduledTask]):
+    now = datetime.now(timezone.utc)
+    forwarded = []
+
+    for task in tasks:
+        try:
+            trigger = get_task_trigger(task)
+
+            if not add_task_job(task, trigger):
+                forwarded.append(get_task_job_fields(task))
+
+            task.next_run_at = trigger.get_next_fire_time(None, now)
+
+        except Exception as e:
+            logger.error(f"Failed to schedule task {task.slug}: {str(e)}")
+
+    if forwarded:
+        replica_membership.publish("schedule", tasks=forwarded)
+
+    logger.info(f"Scheduled {len(tasks)} tasks")
+
+
 def remove_task(task_slug: str):
-    scheduler.remove_job(task_slug)
+    if not replica_membership.owns(task_slug):
+        replica_membership.publish("remove", slugs=[task_slug])
+    else:
+        handler_pool.cancel(task_slug)
+        try:
+            scheduler.remove_job(task_slug)
+        except JobLookupError:
+            # Recovery may still be running in the background and not have re-added the job yet
+            logger.warning(f"Task {task_slug} was not scheduled")
     logger.info(f"Removed task {task_slug}")
+
+
+def remove_tasks(task_slugs: list[str]):
+    forwarded = []
+    for task_slug in task_slugs:
+        if not replica_membership.owns(task_slug):
+            forwarded.append(task_slug)
+            continue
+        handler_pool.cancel(task_slug)
+        try:
+            scheduler.remove_job(task_slug)
+        except JobLookupError:
+            pass
+
+    if forwarded:
+        replica_membership.publish("remove", slugs=forwarded)
+
+    logger.info(f"Removed {len(task_slugs)} tasks")
+
+
+def pause_task_jobs(task_slugs: list[str]):
+    forwarded = []
+    for task_slug in task_slugs:
+        if not replica_membership.owns(task_slug):
+            forwarded.append(task_slug)
+            continue
+        handler_pool.cancel(task_slug)
+        try:
+            scheduler.pause_job(task_slug)
+        except JobLookupError:
+            # A recovery still running adds the job paused, as it reads the task after the update
+            pass
+
+    if forwarded:
+        replica_membership.publish("pause", slugs=forwarded)
+
+    logger.info(f"Paused {len(task_slugs)} tasks")
+
+
+def resume_task_jobs(tasks: list[ScheduledTask]):
+    forwarded = []
+    for task in tasks:
+        if not replica_membership.owns(task.slug):
+            forwarded.append(task.slug)
+            continue
+        try:
+            scheduler.resume_job(task.slug)
+        except JobLookupError:
+            add_task_job(task, get_task_trigger(task))
+
+    if forwarded:
+        replica_membership.publish("resume", slugs=forwarded)
+
+    logger.info(f"Resumed {len(tasks)} tasks")
+
+
+def handle_task_event(event: dict):
+    """Applies a task change published by another replica to the jobs this replica owns."""
+    if event["action"] == "schedule":
+        for fields in event["tasks"]:
+            # Replicas still on the previous release publish events without the task id
+            task_id = fields.get("scheduled_task_id")
+            task = SimpleNamespace(**{**fields, "scheduled_task_id": UUID(task_id) if task_id else None})
+            add_task_job(task, get_task_trigger(task))
+    elif event["action"] == "remove":
+        for task_slug in event["slugs"]:
+            if replica_membership.owns(task_slug):
+                handler_pool.cancel(task_slug)
+                try:
+                    scheduler.remove_job(task_slug)
+                except JobLookupError:
+                    pass
+    elif event["action"] in ("pause", "resume"):
+        apply = scheduler.pause_job if event["action"] == "pause" else scheduler.resume_job
+        for task_slug in event["slugs"]:
+            if replica_membership.owns(task_slug):
+                if event["action"] == "pause":
+                    handler_pool.cancel(task_slug)
+                try:
+                    apply(task_slug)
+                except JobLookupError:
+                    pass
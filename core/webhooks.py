@@ -0,0 +1,129 @@
+import asyncio
+import os
+import threading
+import time
+from typing import Any, Literal
+
+import httpx
+from pydantic import BaseModel, Field
+
+from core.handlers import HandlerContext, HandlerError, register_handler
+from job_scheduler.config import settings
+from job_scheduler.logger import logger
+
+
+class WebhookParams(BaseModel):
+    url: str = Field(..., pattern=r"^https?://")
+    method: Literal["GET", "POST", "PUT", "PATCH", "DELETE"] = "GET"
+    headers: dict[str, str] = {}
+    # A string is sent as is, anything else as JSON
+    body: str | dict[str, Any] | list[Any] | None = None
+    timeout: float | None = Field(default=None, gt=0)
+
+
+class WebhookClient:
+    """Shared `httpx.AsyncClient` running on its own event loop thread.
+
+    Every webhook fire goes through the same client, so connections to a host are kept alive and reused between
+    fires. httpx only limits connections globally, so calls are also limited per host with a semaphore. Callers
+    block on the call's future while the request itself runs on the loop.
+    """
+
+    def __init__(self, max_connections: int, max_keepalive_connections: int, max_connections_per_host: int):
+        self.limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_keepalive_connections)
+        self.max_connections_per_host = max_connections_per_host
+
+        self._lock = threading.Lock()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        self._client: httpx.AsyncClient | None = None
+        self._semaphores: dict[str, asyncio.Semaphore] = {}
+        self._pid: int | None = None
+
+    def request(self, params: WebhookParams) -> httpx.Response:
+        loop = self._start()
+        timeout = params.timeout or settings.webhook_timeout
+        future = asyncio.run_coroutine_threadsafe(self._request(params, timeout), loop)
+        # The request times out on its own; waiting for a free per-host slot is bounded by the same timeout
+        try:
+            return future.result(timeout=2 * timeout)
+        except TimeoutError:
+            # Otherwise the request keeps its per-host slot and connection after the fire gave up on it
+            future.cancel()
+            raise
+
+    def close(self):
+        with self._lock:
+            if self._loop is None or self._pid != os.getpid():
+                return
+            loop, thread, client = self._loop, self._thread, self._client
+            self._loop = self._thread = self._client = None
+            self._semaphores = {}
+
+        # The client is created by the first request
+        if client is not None:
+            asyncio.run_coroutine_threadsafe(client.aclose(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+
+    def _start(self) -> asyncio.AbstractEventLoop:
+        # A forked worker process inherits the loop object but not the thread running it
+        with self._lock:
+            if self._loop is None or self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._loop = asyncio.new_event_loop()
+                self._client = None
+                self._semaphores = {}
+                self._thread = threading.Thread(target=self._loop.run_forever, name="webhook-client", daemon=True)
+                self._thread.start()
+            return self._loop
+
+    def _get_semaphore(self, host: str) -> asyncio.Semaphore:
+        # Only called on the loop thread
+        semaphore = self._semaphores.get(host)
+        if semaphore is None:
+            semaphore = self._semaphores[host] = asyncio.Semaphore(self.max_connections_per_host)
+        return semaphore
+
+    async def _request(self, params: WebhookParams, timeout: float) -> httpx.Response:
+        if self._client is None:
+            self._client = httpx.AsyncClient(limits=self.limits)
+
+        body = {"content": params.body} if isinstance(params.body, str) else {"json": params.body}
+        async with self._get_semaphore(httpx.URL(params.url).host):
+            return await self._client.request(
+                params.method, params.url, headers=params.headers, timeout=timeout, **body
+            )
+
+
+webhook_client = WebhookClient(
+    max_connections=settings.webhook_max_connections,
+    max_keepalive_connections=settings.webhook_max_keepalive_connections,
+    max_connections_per_host=settings.webhook_max_connections_per_host,
+)
+
+
+def format_response(response: httpx.Response, latency: float) -> str:
+    body = response.text
+    if len(body) > settings.webhook_result_max_length:
+        body = f"{body[: settings.webhook_result_max_length]}... ({len(body)} characters)"
+    return f"HTTP {response.status_code} in {latency * 1000:.0f}ms: {body}"
+
+
+@register_handler("webhook", params_model=WebhookParams)
+def call_webhook(context: HandlerContext, params: dict[str, Any]) -> str:
+    """Calls the task's URL; a response other than 2xx is a failed fire, with the same details as a successful one."""
+    webhook = WebhookParams.model_validate(params)
+
+    started_at = time.perf_counter()
+    try:
+        response = webhook_client.request(webhook)
+    except (httpx.HTTPError, TimeoutError) as e:
+        raise HandlerError(f"{webhook.method} {webhook.url} failed: {type(e).__name__}: {e}") from e
+    result = format_response(response, time.perf_counter() - started_at)
+
+    if not response.is_success:
+        logger.warning(f"Webhook of task {context.task_slug} returned {response.status_code}")
+        raise HandlerError(result)
+    return result
@@ -0,0 +1,152 @@
+import multiprocessing
+import queue
+import threading
+import time
+from collections import defaultdict
+from multiprocessing.connection import Connection
+from typing import Any
+
+from core.handlers import (
+    HandlerCancelled,
+    HandlerContext,
+    HandlerError,
+    HandlerTimeout,
+    get_handler,
+    import_handler_modules,
+)
+from job_scheduler.logger import logger
+
+# Workers are spawned rather than forked: the app runs scheduler, Redis and pool threads that must not be copied
+MP_CONTEXT = multiprocessing.get_context("spawn")
+
+
+def serve(conn: Connection, modules: list[str]):
+    """Runs in a worker process: handles one call at a time until the pipe is closed."""
+    import_handler_modules(modules)
+    conn.send(("ready", None))
+    while True:
+        try:
+            name, context, params = conn.recv()
+        except EOFError:
+            return
+        try:
+            conn.send(("ok", get_handler(name).func(context, params)))
+        except Exception as e:
+            conn.send(("error", f"{type(e).__name__}: {e}"))
+
+
+class HandlerWorker:
+    def __init__(self, modules: list[str]):
+        self.conn, child_conn = MP_CONTEXT.Pipe()
+        self.process = MP_CONTEXT.Process(target=serve, args=(child_conn, modules), name="handler-worker", daemon=True)
+        self.process.start()
+        child_conn.close()
+
+    def wait_ready(self):
+        self.conn.recv()
+
+    def kill(self):
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+
+class HandlerPool:
+    """Pre-started worker processes running CPU-bound handlers, one call per worker at a time.
+
+    The calling thread only waits on a pipe, so it does not hold the GIL while a handler runs. A call running past
+    its timeout, or cancelled, has its worker killed and replaced in the background, so a stuck handler never keeps
+    a worker. The timeout covers the wait for an idle worker too, so fires queued behind busy workers fail in time
+    instead of piling up.
+    """
+
+    def __init__(self, size: int, modules: list[str]):
+        self.size = size
+        self.modules = modules
+
+        self._idle: queue.Queue[HandlerWorker] = queue.Queue()
+        self._busy: dict[str, set[HandlerWorker]] = defaultdict(set)
+        self._cancelled: set[HandlerWorker] = set()
+        self._lock = threading.Lock()
+        self.running = False
+
+    def start(self):
+        if self.running or self.size <= 0:
+            return
+
+        workers = [HandlerWorker(self.modules) for _ in range(self.size)]
+        # Pre-warmed: every worker has imported the handlers before the first fire is sent to it
+        for worker in workers:
+            worker.wait_ready()
+            self._idle.put(worker)
+        self.running = True
+        logger.info(f"Started {self.size} handler workers")
+
+    def stop(self):
+        self.running = False
+        while not self._idle.empty():
+            self._idle.get_nowait().kill()
+        with self._lock:
+            busy = [worker for workers in self._busy.values() for worker in workers]
+        for worker in busy:
+            worker.process.kill()
+
+    def run(self, name: str, context: HandlerContext, params: dict[str, Any], timeout: float | None) -> str:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        try:
+            worker = self._idle.get(timeout=timeout)
+        except queue.Empty:
+            raise HandlerTimeout(f"Handler {name!r} timed out after {timeout}s waiting for a free worker") from None
+        with self._lock:
+            self._busy[context.task_slug].add(worker)
+
+        replace = True
+        try:
+            try:
+                worker.conn.send((name, context, params))
+                if not worker.conn.poll(None if deadline is None else max(deadline - time.monotonic(), 0)):
+                    raise HandlerTimeout(f"Handler {name!r} timed out after {timeout}s")
+                status, value = worker.conn.recv()
+            except (EOFError, OSError):
+                if self._is_cancelled(worker):
+                    raise HandlerCancelled(f"Handler {name!r} was cancelled") from None
+                raise HandlerError(f"Worker process running handler {name!r} exited") from None
+            replace = self._is_cancelled(worker)
+        finally:
+            with self._lock:
+                self._busy[context.task_slug].discard(worker)
+                if not self._busy[context.task_slug]:
+                    del self._busy[context.task_slug]
+                self._cancelled.discard(worker)
+            if replace:
+                self._replace(worker)
+            else:
+                self._idle.put(worker)
+
+        if status == "error":
+            raise HandlerError(value)
+        return value
+
+    def cancel(self, task_slug: str) -> int:
+        """Kills the workers running a handler for `task_slug`; returns how many were running."""
+        with self._lock:
+            workers = list(self._busy.get(task_slug, ()))
+            self._cancelled.update(workers)
+        for worker in workers:
+            worker.process.kill()
+        return len(workers)
+
+    def _is_cancelled(self, worker: HandlerWorker) -> bool:
+        with self._lock:
+            return worker in self._cancelled
+
+    def _replace(self, worker: HandlerWorker):
+        def respawn():
+            worker.kill()
+            if not self.running:
+                return
+            replacement = HandlerWorker(self.modules)
+            replacement.wait_ready()
+            self._idle.put(replacement)
+
+        threading.Thread(target=respawn, name="handler-worker-respawn", daemon=True).start()
@@ -1,13 +1,99 @@
-from pydantic import Field, ValidationError
+import os
+import socket
+
+from pydantic import Field, ValidationError, model_validator
 from pydantic_settings import BaseSettings
 
-from job_scheduler.constants import Phase
+from job_scheduler.constants import (
+    ExecutorType,
+    JobStoreType,
+    PastTaskPolicy,
+    Phase,
+    SchedulerEngine,
+    SchedulerType,
+)
 
 
 class Settings(BaseSettings):
     phase: str = Field(default=Phase.Production)
     redis_url: str = Field(..., description="Redis connection URI")
     db_url: str = Field(..., description="PostgreSQL connection URI")
+    scheduler_type: SchedulerType = Field(default=SchedulerType.Background, description="Thread or event loop")
+    scheduler_engine: SchedulerEngine = Field(default=SchedulerEngine.APScheduler, description="Engine running jobs")
+    scheduler_job_store: JobStoreType = Field(default=JobStoreType.Memory, description="Where scheduled jobs are kept")
+    single_replica: bool = Field(default=False, description="Only one replica runs, required by the persistent store")
+    scheduler_executor: ExecutorType = Field(default=ExecutorType.ThreadPool, description="Pool running task fires")
+    scheduler_max_workers: int = Field(default=10, description="Workers of the scheduler's executor pool")
+    scheduler_max_instances: int = Field(default=1, description="Concurrent runs allowed per task")
+    scheduler_coalesce: bool = Field(default=True, description="Run missed fires of a task once instead of each")
+    scheduler_misfire_grace_time: int | None = Field(default=60, description="Seconds a fire may run late")
+    fire_jitter_seconds: int = Field(default=0, description="Window fires are spread over by slug, 0 disables it")
+    cron_cache_size: int = Field(default=1024, description="Max number of compiled cron expressions kept in memory")
+    handler_workers: int = Field(default=0, description="Processes running CPU-bound handlers, 0 runs them in threads")
+    handler_timeout: int | None = Field(default=300, description="Seconds a handler may run in a worker process")
+    task_handler_modules: list[str] = Field(default=[], description="Modules registering task handlers on import")
+    forecast_max_window_days: int = Field(default=31, description="Longest window of a schedule forecast")
+    forecast_max_buckets: int = Field(default=10_000, description="Most buckets of a schedule forecast")
+    webhook_timeout: float = Field(default=10.0, description="Seconds a webhook call may take unless set per task")
+    webhook_max_connections: int = Field(default=100, description="Connections of the shared webhook client")
+    webhook_max_keepalive_connections: int = Field(default=20, description="Idle webhook connections kept open")
+    webhook_max_connections_per_host: int = Field(default=10, description="Concurrent webhook calls per host")
+    webhook_result_max_length: int = Field(default=1000, description="Characters of a webhook response body stored")
+    dispatch_max_concurrency: int | None = Field(default=None, description="Fires run at once, None derives it")
+    dispatch_reserved_connections: int = Field(default=5, description="DB pool connections kept free of fires")
+    dispatch_delay_threshold: float = Field(default=5.0, description="Seconds queued before a fire is Delayed")
+    dispatch_low_priority_queue_size: int = Field(default=1000, description="Queued low priority fires before shedding")
+    dispatch_low_priority_max_wait: float = Field(default=60.0, description="Seconds a low priority fire may wait")
+    result_flush_size: int = Field(default=500, description="Buffered results that trigger a bulk write")
+    result_flush_interval: float = Field(default=1.0, description="Max seconds a result stays buffered")
+    result_buffer_max_size: int = Field(
+        default=100_000, description="Most results buffered while flushes fail, the oldest are dropped past it"
+    )
+    result_retention_days: int | None = Field(default=None, description="Days raw results are kept, None keeps all")
+    result_expiry_batch_size: int = Field(
+        default=5000, description="Results deleted per transaction by per-task expiry"
+    )
+    result_expiry_max_rows: int = Field(default=500_000, description="Most results per-task expiry deletes per run")
+    result_partitions_ahead_days: int = Field(default=7, description="Daily result partitions created in advance")
+    result_maintenance_cron: str = Field(default="15 0 * * *", description="When partitions, rollups and expiry run")
+    counter_reconcile_cron: str = Field(default="45 1 * * *", description="When drifted counters are removed")
+    counter_reconcile_batch_size: int = Field(default=1000, description="Result counters checked per query")
+    results_cache_ttl: int = Field(default=300, description="Seconds a cached results page is kept, 0 disables it")
+    results_cache_max_skip: int = Field(default=100, description="Results pages starting at this offset are not cached")
+    slug_cache_size: int = Field(default=100_000, description="Max slug to task id entries kept in memory")
+    slug_cache_ttl: float = Field(default=60.0, description="Seconds a slug stays resolved without a lookup")
+    export_chunk_size: int = Field(default=1000, description="Rows fetched per round trip by results exports")
+    recovery_chunk_size: int = Field(default=1000, description="Rows fetched per chunk during startup recovery")
+    recovery_workers: int = Field(default=4, description="Worker threads building jobs during startup recovery")
+    recovery_in_background: bool = Field(default=True, description="Serve traffic while recovery is running")
+    recover_past_tasks: PastTaskPolicy = Field(default=PastTaskPolicy.Skip, description="Fires missed while down")
+    catch_up_max_fires: int = Field(default=1000, description="Max missed fires caught up per task, latest first")
+    catch_up_workers: int = Field(default=2, description="Cron expressions caught up concurrently")
+    sharding_enabled: bool = Field(default=False, description="Split tasks across replicas by consistent hashing")
+    replica_id: str = Field(default_factory=lambda: f"{socket.gethostname()}-{os.getpid()}")
+    replica_heartbeat_interval: float = Field(default=5.0, description="Seconds between membership heartbeats")
+    replica_lease_ttl: float = Field(default=15.0, description="Seconds a replica stays a member without heartbeat")
+    hash_ring_vnodes: int = Field(default=64, description="Virtual nodes per replica on the hash ring")
+    task_sync_interval: float = Field(default=300.0, description="Seconds between syncs of a replica's jobs")
+    claim_ttl: int = Field(default=3600, description="Seconds a fire claim is kept in Redis")
+    claim_batch_window: float = Field(default=0.01, description="Seconds claims are collected into one round trip")
+    claim_batch_max_size: int = Field(default=1000, description="Max claims sent in one round trip")
+    claim_lookback: int = Field(
+        default=300, description="Seconds searched back for the fire time of a run started outside the scheduler"
+    )
+    async_api: bool = Field(default=False, description="Serve the task routes with async handlers")
+    async_db_url: str | None = Field(default=None, description="Async SQLAlchemy URI, derived from DB_URL if unset")
+    task_batch_max_size: int = Field(default=10000, description="Max number of tasks in one batch request")
+
+    @model_validator(mode="after")
+    def validate_job_store(self):
+        # Every scheduler loading a shared job table runs every job in it, so the table needs a single replica
+        uses_persistent_store = (
+            self.scheduler_job_store == JobStoreType.SQLAlchemy and self.scheduler_engine == SchedulerEngine.APScheduler
+        )
+        if uses_persistent_store and (self.sharding_enabled or not self.single_replica):
+            raise ValueError("SCHEDULER_JOB_STORE=sqlalchemy requires SINGLE_REPLICA=true and SHARDING_ENABLED=false")
+        return self
 
     model_config = {
         "env_file": ".env",
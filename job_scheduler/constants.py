@@ -9,3 +9,45 @@ class Phase(str, Enum):
 class ResultStatus(str, Enum):
     Done = "Done"
     Failed = "Failed"
+    # Done, but only after waiting for a free execution slot longer than DISPATCH_DELAY_THRESHOLD
+    Delayed = "Delayed"
+    # Not run: dropped by the dispatcher under backpressure
+    Shed = "Shed"
+
+
+class TaskPriority(str, Enum):
+    High = "high"
+    Normal = "normal"
+    Low = "low"
+
+
+class ExecutorType(str, Enum):
+    ThreadPool = "threadpool"
+    ProcessPool = "processpool"
+
+
+class SchedulerType(str, Enum):
+    Background = "background"
+    AsyncIO = "asyncio"
+
+
+class PastTaskPolicy(str, Enum):
+    Skip = "skip"
+    Fail = "fail"
+    RunOnce = "run_once"
+    RunAll = "run_all"
+
+
+class SchedulerEngine(str, Enum):
+    APScheduler = "apscheduler"
+    Compact = "compact"
+
+
+class JobStoreType(str, Enum):
+    Memory = "memory"
+    SQLAlchemy = "sqlalchemy"
+
+
+class ExportFormat(str, Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
@@ -1,15 +1,22 @@
-from sqlalchemy import create_engine
+import os
+from functools import lru_cache
+
+from sqlalchemy import create_engine, make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
 from job_scheduler.config import settings
 from job_scheduler.constants import Phase
+from job_scheduler.metrics import instrument_pool
 
 if settings.phase == Phase.Local:
     SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+    ASYNC_DATABASE_URL = "sqlite+aiosqlite:///./test.db"
     connect_args = {"check_same_thread": False}
     kwargs = {}
 elif settings.phase == Phase.Production:
     SQLALCHEMY_DATABASE_URL = settings.db_url
+    ASYNC_DATABASE_URL = settings.async_db_url or make_url(settings.db_url).set(drivername="postgresql+asyncpg")
     connect_args = {}
     kwargs = {
         "pool_pre_ping": True,
@@ -18,5 +25,16 @@ elif settings.phase == Phase.Production:
     }
 
 engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args=connect_args, **kwargs)
+instrument_pool(engine)
 
 SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+
+# Pooled connections must not be shared with worker processes forked by the process pool executor
+os.register_at_fork(after_in_child=lambda: engine.dispose(close=False))
+
+
+@lru_cache(maxsize=None)
+def get_async_session_factory() -> async_sessionmaker:
+    """Creates the async engine on first use, so the async driver is only required when the async API is used."""
+    async_engine = create_async_engine(ASYNC_DATABASE_URL, connect_args=connect_args, **kwargs)
+    return async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
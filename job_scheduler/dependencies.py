@@ -1,4 +1,4 @@
-from job_scheduler.database import SessionLocal
+from job_scheduler.database import SessionLocal, get_async_session_factory
 
 
 def get_db():
@@ -7,3 +7,8 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with get_async_session_factory()() as db:
+        yield db
@@ -26,3 +26,21 @@ class TaskDeletionFailed(AppException):
     status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
     detail = f"Failed to delete task"
     error_code = "TASK_DELETE_500"
+
+
+class TaskUpdateFailed(AppException):
+    status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
+    detail = "Failed to update tasks"
+    error_code = "TASK_UPDATE_500"
+
+
+class InvalidCursor(AppException):
+    status_code = status.HTTP_400_BAD_REQUEST
+    detail = "Invalid pagination cursor"
+    error_code = "CURSOR_400"
+
+
+class InvalidForecastWindow(AppException):
+    status_code = status.HTTP_400_BAD_REQUEST
+    detail = "Invalid forecast window"
+    error_code = "FORECAST_400"
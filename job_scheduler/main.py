@@ -1,27 +1,113 @@
+import threading
+import time
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import APIRouter, FastAPI, Request, Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 
-from core import api
-from core.models import Base
-from core.recovery import recover_scheduled_tasks
-from job_scheduler.database import engine
+from core import api, async_api
+from core.catch_up import catch_up_missed_fires
+from core.maintenance import schedule_internal_jobs
+from core.migrations import migrate_schema
+from core.models import utc_now
+from core.recovery import (
+    rebalance_scheduled_tasks,
+    reconcile_scheduled_tasks,
+    recover_scheduled_tasks,
+    set_reconciled_at,
+)
+from core.results import result_sink
+from core.retention import ensure_partitions
+from core.sharding import replica_membership
+from core.tasks import (
+    fire_dispatcher,
+    handle_task_event,
+    handler_pool,
+    start_scheduler,
+    stop_scheduler,
+    uses_persistent_job_store,
+)
+from core.webhooks import webhook_client
+from job_scheduler.config import settings
+from job_scheduler.database import SessionLocal, engine
 from job_scheduler.logger import logger
+from job_scheduler.metrics import http_request_seconds
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    logger.info("App starting... recovering scheduled tasks")
-    recover_scheduled_tasks()
+    logger.info("App starting... migrating the schema and recovering scheduled tasks")
+    migrate_schema(engine)
+    with SessionLocal() as db:
+        ensure_partitions(db, utc_now().date())
+    result_sink.open()
+    fire_dispatcher.open()
+    handler_pool.start()
+    start_scheduler()
+    schedule_internal_jobs()
+    replica_membership.start(on_change=rebalance_scheduled_tasks, on_event=handle_task_event)
+    # A persistent job store survived the restart, only the changes since the last run are applied
+    recover_jobs = reconcile_scheduled_tasks if uses_persistent_job_store() else recover_scheduled_tasks
+
+    def recover():
+        recover_jobs()
+        catch_up_missed_fires()
+
+    if settings.recovery_in_background:
+        threading.Thread(target=recover, name="task-recovery", daemon=True).start()
+    else:
+        recover()
     yield
     logger.info("App shutting down...")
+    replica_membership.stop()
+    # Fires still running need the handler workers, the webhook client and the result sink
+    stop_scheduler()
+    fire_dispatcher.close()
+    handler_pool.stop()
+    webhook_client.close()
+    result_sink.close()
+    if uses_persistent_job_store():
+        # Changes made while running were applied to the job store as they happened
+        set_reconciled_at(utc_now())
+
+
+def include_routers(app: FastAPI):
+    if not settings.async_api:
+        app.include_router(api.router)
+        return
+
+    app.include_router(async_api.router)
+
+    # Routes without an async version keep their sync handler
+    served = {(route.path, method) for route in async_api.router.routes for method in route.methods}
+    fallback = APIRouter()
+    fallback.routes = [
+        route for route in api.router.routes if not any((route.path, method) in served for method in route.methods)
+    ]
+    app.include_router(fallback)
 
 
 app = FastAPI(lifespan=lifespan)
-Base.metadata.create_all(bind=engine)
-app.include_router(api.router)
+include_routers(app)
+
+
+@app.middleware("http")
+async def record_latency(request: Request, call_next):
+    started_at = time.perf_counter()
+    response = await call_next(request)
+    # The route template keeps one series per route instead of one per slug
+    route = request.scope.get("route")
+    http_request_seconds.labels(
+        method=request.method, route=route.path if route else "unmatched", status=response.status_code
+    ).observe(time.perf_counter() - started_at)
+    return response
 
 
 @app.get("/health")
 def health_check():
     return {"status": "ok"}
+
+
+@app.get("/metrics")
+def metrics():
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,55 @@
+import time
+
+from prometheus_client import Counter, Gauge, Histogram
+from sqlalchemy import Engine
+
+# Fires can run minutes late when the executor is saturated, the buckets go well past the default 10s
+LAG_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+fire_lag_seconds = Histogram(
+    "scheduler_fire_lag_seconds", "Delay between a fire's scheduled time and the start of run_task", buckets=LAG_BUCKETS
+)
+claims_total = Counter(
+    "scheduler_claims_total", "Fire claims by outcome (acquired, contended, failed)", labelnames=("outcome",)
+)
+execute_task_seconds = Histogram("scheduler_execute_task_seconds", "Duration of execute_task")
+create_executed_task_seconds = Histogram("scheduler_create_executed_task_seconds", "Duration of create_executed_task")
+result_flush_seconds = Histogram("scheduler_result_flush_seconds", "Duration of a bulk write of buffered results")
+results_dropped_total = Counter(
+    "scheduler_results_dropped_total", "Buffered results dropped because the buffer was full while flushes failed"
+)
+
+executor_active_workers = Gauge("scheduler_executor_active_workers", "Workers of the executor running a fire")
+executor_queued = Gauge("scheduler_executor_queued", "Fires waiting for a free worker of the executor")
+
+dispatch_fires_total = Counter(
+    "scheduler_dispatch_fires_total",
+    "Claimed fires by priority and outcome (started, delayed, shed)",
+    labelnames=("priority", "outcome"),
+)
+dispatch_active = Gauge("scheduler_dispatch_active", "Fires running in a dispatcher slot")
+dispatch_queued = Gauge("scheduler_dispatch_queued", "Fires waiting for a dispatcher slot", labelnames=("priority",))
+
+db_pool_checkout_seconds = Histogram("db_pool_checkout_seconds", "Time waited for a connection from the pool")
+db_pool_checked_out = Gauge("db_pool_checked_out", "Connections of the pool currently in use")
+
+http_request_seconds = Histogram(
+    "http_request_duration_seconds", "API latency per route", labelnames=("method", "route", "status")
+)
+
+
+def instrument_pool(engine: Engine):
+    """Times pool checkouts and exposes the connections in use; gauges are only computed when scraped."""
+    pool = engine.pool
+    connect = pool.connect
+
+    def timed_connect():
+        started_at = time.perf_counter()
+        try:
+            return connect()
+        finally:
+            db_pool_checkout_seconds.observe(time.perf_counter() - started_at)
+
+    pool.connect = timed_connect
+    if hasattr(pool, "checkedout"):
+        db_pool_checked_out.set_function(pool.checkedout)
@@ -1,6 +1,10 @@
-from core.models import Base
-from job_scheduler.database import engine
+from core.migrations import migrate_schema
+from core.models import utc_now
+from core.retention import ensure_partitions
+from job_scheduler.database import SessionLocal, engine
 
-print("📦 Creating PostgreSQL schema...")
-Base.metadata.create_all(bind=engine)
+print("📦 Migrating PostgreSQL schema...")
+migrate_schema(engine)
+with SessionLocal() as db:
+    ensure_partitions(db, utc_now().date())
 print("✅ Done.")
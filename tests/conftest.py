@@ -1,7 +1,12 @@
 import pytest
 
-from core.models import ScheduledTask
-from job_scheduler.database import SessionLocal
+from core.counters import reset_counters
+from core.models import Base, ScheduledTask
+from core.results_cache import clear_cache
+from core.slug_cache import slug_cache
+from job_scheduler.database import SessionLocal, engine
+
+Base.metadata.create_all(bind=engine)
 
 
 @pytest.fixture
@@ -11,3 +16,15 @@ def db():
     db.query(ScheduledTask).delete()
     db.commit()
     db.close()
+
+
+@pytest.fixture(autouse=True)
+def redis_state():
+    # Tests add and remove rows directly, so counters start uninitialized and no results page or slug is cached
+    reset_counters()
+    clear_cache()
+    slug_cache.clear()
+    yield
+    reset_counters()
+    clear_cache()
+    slug_cache.clear()
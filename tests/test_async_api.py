@@ -0,0 +1,114 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from core import async_api
+
+
+@pytest.fixture
+def client(monkeypatch):
+    from job_scheduler.main import include_routers
+
+    monkeypatch.setattr("job_scheduler.main.settings.async_api", True)
+    app = FastAPI()
+    include_routers(app)
+    return TestClient(app)
+
+
+def test_async_routes_replace_sync_routes(client):
+    endpoints = {
+        (route.path, method): route.endpoint
+        for route in client.app.routes
+        if hasattr(route, "methods")
+        for method in route.methods
+    }
+
+    assert endpoints[("/tasks", "POST")] is async_api.create_task_api
+    assert endpoints[("/tasks", "GET")] is async_api.list_tasks_api
+    assert endpoints[("/scheduler/stats", "GET")].__module__ == "core.api"
+    assert len([key for key in endpoints if key == ("/tasks", "POST")]) == 1
+
+
+def test_async_create_list_and_delete_task(client, db):
+    created = client.post("/tasks", json={"name": "Async Task", "cron_expression": "*/5 * * * *"})
+    assert created.status_code == 200
+    slug = created.json()["slug"]
+    assert created.json()["next_run_at"]
+
+    listed = client.get("/tasks?limit=100").json()
+    assert any(task["slug"] == slug for task in listed["result"])
+    assert listed["count"] >= 1
+
+    results = client.get(f"/tasks/{slug}/results?include_count=false").json()
+    assert results == {"count": None, "result": [], "next_cursor": None}
+
+    assert client.delete(f"/tasks/{slug}").status_code == 200
+    assert client.delete(f"/tasks/{slug}").status_code == 404
+
+
+def test_async_batch_reports_invalid_items(client, db):
+    response = client.post(
+        "/tasks:batch",
+        json={
+            "tasks": [
+                {"name": "Async Batch Task", "cron_expression": "*/5 * * * *"},
+                {"name": "Bad Cron", "cron_expression": "nope"},
+            ]
+        },
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert [task["name"] for task in data["created"]] == ["Async Batch Task"]
+    assert [error["index"] for error in data["errors"]] == [1]
+
+
+def test_async_cursor_pagination(client, db):
+    client.post(
+        "/tasks:batch",
+        json={"tasks": [{"name": f"Async Cursor Task {i}", "cron_expression": "*/5 * * * *"} for i in range(3)]},
+    )
+
+    seen = []
+    page = client.get("/tasks?limit=2&include_count=false").json()
+    seen += page["result"]
+    while page["next_cursor"]:
+        page = client.get(f"/tasks?limit=2&after={page['next_cursor']}&include_count=false").json()
+        seen += page["result"]
+
+    assert len({task["slug"] for task in seen}) == len(seen)
+    assert {f"Async Cursor Task {i}" for i in range(3)} <= {task["name"] for task in seen}
+
+
+def test_async_task_results_not_found(client):
+    response = client.get("/tasks/non-existent-slug/results")
+    assert response.status_code == 404
+    assert response.json()["detail"]["error_code"] == "TASK_404"
+
+
+def test_async_routes_call_redis_and_scheduler_off_the_event_loop(client, db, monkeypatch):
+    import asyncio
+
+    from core import async_services
+
+    on_loop = []
+
+    def record(func):
+        def wrapper(*args, **kwargs):
+            try:
+                asyncio.get_running_loop()
+                on_loop.append(func.__name__)
+            except RuntimeError:
+                pass
+            return func(*args, **kwargs)
+
+        return wrapper
+
+    for name in ["schedule_task", "remove_task", "increment_task_count", "get_task_count", "get_cached_page"]:
+        monkeypatch.setattr(async_services, name, record(getattr(async_services, name)))
+
+    slug = client.post("/tasks", json={"name": "Off Loop Task", "cron_expression": "*/5 * * * *"}).json()["slug"]
+    client.get("/tasks?limit=1")
+    client.get(f"/tasks/{slug}/results")
+    client.delete(f"/tasks/{slug}")
+
+    assert on_loop == []
@@ -0,0 +1,107 @@
+from datetime import datetime, timezone
+
+from fastapi.testclient import TestClient
+
+from core.cron import get_fire_offset
+from core.models import ExecutedTask, ExecutedTaskRollup, ScheduledTask
+from core.results import result_sink
+from core.tasks import run_task, scheduler
+from job_scheduler.constants import ResultStatus
+from job_scheduler.main import app
+
+client = TestClient(app)
+
+
+def create_tasks(*names):
+    items = [{"name": name, "cron_expression": "*/5 * * * *"} for name in names]
+    return [task["slug"] for task in client.post("/tasks:batch", json={"tasks": items}).json()["created"]]
+
+
+def get_task(db, slug):
+    db.expire_all()
+    return db.query(ScheduledTask).filter(ScheduledTask.slug == slug).first()
+
+
+def test_pause_tasks_by_slug(db):
+    paused, running = create_tasks("incident-a", "incident-b")
+
+    res = client.post("/tasks:pause", json={"slugs": [paused]})
+    assert res.status_code == 200
+    assert res.json() == {"count": 1, "slugs": [paused]}
+
+    task = get_task(db, paused)
+    assert task.paused is True
+    assert task.next_run_at is None
+    assert scheduler.get_job(paused).next_run_time is None
+    assert scheduler.get_job(running).next_run_time is not None
+
+    # Pausing again matches nothing, the task is already paused
+    assert client.post("/tasks:pause", json={"slugs": [paused]}).json()["count"] == 0
+
+
+def test_resume_tasks_by_name(db):
+    slugs = create_tasks("nightly-export", "nightly-report", "hourly-sync")
+    client.post("/tasks:pause", json={"name_contains": "nightly"})
+
+    res = client.post("/tasks:resume", json={"name_contains": "nightly"})
+    assert res.status_code == 200
+    assert sorted(res.json()["slugs"]) == sorted(slugs[:2])
+
+    for slug in slugs[:2]:
+        task = get_task(db, slug)
+        assert task.paused is False
+        assert task.next_run_at is not None
+        assert scheduler.get_job(slug).next_run_time is not None
+
+
+def test_paused_task_does_not_run(db):
+    (slug,) = create_tasks("paused-run")
+    client.post("/tasks:pause", json={"slugs": [slug]})
+
+    run_task(slug)
+    result_sink.flush()
+
+    assert get_task(db, slug).results.count() == 0
+
+
+def test_delete_tasks_removes_their_history(db):
+    deleted, kept = create_tasks("cleanup-a", "cleanup-b")
+    task_id = get_task(db, deleted).scheduled_task_id
+    now = datetime.now(timezone.utc)
+    db.add(ExecutedTask(task_id=task_id, executed_at=now, status=ResultStatus.Done.value, result="done"))
+    db.add(
+        ExecutedTaskRollup(
+            task_id=task_id,
+            day=now.date(),
+            status=ResultStatus.Done.value,
+            count=1,
+            first_executed_at=now,
+            last_executed_at=now,
+        )
+    )
+    db.commit()
+
+    res = client.post("/tasks:delete", json={"slugs": [deleted, "nonexistent-id"]})
+    assert res.json() == {"count": 1, "slugs": [deleted]}
+
+    assert get_task(db, deleted) is None
+    assert get_task(db, kept) is not None
+    assert scheduler.get_job(deleted) is None
+    assert db.query(ExecutedTask).filter(ExecutedTask.task_id == task_id).count() == 0
+    assert db.query(ExecutedTaskRollup).filter(ExecutedTaskRollup.task_id == task_id).count() == 0
+    assert client.get("/tasks").json()["count"] == 1
+
+
+def test_selection_is_required():
+    res = client.post("/tasks:pause", json={})
+    assert res.status_code == 422
+
+
+def test_resumed_task_keeps_its_jitter(db):
+    items = [{"name": "jittered-resume", "cron_expression": "* * * * *", "jitter_seconds": 60}]
+    slug = client.post("/tasks:batch", json={"tasks": items}).json()["created"][0]["slug"]
+    client.post("/tasks:pause", json={"slugs": [slug]})
+
+    client.post("/tasks:resume", json={"slugs": [slug]})
+
+    assert get_task(db, slug).next_run_at.second == get_fire_offset(slug, 60)
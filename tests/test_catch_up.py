@@ -0,0 +1,151 @@
+from datetime import datetime, timezone
+
+import pytest
+from freezegun import freeze_time
+
+from core.catch_up import catch_up_missed_fires, get_missed_fire_times
+from core.cron import get_cron_trigger
+from core.handlers import register_handler
+from core.models import ExecutedTask, ScheduledTask
+from job_scheduler.config import settings
+from job_scheduler.constants import PastTaskPolicy, ResultStatus
+
+UNTIL = datetime(2030, 1, 1, 11, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def policy(monkeypatch):
+    def set_policy(policy: PastTaskPolicy):
+        monkeypatch.setattr(settings, "recover_past_tasks", policy)
+
+    return set_policy
+
+
+def _create_task(db, next_run_at: datetime):
+    task = ScheduledTask(name="missed task", cron_expression="*/15 * * * *", next_run_at=next_run_at)
+    db.add(task)
+    db.commit()
+    return task
+
+
+def _statuses(db, task):
+    db.refresh(task)
+    return [result.status for result in task.results.order_by(ExecutedTask.executed_at)]
+
+
+@pytest.fixture(autouse=True)
+def clear_results(db):
+    yield
+    db.query(ExecutedTask).delete()
+    db.commit()
+
+
+def test_missed_fire_times_are_capped_to_the_latest():
+    trigger = get_cron_trigger("*/15 * * * *")
+    since = datetime(2030, 1, 1, 10, 0, tzinfo=timezone.utc)
+
+    assert len(get_missed_fire_times(trigger, since, UNTIL, limit=100)) == 5
+    assert get_missed_fire_times(trigger, since, UNTIL, limit=2) == [
+        datetime(2030, 1, 1, 10, 45, tzinfo=timezone.utc),
+        UNTIL,
+    ]
+
+
+class CountingTrigger:
+    def __init__(self, trigger):
+        self.trigger = trigger
+        self.calls = 0
+
+    def get_next_fire_time(self, previous_fire_time, now):
+        self.calls += 1
+        return self.trigger.get_next_fire_time(previous_fire_time, now)
+
+
+def test_missed_fire_times_do_not_walk_a_long_outage():
+    trigger = CountingTrigger(get_cron_trigger("* * * * *"))
+    since = datetime(2029, 1, 1, tzinfo=timezone.utc)
+
+    # A year of missed fires every minute, of which only the latest are kept
+    assert get_missed_fire_times(trigger, since, UNTIL, limit=3) == [
+        datetime(2030, 1, 1, 10, 58, tzinfo=timezone.utc),
+        datetime(2030, 1, 1, 10, 59, tzinfo=timezone.utc),
+        UNTIL,
+    ]
+    assert trigger.calls < 20
+
+    # Fires are still looked for back to `since`
+    yearly = get_cron_trigger("0 0 1 6 *")
+    assert get_missed_fire_times(yearly, since, UNTIL, limit=1) == [datetime(2029, 6, 1, tzinfo=timezone.utc)]
+
+
+def test_run_all_runs_every_missed_fire_per_task(db, policy):
+    policy(PastTaskPolicy.RunAll)
+    early = _create_task(db, datetime(2030, 1, 1, 10, 15))
+    late = _create_task(db, datetime(2030, 1, 1, 10, 45))
+
+    with freeze_time("2030-01-01 11:00:30"):
+        catch_up_missed_fires(UNTIL)
+
+    assert _statuses(db, early) == [ResultStatus.Done] * 4
+    assert _statuses(db, late) == [ResultStatus.Done] * 2
+    assert early.next_run_at == datetime(2030, 1, 1, 11, 15)
+
+
+def test_run_once_coalesces_missed_fires(db, policy):
+    policy(PastTaskPolicy.RunOnce)
+    task = _create_task(db, datetime(2030, 1, 1, 10, 0))
+
+    catch_up_missed_fires(UNTIL)
+
+    assert _statuses(db, task) == [ResultStatus.Done]
+
+
+def test_missed_fires_run_the_task_handler(db, policy):
+    @register_handler("test.catch-up")
+    def caught_up(context, params):
+        return f"caught up {context.task_name} with {params['note']}"
+
+    policy(PastTaskPolicy.RunOnce)
+    task = ScheduledTask(
+        name="handled task",
+        cron_expression="*/15 * * * *",
+        next_run_at=datetime(2030, 1, 1, 10, 0),
+        handler="test.catch-up",
+        handler_params={"note": "a handler"},
+    )
+    db.add(task)
+    db.commit()
+
+    catch_up_missed_fires(UNTIL)
+
+    assert [result.result for result in task.results] == ["caught up handled task with a handler"]
+
+
+def test_fail_records_missed_fires(db, policy):
+    policy(PastTaskPolicy.Fail)
+    task = _create_task(db, datetime(2030, 1, 1, 10, 30))
+
+    catch_up_missed_fires(UNTIL)
+
+    assert _statuses(db, task) == [ResultStatus.Failed] * 3
+
+
+def test_claimed_fires_are_not_caught_up_twice(db, policy):
+    policy(PastTaskPolicy.RunAll)
+    task = _create_task(db, datetime(2030, 1, 1, 10, 30))
+    catch_up_missed_fires(UNTIL)
+
+    task.next_run_at = datetime(2030, 1, 1, 10, 30)
+    db.commit()
+    catch_up_missed_fires(UNTIL)
+
+    assert len(_statuses(db, task)) == 3
+
+
+def test_skip_leaves_missed_fires(db, policy):
+    policy(PastTaskPolicy.Skip)
+    task = _create_task(db, datetime(2030, 1, 1, 10, 0))
+
+    catch_up_missed_fires(UNTIL)
+
+    assert _statuses(db, task) == []
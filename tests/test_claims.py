@@ -0,0 +1,59 @@
+import threading
+import uuid
+
+import pytest
+
+from core.claims import ClaimBatcher
+from job_scheduler.redis_client import redis_client
+
+
+@pytest.fixture
+def claim_keys():
+    keys = [f"test:claim:{uuid.uuid4()}" for _ in range(20)]
+    yield keys
+    redis_client.delete(*keys)
+
+
+def test_claim_is_won_once(claim_keys):
+    batcher = ClaimBatcher(owner="replica-1", ttl=60, window=0, max_batch=10)
+    assert batcher.claim(claim_keys[0]) is True
+    assert batcher.claim(claim_keys[0]) is False
+    assert batcher.claim(claim_keys[1]) is True
+
+
+def test_concurrent_claims_share_one_round_trip(claim_keys, monkeypatch):
+    batcher = ClaimBatcher(owner="replica-1", ttl=60, window=0.2, max_batch=len(claim_keys))
+    round_trips = []
+    claim_many = batcher.claim_many
+
+    def counting_claim_many(keys):
+        round_trips.append(len(keys))
+        return claim_many(keys)
+
+    monkeypatch.setattr(batcher, "claim_many", counting_claim_many)
+
+    results = {}
+
+    def claim(key):
+        results[key] = batcher.claim(key)
+
+    threads = [threading.Thread(target=claim, args=(key,)) for key in claim_keys]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=5)
+
+    assert all(results[key] for key in claim_keys)
+    assert round_trips == [len(claim_keys)]
+
+
+def test_claim_errors_reach_the_caller(claim_keys, monkeypatch):
+    batcher = ClaimBatcher(owner="replica-1", ttl=60, window=0.01, max_batch=10)
+
+    def broken_claim_many(keys):
+        raise ConnectionError("Redis is down")
+
+    monkeypatch.setattr(batcher, "claim_many", broken_claim_many)
+
+    with pytest.raises(ConnectionError):
+        batcher.claim(claim_keys[0])
@@ -1,12 +1,15 @@
-from datetime import timedelta
+from datetime import datetime, timedelta, timezone
 
 from apscheduler.triggers.cron import CronTrigger
 from freezegun import freeze_time
 
+from core.claims import get_claim_key
 from core.models import ExecutedTask, ScheduledTask
+from core.results import result_sink
 from core.tasks import (
     get_result,
     get_result_for_error,
+    get_scheduled_fire_time,
     get_task_next_run_at,
     run_task,
     schedule_task,
@@ -47,6 +50,7 @@ def test_run_task_success(db):
 
     with freeze_time("2025-05-03 12:14:01"):
         run_task(task.slug)
+        result_sink.flush()
         db.refresh(task)
         assert task.next_run_at == previous_next_run_at + timedelta(minutes=2)
 
@@ -58,13 +62,54 @@ def test_run_task_success(db):
 
 def test_run_task_double_execution_prevented(db):
     task = create_task(db, "locked_task")
-    lock = redis_client.lock(f"lock:task:{task.scheduled_task_id}", timeout=60)
-    lock.acquire()
+    claim_key = get_claim_key(task.slug, datetime(2025, 5, 3, 12, 14, tzinfo=timezone.utc))
+    redis_client.set(claim_key, "another-replica", ex=60)
     assert task.results.count() == 0
-    run_task(task.scheduled_task_id)
+
+    with freeze_time("2025-05-03 12:14:01"):
+        run_task(task.slug)
+    result_sink.flush()
+
     db.refresh(task)
     assert task.results.count() == 0
-    lock.release()
+    redis_client.delete(claim_key)
+
+
+def test_run_task_claims_each_fire_once(db):
+    task = create_task(db, "claimed_task")
+
+    with freeze_time("2025-05-03 12:14:01"):
+        run_task(task.slug)
+    with freeze_time("2025-05-03 12:14:30"):
+        run_task(task.slug)
+    with freeze_time("2025-05-03 12:16:01"):
+        run_task(task.slug)
+    result_sink.flush()
+
+    assert task.results.count() == 2
+
+
+def test_run_task_claims_the_fire_time_passed_by_the_scheduler(db):
+    task = create_task(db, "timed_task")
+    fire_time = datetime(2025, 5, 3, 12, 14, tzinfo=timezone.utc)
+
+    # Late runs of the same fire are claimed once, whatever the wall clock says
+    with freeze_time("2025-05-03 12:14:59"):
+        run_task(task.slug, fire_time=fire_time)
+    with freeze_time("2025-05-03 12:15:30"):
+        run_task(task.slug, fire_time=fire_time)
+    result_sink.flush()
+
+    assert task.results.count() == 1
+
+
+def test_scheduled_fire_time_of_late_run():
+    scheduler.add_job(lambda: None, trigger=CronTrigger.from_crontab("*/5 * * * *", timezone="UTC"), id="late-job")
+    try:
+        now = datetime(2025, 5, 3, 12, 16, 30, tzinfo=timezone.utc)
+        assert get_scheduled_fire_time("late-job", now) == datetime(2025, 5, 3, 12, 15, tzinfo=timezone.utc)
+    finally:
+        scheduler.remove_job("late-job")
 
 
 def test_run_task_failure(db, monkeypatch):
@@ -76,6 +121,7 @@ def test_run_task_failure(db, monkeypatch):
     monkeypatch.setattr("core.tasks.get_result", broken_result)
 
     run_task(task.slug)
+    result_sink.flush()
 
     db.refresh(task)
 
@@ -0,0 +1,74 @@
+from collections import Counter
+
+from fastapi.testclient import TestClient
+
+from core.counters import (
+    get_result_count,
+    get_task_count,
+    increment_result_counts,
+    increment_task_count,
+    reconcile_counters,
+    set_result_count,
+    set_task_count,
+)
+from core.models import ExecutedTask, ScheduledTask
+from core.results import result_sink
+from core.tasks import run_task
+from job_scheduler.constants import ResultStatus
+from job_scheduler.main import app
+
+client = TestClient(app)
+
+
+def test_task_count_is_maintained_after_first_read(db):
+    client.post("/tasks", json={"name": "Counted Task", "cron_expression": "*/5 * * * *"})
+    assert client.get("/tasks").json()["count"] == 1
+    assert get_task_count() == 1
+
+    client.post("/tasks:batch", json={"tasks": [{"name": "Batch", "cron_expression": "*/5 * * * *"}] * 3})
+    slug = client.post("/tasks", json={"name": "Deleted", "cron_expression": "*/5 * * * *"}).json()["slug"]
+    client.delete(f"/tasks/{slug}")
+
+    assert get_task_count() == 4
+    assert client.get("/tasks").json()["count"] == 4
+
+
+def test_uninitialized_counters_are_not_incremented():
+    increment_task_count(5)
+    increment_result_counts(Counter({"unknown": 2}))
+
+    assert get_task_count() is None
+    assert get_result_count("unknown") is None
+
+
+def test_result_count_follows_flushed_results(db):
+    slug = client.post("/tasks", json={"name": "Counted Results", "cron_expression": "*/5 * * * *"}).json()["slug"]
+    assert client.get(f"/tasks/{slug}/results").json()["count"] == 0
+
+    run_task(slug)
+    result_sink.flush()
+
+    assert client.get(f"/tasks/{slug}/results").json()["count"] == 1
+
+
+def test_reconcile_corrects_drift(db, monkeypatch):
+    drifted = ScheduledTask(name="Drifted", cron_expression="*/5 * * * *")
+    correct = ScheduledTask(name="Correct", cron_expression="*/5 * * * *")
+    db.add_all([drifted, correct])
+    db.flush()
+    db.add(ExecutedTask(task_id=drifted.scheduled_task_id, status=ResultStatus.Done, result="ok"))
+    db.commit()
+    set_task_count(10)
+    set_result_count(drifted.scheduled_task_id, 5)
+    set_result_count(correct.scheduled_task_id, 0)
+    monkeypatch.setattr("core.counters.settings.counter_reconcile_batch_size", 1)
+
+    reconcile_counters()
+
+    assert get_task_count() is None
+    assert get_result_count(drifted.scheduled_task_id) is None
+    assert get_result_count(correct.scheduled_task_id) == 0
+    # The next reads count them again
+    assert client.get(f"/tasks/{drifted.slug}/results").json()["count"] == 1
+    assert client.get("/tasks").json()["count"] == db.query(ScheduledTask).count()
+    db.query(ExecutedTask).delete()
@@ -0,0 +1,40 @@
+import pytest
+
+from core.cron import clear_cron_cache, get_cron_cache_stats, get_cron_trigger
+from core.models import ScheduledTask
+from core.schemas import TaskCreate
+from core.tasks import get_task_next_run_at
+
+
+@pytest.fixture(autouse=True)
+def empty_cron_cache():
+    clear_cron_cache()
+    yield
+    clear_cron_cache()
+
+
+def test_same_expression_shares_trigger():
+    trigger = get_cron_trigger("*/5 * * * *")
+    assert get_cron_trigger("*/5  *   * * *") is trigger
+    assert get_cron_trigger("*/2 * * * *") is not trigger
+
+    stats = get_cron_cache_stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 2
+    assert stats["size"] == 2
+
+
+def test_invalid_expression_is_not_cached():
+    with pytest.raises(ValueError):
+        get_cron_trigger("*/5 harry potter *")
+
+    assert get_cron_cache_stats()["size"] == 0
+
+
+def test_validation_and_next_run_share_cache():
+    TaskCreate(name="cached", cron_expression="*/7 * * * *")
+    get_task_next_run_at(ScheduledTask(name="cached", cron_expression="*/7 * * * *"))
+
+    stats = get_cron_cache_stats()
+    assert stats["misses"] == 1
+    assert stats["hits"] == 1
@@ -0,0 +1,174 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.pool import QueuePool
+
+from core.dispatch import Fire, FireDispatcher, get_max_concurrency
+from core.models import ScheduledTask
+from core.results import result_sink
+from core.tasks import fire_dispatcher, run_task
+from job_scheduler.config import settings
+from job_scheduler.constants import ResultStatus, TaskPriority
+from job_scheduler.database import engine
+from job_scheduler.main import app
+
+client = TestClient(app)
+
+FIRE_TIME = datetime(2025, 5, 3, 12, 0, tzinfo=timezone.utc)
+
+
+def make_fire(slug, priority, waited=0.0):
+    return Fire(slug, None, priority, FIRE_TIME, time.monotonic() - waited)
+
+
+def make_dispatcher(ran, shed, max_concurrency=1, queue_size=10):
+    return FireDispatcher(
+        max_concurrency=max_concurrency,
+        delay_threshold=5,
+        low_priority_queue_size=queue_size,
+        low_priority_max_wait=60,
+        run=lambda fire, delayed: ran.append((fire.task_slug, delayed)),
+        shed=lambda fire, reason: shed.append(fire.task_slug),
+    )
+
+
+def test_queued_fires_start_by_priority():
+    ran, shed = [], []
+    dispatcher = make_dispatcher(ran, shed)
+
+    def run(fire, delayed):
+        ran.append((fire.task_slug, delayed))
+        if fire.task_slug == "first":
+            # The only slot is taken, these fires wait until the first one is done
+            for priority in (TaskPriority.Low, TaskPriority.Normal, TaskPriority.High):
+                dispatcher.dispatch(make_fire(priority.value, priority))
+            assert dispatcher.get_stats()["queued"] == {"high": 1, "normal": 1, "low": 1}
+
+    dispatcher.run = run
+    dispatcher.dispatch(make_fire("first", TaskPriority.Low))
+
+    assert [slug for slug, _ in ran] == ["first", "high", "normal", "low"]
+    assert shed == []
+    assert dispatcher.get_stats()["active"] == 0
+
+
+def test_low_priority_fires_are_shed_under_backpressure():
+    ran, shed = [], []
+    dispatcher = make_dispatcher(ran, shed, max_concurrency=0, queue_size=1)
+
+    dispatcher.dispatch(make_fire("queued", TaskPriority.Low))
+    dispatcher.dispatch(make_fire("shed", TaskPriority.Low))
+    dispatcher.dispatch(make_fire("normal", TaskPriority.Normal))
+    assert shed == ["shed"]
+
+    # A low priority fire that waited past its max wait is shed instead of run
+    dispatcher.max_concurrency = 1
+    dispatcher.dispatch(make_fire("stale", TaskPriority.Low, waited=120))
+    assert shed == ["shed", "stale"]
+    assert [slug for slug, _ in ran] == ["normal", "queued"]
+
+
+def test_fires_waiting_past_the_threshold_are_delayed():
+    ran, shed = [], []
+    dispatcher = make_dispatcher(ran, shed)
+
+    dispatcher.dispatch(make_fire("on-time", TaskPriority.Normal))
+    dispatcher.dispatch(make_fire("late", TaskPriority.Normal, waited=10))
+
+    assert ran == [("on-time", False), ("late", True)]
+
+
+def test_closed_dispatcher_sheds_queued_and_late_fires():
+    ran, shed = [], []
+    dispatcher = make_dispatcher(ran, shed, max_concurrency=0)
+    dispatcher.dispatch(make_fire("high", TaskPriority.High))
+    dispatcher.dispatch(make_fire("normal", TaskPriority.Normal))
+
+    dispatcher.close()
+    assert shed == ["high", "normal"]
+    assert dispatcher.get_stats()["queued"] == {"high": 0, "normal": 0, "low": 0}
+
+    dispatcher.max_concurrency = 1
+    dispatcher.dispatch(make_fire("late", TaskPriority.High))
+    assert shed == ["high", "normal", "late"]
+    assert ran == []
+
+
+def test_max_concurrency_leaves_connections_for_the_api(monkeypatch):
+    monkeypatch.setattr("job_scheduler.config.settings.scheduler_max_workers", 100)
+    pool = engine.pool
+    if not isinstance(pool, QueuePool) or pool._max_overflow < 0:
+        pytest.skip("The DB pool of DB_URL is unbounded")
+    connections = pool.size() + pool._max_overflow
+    assert get_max_concurrency() == max(connections - settings.dispatch_reserved_connections, 1)
+
+    monkeypatch.setattr("job_scheduler.config.settings.dispatch_max_concurrency", 3)
+    assert get_max_concurrency() == 3
+
+
+def test_max_concurrency_keeps_an_executor_worker_free(monkeypatch):
+    assert get_max_concurrency() <= settings.scheduler_max_workers - 1
+
+    monkeypatch.setattr("job_scheduler.config.settings.dispatch_max_concurrency", 50)
+    assert get_max_concurrency() == settings.scheduler_max_workers - 1
+
+
+def test_high_priority_fire_overtakes_queued_low_priority_fires_by_default():
+    # Fires are run on an executor pool of the default size, through a dispatcher of the default concurrency
+    max_concurrency = get_max_concurrency()
+    started, finish = [], threading.Semaphore(0)
+
+    def run(fire, delayed):
+        started.append(fire.task_slug)
+        finish.acquire(timeout=5)
+
+    dispatcher = make_dispatcher(started, [], max_concurrency=max_concurrency, queue_size=100)
+    dispatcher.run = run
+    executor = ThreadPoolExecutor(settings.scheduler_max_workers)
+
+    fires = [make_fire(f"low-{i}", TaskPriority.Low) for i in range(2 * settings.scheduler_max_workers)]
+    fires.append(make_fire("high", TaskPriority.High))
+    for fire in fires:
+        executor.submit(dispatcher.dispatch, fire)
+    while sum(dispatcher.get_stats()["queued"].values()) < len(fires) - max_concurrency:
+        time.sleep(0.01)
+
+    # The next fire to start is the high priority one, although every low priority fire was submitted before it
+    finish.release()
+    while len(started) == max_concurrency:
+        time.sleep(0.01)
+    assert started[max_concurrency] == "high"
+
+    for _ in fires:
+        finish.release()
+    executor.shutdown(wait=True)
+    assert len(started) == len(fires)
+
+
+def create_task(priority):
+    res = client.post("/tasks", json={"name": "Dispatched", "cron_expression": "* * * * *", "priority": priority})
+    assert res.json()["priority"] == priority
+    return res.json()["slug"]
+
+
+def get_task_id(db, slug):
+    return db.query(ScheduledTask.scheduled_task_id).filter(ScheduledTask.slug == slug).scalar()
+
+
+def test_shed_and_delayed_fires_are_recorded(db, monkeypatch):
+    shed = db.get(ScheduledTask, get_task_id(db, create_task("low")))
+    delayed = db.get(ScheduledTask, get_task_id(db, create_task("normal")))
+
+    monkeypatch.setattr(fire_dispatcher, "max_concurrency", 0)
+    monkeypatch.setattr(fire_dispatcher, "low_priority_queue_size", 0)
+    run_task(shed.slug, shed.scheduled_task_id, "low")
+    monkeypatch.setattr(fire_dispatcher, "max_concurrency", 1)
+    fire_dispatcher.dispatch(Fire(delayed.slug, delayed.scheduled_task_id, TaskPriority.Normal, FIRE_TIME, 0))
+    result_sink.flush()
+
+    assert [result.status for result in shed.results] == [ResultStatus.Shed]
+    assert [result.status for result in delayed.results] == [ResultStatus.Delayed]
@@ -0,0 +1,141 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from apscheduler.events import EVENT_JOB_MISSED
+from apscheduler.jobstores.base import ConflictingIdError, JobLookupError
+from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.triggers.date import DateTrigger
+
+from core.cron import get_cron_trigger
+from core.engine import CompactExecutor, CompactScheduler, FireTimeThreadPoolExecutor
+from core.tasks import create_scheduler, get_executor_stats
+from job_scheduler.config import settings
+from job_scheduler.constants import SchedulerEngine
+
+JOB_DEFAULTS = {"max_instances": 1, "coalesce": True, "misfire_grace_time": 60}
+
+
+@pytest.fixture
+def compact_scheduler():
+    scheduler = CompactScheduler(executor=CompactExecutor(ThreadPoolExecutor(4)), job_defaults=JOB_DEFAULTS)
+    yield scheduler
+    if scheduler.running:
+        scheduler.shutdown()
+
+
+def test_jobs_with_the_same_cron_share_a_group(compact_scheduler):
+    for slug in ("a", "b", "c"):
+        compact_scheduler.add_job(print, trigger=get_cron_trigger("*/5 * * * *"), args=[slug], id=slug)
+    compact_scheduler.add_job(print, trigger=get_cron_trigger("0 * * * *"), args=["d"], id="d")
+
+    assert len(compact_scheduler._groups) == 2
+    assert compact_scheduler.get_job("a").trigger is compact_scheduler.get_job("b").trigger
+
+    compact_scheduler.remove_job("d")
+    assert len(compact_scheduler._groups) == 1
+    assert sorted(job.id for job in compact_scheduler.get_jobs()) == ["a", "b", "c"]
+
+
+def test_job_ids_are_unique(compact_scheduler):
+    trigger = get_cron_trigger("*/5 * * * *")
+    compact_scheduler.add_job(print, trigger=trigger, id="job")
+
+    with pytest.raises(ConflictingIdError):
+        compact_scheduler.add_job(print, trigger=trigger, id="job")
+    compact_scheduler.add_job(print, trigger=get_cron_trigger("0 * * * *"), id="job", replace_existing=True)
+
+    assert len(compact_scheduler.get_jobs()) == 1
+    with pytest.raises(JobLookupError):
+        compact_scheduler.remove_job("unknown")
+
+
+def test_due_group_dispatches_all_its_jobs(compact_scheduler):
+    fired = []
+    done = threading.Event()
+
+    def run(slug):
+        fired.append(slug)
+        if len(fired) == 3:
+            done.set()
+
+    trigger = DateTrigger(datetime.now(timezone.utc) + timedelta(milliseconds=200))
+    for slug in ("a", "b", "c"):
+        compact_scheduler.add_job(run, trigger=trigger, args=[slug], id=slug)
+    compact_scheduler.start()
+
+    assert done.wait(timeout=5)
+    assert sorted(fired) == ["a", "b", "c"]
+    assert compact_scheduler.get_jobs() == []
+
+
+def test_fires_past_the_grace_time_are_missed(compact_scheduler):
+    missed = []
+    reported = threading.Event()
+
+    def on_missed(event):
+        missed.append(event.job_id)
+        reported.set()
+
+    compact_scheduler.add_listener(on_missed, EVENT_JOB_MISSED)
+    fired = []
+
+    trigger = DateTrigger(datetime.now(timezone.utc) - timedelta(seconds=10))
+    compact_scheduler.add_job(fired.append, trigger=trigger, args=["late"], id="late", misfire_grace_time=1)
+    compact_scheduler.start()
+
+    assert reported.wait(timeout=5)
+    assert missed == ["late"]
+    assert fired == []
+
+
+def test_jobs_declaring_fire_time_get_their_run_time(compact_scheduler):
+    run_date = (datetime.now(timezone.utc) + timedelta(milliseconds=200)).replace(microsecond=0) + timedelta(seconds=1)
+    background_scheduler = BackgroundScheduler(executors={"default": FireTimeThreadPoolExecutor(2)})
+    fired = []
+    done = threading.Event()
+
+    def run(engine, fire_time=None):
+        fired.append((engine, fire_time))
+        if len(fired) == 3:
+            done.set()
+
+    for engine, scheduler in (("apscheduler", background_scheduler), ("compact", compact_scheduler)):
+        scheduler.add_job(run, trigger=DateTrigger(run_date), args=[engine], kwargs={"fire_time": None}, id="timed")
+        scheduler.start()
+    # Jobs without the keyword are called as before
+    background_scheduler.add_job(run, trigger=DateTrigger(run_date), args=["untimed"], id="untimed")
+
+    try:
+        assert done.wait(timeout=5)
+    finally:
+        background_scheduler.shutdown()
+    assert sorted(fired) == [("apscheduler", run_date), ("compact", run_date), ("untimed", None)]
+
+
+def test_compact_engine_is_selectable(monkeypatch):
+    monkeypatch.setattr(settings, "scheduler_engine", SchedulerEngine.Compact)
+    scheduler = create_scheduler()
+    assert isinstance(scheduler, CompactScheduler)
+
+    monkeypatch.setattr("core.tasks.scheduler", scheduler)
+    assert get_executor_stats()["active_workers"] == 0
+
+
+def test_paused_job_is_left_out_of_its_group(compact_scheduler):
+    trigger = get_cron_trigger("*/5 * * * *")
+    compact_scheduler.add_job(print, trigger=trigger, id="paused")
+    compact_scheduler.add_job(print, trigger=trigger, id="added-paused", next_run_time=None)
+
+    compact_scheduler.pause_job("paused")
+    assert compact_scheduler.get_job("paused").next_run_time is None
+    assert compact_scheduler._groups == {}
+
+    compact_scheduler.resume_job("paused")
+    compact_scheduler.resume_job("added-paused")
+    assert compact_scheduler.get_job("paused").next_run_time is not None
+    assert list(compact_scheduler._groups.values())[0].jobs.keys() == {"paused", "added-paused"}
+
+    with pytest.raises(JobLookupError):
+        compact_scheduler.pause_job("unknown")
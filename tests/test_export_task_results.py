@@ -0,0 +1,77 @@
+import csv
+import gzip
+import io
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+
+from core.models import ExecutedTask, ScheduledTask
+from job_scheduler.constants import ResultStatus
+from job_scheduler.main import app
+
+client = TestClient(app)
+
+START = datetime(2025, 5, 3, 12, 0)
+
+
+@pytest.fixture
+def task_slug(db, monkeypatch):
+    # A small chunk size makes the export span several round trips
+    monkeypatch.setattr("job_scheduler.config.settings.export_chunk_size", 3)
+    task = ScheduledTask(slug="export-slug", name="Exported", cron_expression="* * * * *")
+    db.add(task)
+    db.flush()
+    db.add_all(
+        ExecutedTask(
+            task_id=task.scheduled_task_id,
+            executed_at=START + timedelta(minutes=i),
+            status=ResultStatus.Done.value,
+            result=f"result, {i}",
+        )
+        for i in range(10)
+    )
+    db.commit()
+    yield task.slug
+    db.query(ExecutedTask).delete()
+    db.commit()
+
+
+def test_export_ndjson(task_slug):
+    res = client.get(f"/tasks/{task_slug}/results/export")
+    assert res.status_code == 200
+    assert res.headers["content-type"] == "application/x-ndjson"
+
+    rows = [json.loads(line) for line in res.text.splitlines()]
+    assert [row["result"] for row in rows] == [f"result, {i}" for i in range(10)]
+    assert rows[0] == {"executed_at": START.isoformat(), "status": "Done", "result": "result, 0"}
+
+
+def test_export_csv_in_range(task_slug):
+    since, until = START + timedelta(minutes=2), START + timedelta(minutes=5)
+    res = client.get(
+        f"/tasks/{task_slug}/results/export",
+        params={"format": "csv", "since": since.isoformat(), "until": until.isoformat()},
+    )
+    assert res.status_code == 200
+    assert res.headers["content-type"].startswith("text/csv")
+
+    rows = list(csv.reader(io.StringIO(res.text)))
+    assert rows[0] == ["executed_at", "status", "result"]
+    assert [row[2] for row in rows[1:]] == ["result, 2", "result, 3", "result, 4"]
+
+
+def test_export_gzip(task_slug):
+    res = client.get(f"/tasks/{task_slug}/results/export", params={"gzip": True})
+    assert res.status_code == 200
+    assert res.headers["content-disposition"] == 'attachment; filename="export-slug-results.ndjson.gz"'
+
+    lines = gzip.decompress(res.content).decode().splitlines()
+    assert len(lines) == 10
+
+
+def test_export_nonexistent_task():
+    res = client.get("/tasks/nonexistent-id/results/export")
+    assert res.status_code == 404
+    assert res.json()["detail"]["error_code"] == "TASK_404"
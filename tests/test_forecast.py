@@ -0,0 +1,170 @@
+import time
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+import pytest
+from apscheduler.triggers.cron import CronTrigger
+from fastapi.testclient import TestClient
+
+from core.cron import get_fire_offset, get_offset_trigger
+from core.forecast import (
+    CronExpansion,
+    ForecastGroup,
+    forecast_fires,
+    get_upcoming_fire_times,
+    iter_fire_times,
+)
+from core.models import ScheduledTask
+from job_scheduler.main import app
+
+client = TestClient(app)
+
+START = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def get_trigger_fire_times(trigger, start: datetime, end: datetime) -> list[datetime]:
+    fire_times = []
+    fire_time = trigger.get_next_fire_time(None, start)
+    while fire_time < end:
+        fire_times.append(fire_time)
+        fire_time = trigger.get_next_fire_time(fire_time, fire_time)
+    return fire_times
+
+
+@pytest.mark.parametrize(
+    "cron_expression",
+    ["*/7 3-5 * * mon-fri", "0 0 last * *", "15,45 */6 1-10 feb,mar *", "59 23 31 * sun", "0 12 29 2 *"],
+)
+def test_expansion_matches_cron_trigger(cron_expression):
+    end = START + timedelta(days=800)
+    trigger = CronTrigger.from_crontab(cron_expression, timezone=timezone.utc)
+
+    fire_times = [fire_time.timestamp() for fire_time in iter_fire_times(cron_expression, START, end)]
+    assert fire_times == [fire_time.timestamp() for fire_time in get_trigger_fire_times(trigger, START, end)]
+
+
+def test_day_must_match_day_of_month_and_day_of_week():
+    fire_times = list(iter_fire_times("0 0 13 * fri", START, START + timedelta(days=365)))
+
+    assert [fire_time.date().isoformat() for fire_time in fire_times] == ["2026-02-13", "2026-03-13", "2026-11-13"]
+
+
+def test_offset_change_skips_and_repeats_wall_clock_times():
+    berlin = ZoneInfo("Europe/Berlin")
+    expansion = CronExpansion(CronTrigger.from_crontab("30 2 * * *", timezone=berlin))
+
+    def fires_on(day: datetime) -> list[str]:
+        start = int(day.timestamp())
+        return [
+            datetime.fromtimestamp(base + second, berlin).isoformat()
+            for base, seconds in expansion.iter_days(start, start + 86400)
+            for second in seconds
+            if start <= base + second < start + 86400
+        ]
+
+    assert fires_on(datetime(2026, 3, 29, tzinfo=berlin)) == []
+    assert fires_on(datetime(2026, 10, 25, tzinfo=berlin)) == [
+        "2026-10-25T02:30:00+02:00",
+        "2026-10-25T02:30:00+01:00",
+    ]
+
+
+def test_forecast_weights_each_expression_by_its_tasks():
+    groups = [ForecastGroup("* * * * *", 0, 3), ForecastGroup("*/15 * * * *", 0, 2), ForecastGroup("0 1 * * *", 0, 5)]
+
+    counts = forecast_fires(groups, START, START + timedelta(hours=2), 3600)
+    assert counts == [3 * 60 + 2 * 4, 3 * 60 + 2 * 4 + 5]
+
+    per_minute = forecast_fires(groups, START, START + timedelta(minutes=20), 60)
+    assert per_minute[:2] == [3 + 2, 3] and per_minute[15] == 3 + 2
+
+
+def test_forecast_spreads_jittered_fires_over_their_window():
+    counts = forecast_fires([ForecastGroup("0 * * * *", 600, 10)], START, START + timedelta(hours=1), 300)
+
+    assert counts == [5, 5] + [0] * 10
+
+
+def test_forecast_of_a_million_tasks_is_fast():
+    groups = [ForecastGroup(f"{i % 60} */{i % 12 + 1} * * *", 0, 1000) for i in range(500)]
+    groups += [ForecastGroup(f"*/{i % 30 + 1} {i % 24}-23 * * *", 0, 1000) for i in range(500)]
+
+    started_at = time.perf_counter()
+    counts = forecast_fires(groups, START, START + timedelta(days=1), 60)
+    assert time.perf_counter() - started_at < 1
+    assert len(counts) == 1440
+
+
+def test_upcoming_fire_times_of_a_task(db):
+    res = client.post("/tasks", json={"name": "Upcoming", "cron_expression": "*/5 * * * *", "jitter_seconds": 60})
+    slug = res.json()["slug"]
+
+    res = client.get(f"/tasks/{slug}/upcoming", params={"n": 3})
+    assert res.status_code == 200
+    fire_times = [datetime.fromisoformat(fire_time) for fire_time in res.json()["fire_times"]]
+
+    trigger = get_offset_trigger("*/5 * * * *", get_fire_offset(slug, 60))
+    expected = [trigger.get_next_fire_time(None, datetime.now(timezone.utc))]
+    for _ in range(2):
+        expected.append(trigger.get_next_fire_time(expected[-1], expected[-1]))
+    # The next fire may pass between the request and computing the expected ones
+    assert fire_times == expected or fire_times[1:] == expected[:2]
+
+
+@pytest.mark.parametrize("cron_expression", ["59 23 31 12 *", "0 0 29 2 *"])
+def test_rare_expressions_have_every_upcoming_fire(cron_expression):
+    trigger = CronTrigger.from_crontab(cron_expression, timezone=timezone.utc)
+    expected = [trigger.get_next_fire_time(None, START)]
+    for _ in range(99):
+        expected.append(trigger.get_next_fire_time(expected[-1], expected[-1] + timedelta(seconds=1)))
+
+    # Past the bitmask horizon the fires come from the trigger
+    assert get_upcoming_fire_times(cron_expression, 0, START, 100) == expected
+    assert get_upcoming_fire_times(cron_expression, 30, START, 3) == [
+        fire_time + timedelta(seconds=30) for fire_time in expected[:3]
+    ]
+
+
+def test_paused_task_has_no_upcoming_fires(db):
+    slug = client.post("/tasks", json={"name": "Paused", "cron_expression": "* * * * *"}).json()["slug"]
+    client.post("/tasks:pause", json={"slugs": [slug]})
+
+    res = client.get(f"/tasks/{slug}/upcoming")
+    assert res.json() == {"slug": slug, "paused": True, "fire_times": []}
+    assert client.get("/tasks/missing/upcoming").status_code == 404
+
+
+def test_schedule_forecast_counts_all_active_tasks(db):
+    db.query(ScheduledTask).delete()
+    db.add_all(
+        [ScheduledTask(name=f"Quarter {i}", cron_expression="*/15 * * * *") for i in range(3)]
+        + [ScheduledTask(name="Hourly", cron_expression="0  * * * *")]
+        + [ScheduledTask(name="Paused", cron_expression="* * * * *", paused=True)]
+    )
+    db.commit()
+
+    res = client.get(
+        "/schedule/forecast",
+        params={"from": "2026-01-01T00:00:00Z", "to": "2026-01-01T01:00:00Z", "bucket": 900},
+    )
+    assert res.status_code == 200
+    forecast = res.json()
+    assert forecast["tasks"] == 4
+    assert forecast["fires"] == 3 * 4 + 1
+    assert [bucket["fires"] for bucket in forecast["buckets"]] == [4, 3, 3, 3]
+    assert forecast["buckets"][1]["start"] == "2026-01-01T00:15:00Z"
+
+
+@pytest.mark.parametrize(
+    "params",
+    [
+        {"from": "2026-01-02T00:00:00Z", "to": "2026-01-01T00:00:00Z"},
+        {"from": "2026-01-01T00:00:00Z", "to": "2026-03-01T00:00:00Z", "bucket": 86400},
+        {"from": "2026-01-01T00:00:00Z", "to": "2026-01-08T00:00:00Z", "bucket": 1},
+    ],
+)
+def test_invalid_forecast_window_is_rejected(params):
+    res = client.get("/schedule/forecast", params=params)
+
+    assert res.status_code == 400
+    assert res.json()["detail"]["error_code"] == "FORECAST_400"
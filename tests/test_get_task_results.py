@@ -73,3 +73,18 @@ def test_get_tasks_pagination_works(task_with_results):
     assert len(data["result"]) == 2
     assert data["result"][0]["result"] == "result-5"
     assert data["result"][1]["result"] == "result-6"
+
+
+def test_list_task_results_cursor_pagination_works(task_with_results):
+    slug = task_with_results
+    first_page = client.get(f"/tasks/{slug}/results?limit=4&include_count=false").json()
+    assert first_page["count"] is None
+    assert [r["result"] for r in first_page["result"]] == ["result-0", "result-1", "result-2", "result-3"]
+
+    second_page = client.get(f"/tasks/{slug}/results?limit=4&after={first_page['next_cursor']}").json()
+    assert second_page["count"] == 10
+    assert [r["result"] for r in second_page["result"]] == ["result-4", "result-5", "result-6", "result-7"]
+
+    last_page = client.get(f"/tasks/{slug}/results?limit=4&after={second_page['next_cursor']}").json()
+    assert [r["result"] for r in last_page["result"]] == ["result-8", "result-9"]
+    assert last_page["next_cursor"] is None
@@ -34,3 +34,30 @@ def test_get_tasks_pagination_works(db):
     assert len(data["result"]) == 2
     assert data["result"][0]["name"] == "Visible Task 5"
     assert data["result"][1]["name"] == "Visible Task 6"
+
+
+def test_get_tasks_cursor_pagination_works(db):
+    for i in range(5):
+        res = client.post(
+            "/tasks",
+            json={"name": f"Cursor Task {i}", "cron_expression": "*/5 * * * *"},
+        )
+        assert res.status_code == 200
+
+    first_page = client.get("/tasks?limit=2&include_count=false").json()
+    assert first_page["count"] is None
+    assert [task["name"] for task in first_page["result"]] == ["Cursor Task 0", "Cursor Task 1"]
+
+    second_page = client.get(f"/tasks?limit=2&after={first_page['next_cursor']}").json()
+    assert second_page["count"] == 5
+    assert [task["name"] for task in second_page["result"]] == ["Cursor Task 2", "Cursor Task 3"]
+
+    last_page = client.get(f"/tasks?limit=2&after={second_page['next_cursor']}").json()
+    assert [task["name"] for task in last_page["result"]] == ["Cursor Task 4"]
+    assert last_page["next_cursor"] is None
+
+
+def test_get_tasks_invalid_cursor():
+    response = client.get("/tasks?after=not-a-cursor")
+    assert response.status_code == 400
+    assert response.json()["detail"]["error_code"] == "CURSOR_400"
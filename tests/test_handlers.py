@@ -0,0 +1,152 @@
+import hashlib
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from core.handlers import (
+    HandlerCancelled,
+    HandlerContext,
+    HandlerError,
+    HandlerTimeout,
+    register_handler,
+)
+from core.models import ScheduledTask
+from core.results import result_sink
+from core.tasks import get_result, run_task
+from core.worker_pool import HandlerPool
+from job_scheduler.constants import ResultStatus
+from job_scheduler.main import app
+
+client = TestClient(app)
+
+CONTEXT = HandlerContext(task_slug="hashed", task_name="Hashed")
+ENDLESS = {"rounds": 10**12}
+
+
+@pytest.fixture(scope="module")
+def handler_pool():
+    pool = HandlerPool(size=1, modules=[])
+    pool.start()
+    yield pool
+    pool.stop()
+
+
+def wait_for_idle_worker(pool: HandlerPool):
+    # Killed workers are replaced in the background
+    deadline = time.monotonic() + 30
+    while pool._idle.empty() and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def sha256_rounds(data: str, rounds: int) -> str:
+    digest = data.encode()
+    for _ in range(rounds):
+        digest = hashlib.sha256(digest).digest()
+    return digest.hex()
+
+
+def test_registered_handler_runs_with_its_params():
+    @register_handler("test.upper")
+    def upper(context, params):
+        return f"{context.task_name}: {params['text'].upper()}"
+
+    task = ScheduledTask(slug="upper", name="Upper", handler="test.upper", handler_params={"text": "done"})
+    assert get_result(task) == "Upper: DONE"
+
+
+def test_unknown_handler_is_rejected():
+    res = client.post("/tasks", json={"name": "Unknown", "cron_expression": "* * * * *", "handler": "missing"})
+    assert res.status_code == 422
+
+
+def test_cpu_bound_handler_runs_in_a_worker_process(handler_pool):
+    assert handler_pool.run("sha256", CONTEXT, {"data": "a", "rounds": 3}, timeout=10) == sha256_rounds("a", 3)
+
+    with pytest.raises(HandlerError, match="ValueError"):
+        handler_pool.run("sha256", CONTEXT, {"rounds": "many"}, timeout=10)
+
+
+def test_handler_past_its_timeout_is_killed(handler_pool):
+    started_at = time.perf_counter()
+    with pytest.raises(HandlerTimeout):
+        handler_pool.run("sha256", CONTEXT, ENDLESS, timeout=0.5)
+    assert time.perf_counter() - started_at < 5
+
+    # The killed worker is replaced
+    assert handler_pool.run("sha256", CONTEXT, {"data": "b", "rounds": 1}, timeout=30) == sha256_rounds("b", 1)
+
+
+def test_running_handler_is_cancelled(handler_pool):
+    errors = []
+
+    def run():
+        try:
+            handler_pool.run("sha256", CONTEXT, ENDLESS, timeout=30)
+        except HandlerError as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    while handler_pool.cancel(CONTEXT.task_slug) == 0:
+        time.sleep(0.01)
+    thread.join(timeout=5)
+
+    assert isinstance(errors[0], HandlerCancelled)
+    wait_for_idle_worker(handler_pool)
+
+
+def test_wait_for_a_free_worker_times_out(handler_pool):
+    wait_for_idle_worker(handler_pool)
+    errors = []
+
+    def run():
+        try:
+            handler_pool.run("sha256", CONTEXT, ENDLESS, timeout=30)
+        except HandlerError as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    while not handler_pool._busy:
+        time.sleep(0.01)
+
+    started_at = time.perf_counter()
+    with pytest.raises(HandlerTimeout, match="waiting for a free worker"):
+        handler_pool.run("sha256", HandlerContext("queued", "Queued"), {"data": "c", "rounds": 1}, timeout=0.5)
+    assert time.perf_counter() - started_at < 5
+
+    handler_pool.cancel(CONTEXT.task_slug)
+    thread.join(timeout=5)
+    assert isinstance(errors[0], HandlerCancelled)
+    wait_for_idle_worker(handler_pool)
+
+
+def test_timeout_is_rejected_for_thread_handlers():
+    res = client.post("/tasks", json={"name": "Untimed", "cron_expression": "* * * * *", "timeout_seconds": 5})
+    assert res.status_code == 422
+    assert "timeout_seconds" in res.text
+
+
+def test_handler_timeout_is_recorded_as_failed(db, handler_pool, monkeypatch):
+    monkeypatch.setattr("core.tasks.handler_pool", handler_pool)
+    monkeypatch.setattr("core.schemas.settings.handler_workers", 1)
+    res = client.post(
+        "/tasks",
+        json={
+            "name": "Endless",
+            "cron_expression": "* * * * *",
+            "handler": "sha256",
+            "handler_params": ENDLESS,
+            "timeout_seconds": 1,
+        },
+    )
+    task = db.query(ScheduledTask).filter(ScheduledTask.slug == res.json()["slug"]).one()
+
+    run_task(task.slug, task.scheduled_task_id)
+    result_sink.flush()
+
+    result = task.results.one()
+    assert result.status == ResultStatus.Failed
+    assert "timed out after 1s" in result.result
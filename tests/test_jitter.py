@@ -0,0 +1,69 @@
+import pickle
+from collections import Counter
+from datetime import datetime, timezone
+
+from fastapi.testclient import TestClient
+
+from core.cron import (
+    OffsetTrigger,
+    get_cron_trigger,
+    get_fire_offset,
+    get_offset_trigger,
+)
+from core.models import ScheduledTask
+from core.tasks import scheduler
+from job_scheduler.main import app
+
+client = TestClient(app)
+
+
+def test_offsets_are_stable_and_spread():
+    offsets = [get_fire_offset(f"task-{i}", 60) for i in range(6000)]
+
+    assert offsets[:10] == [get_fire_offset(f"task-{i}", 60) for i in range(10)]
+    assert all(0 <= offset < 60 for offset in offsets)
+    # Every second of the window gets roughly its share of the 100 tasks expected
+    assert all(50 < count < 150 for count in Counter(offsets).values())
+    assert get_fire_offset("task-0", 0) == 0
+
+
+def test_offset_trigger_delays_each_fire():
+    trigger = get_offset_trigger("*/5 * * * *", 42)
+    now = datetime(2025, 5, 3, 12, 0, 30, tzinfo=timezone.utc)
+
+    fire_time = trigger.get_next_fire_time(None, now)
+    assert fire_time == datetime(2025, 5, 3, 12, 0, 42, tzinfo=timezone.utc)
+    assert trigger.get_next_fire_time(fire_time, fire_time) == datetime(2025, 5, 3, 12, 5, 42, tzinfo=timezone.utc)
+
+
+def test_offset_triggers_are_shared_and_picklable():
+    trigger = get_offset_trigger("*/5 * * * *", 42)
+
+    assert get_offset_trigger("*/5  * * * *", 42) is trigger
+    assert get_offset_trigger("*/5 * * * *", 0) is get_cron_trigger("*/5 * * * *")
+    assert pickle.loads(pickle.dumps(trigger)) == trigger
+    assert hash(OffsetTrigger(get_cron_trigger("*/5 * * * *"), trigger.offset)) == hash(trigger)
+
+
+def test_task_jitter_is_shown_in_next_run_at(db):
+    res = client.post("/tasks", json={"name": "Jittered", "cron_expression": "* * * * *", "jitter_seconds": 60})
+    assert res.status_code == 200
+    task = res.json()
+    offset = get_fire_offset(task["slug"], 60)
+
+    assert datetime.fromisoformat(task["next_run_at"]).second == offset
+    assert scheduler.get_job(task["slug"]).trigger == get_offset_trigger("* * * * *", offset)
+
+
+def test_global_jitter_applies_unless_disabled_per_task(db, monkeypatch):
+    monkeypatch.setattr("job_scheduler.config.settings.fire_jitter_seconds", 60)
+    items = [
+        {"name": "Global", "cron_expression": "0 * * * *"},
+        {"name": "Disabled", "cron_expression": "0 * * * *", "jitter_seconds": 0},
+    ]
+    jittered, disabled = client.post("/tasks:batch", json={"tasks": items}).json()["created"]
+
+    offset = get_fire_offset(jittered["slug"], 60)
+    assert datetime.fromisoformat(jittered["next_run_at"]).second == offset
+    assert datetime.fromisoformat(disabled["next_run_at"]).second == 0
+    assert db.query(ScheduledTask).filter(ScheduledTask.slug == disabled["slug"]).one().jitter_seconds == 0
@@ -0,0 +1,118 @@
+from datetime import timedelta
+
+import pytest
+from apscheduler.jobstores.sqlalchemy import SQLAlchemyJobStore
+from apscheduler.schedulers.background import BackgroundScheduler
+from pydantic import ValidationError
+
+from core.models import ScheduledTask, utc_now
+from core.recovery import RECONCILED_AT_KEY, reconcile_scheduled_tasks
+from core.results import ResultSink
+from core.tasks import add_task_job, create_job_store
+from job_scheduler.config import Settings, settings
+from job_scheduler.constants import JobStoreType, ResultStatus, SchedulerEngine
+from job_scheduler.database import engine
+from job_scheduler.redis_client import redis_client
+
+
+@pytest.fixture
+def persistent_scheduler(monkeypatch):
+    scheduler = BackgroundScheduler(jobstores={"default": SQLAlchemyJobStore(engine=engine)})
+    scheduler.start(paused=True)
+    monkeypatch.setattr("core.tasks.scheduler", scheduler)
+    monkeypatch.setattr("core.recovery.scheduler", scheduler)
+    redis_client.delete(RECONCILED_AT_KEY)
+
+    yield scheduler
+
+    scheduler.remove_all_jobs()
+    scheduler.shutdown(wait=False)
+    redis_client.delete(RECONCILED_AT_KEY)
+
+
+@pytest.fixture
+def recovered(monkeypatch):
+    recovered = []
+
+    def tracking_add_task_job(task, trigger):
+        recovered.append(task.slug)
+        return add_task_job(task, trigger)
+
+    monkeypatch.setattr("core.recovery.add_task_job", tracking_add_task_job)
+    return recovered
+
+
+def _create_task(db, name):
+    task = ScheduledTask(name=name, cron_expression="*/5 * * * *")
+    db.add(task)
+    db.commit()
+    return task
+
+
+def test_reconcile_only_applies_the_diff(db, persistent_scheduler, recovered, monkeypatch):
+    monkeypatch.setattr("core.recovery.RECONCILE_MARGIN", timedelta(0))
+    unchanged, changed, deleted = (_create_task(db, name) for name in ("unchanged", "changed", "deleted"))
+    reconcile_scheduled_tasks()
+    assert {unchanged.slug, changed.slug, deleted.slug} <= set(recovered)
+    recovered.clear()
+
+    changed.cron_expression = "0 * * * *"
+    changed.config_changed_at = utc_now()
+    db.delete(deleted)
+    db.commit()
+    added = _create_task(db, "added")
+
+    reconcile_scheduled_tasks()
+
+    assert sorted(recovered) == sorted([changed.slug, added.slug])
+    assert persistent_scheduler.get_job(deleted.slug) is None
+    trigger = persistent_scheduler.get_job(changed.slug).trigger
+    assert {field.name: str(field) for field in trigger.fields}["minute"] == "0"
+
+
+def test_reconcile_skips_tasks_that_only_fired(db, persistent_scheduler, recovered, monkeypatch):
+    monkeypatch.setattr("core.recovery.RECONCILE_MARGIN", timedelta(0))
+    task = _create_task(db, "fired")
+    reconcile_scheduled_tasks()
+    recovered.clear()
+
+    # A fire's result is flushed with the task's next run, which bumps `updated_at`
+    sink = ResultSink(flush_size=10, flush_interval=60, max_size=100)
+    sink.add(task.scheduled_task_id, ResultStatus.Done, "ok", next_run_at=utc_now() + timedelta(minutes=5))
+    sink.close()
+    db.refresh(task)
+    assert task.updated_at > task.config_changed_at
+
+    reconcile_scheduled_tasks()
+
+    assert recovered == []
+    assert persistent_scheduler.get_job(task.slug) is not None
+
+
+def test_jobs_survive_a_scheduler_restart(db, persistent_scheduler, recovered):
+    task = _create_task(db, "persisted")
+    reconcile_scheduled_tasks()
+
+    restarted = BackgroundScheduler(jobstores={"default": SQLAlchemyJobStore(engine=engine)})
+    restarted.start(paused=True)
+    try:
+        assert restarted.get_job(task.slug) is not None
+    finally:
+        restarted.shutdown(wait=False)
+
+
+def test_persistent_store_is_used_when_configured(monkeypatch):
+    monkeypatch.setattr(settings, "scheduler_job_store", JobStoreType.SQLAlchemy)
+    assert isinstance(create_job_store(), SQLAlchemyJobStore)
+
+
+def test_persistent_store_requires_a_single_replica():
+    options = {"scheduler_job_store": JobStoreType.SQLAlchemy}
+    assert Settings(**options, single_replica=True).single_replica
+
+    with pytest.raises(ValidationError, match="SINGLE_REPLICA"):
+        Settings(**options)
+    with pytest.raises(ValidationError, match="SHARDING_ENABLED"):
+        Settings(**options, single_replica=True, sharding_enabled=True)
+    # The compact engine keeps jobs in memory whatever the store setting
+    assert Settings(**options, scheduler_engine=SchedulerEngine.Compact)
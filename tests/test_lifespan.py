@@ -33,3 +33,46 @@ def test_lifespan_triggers_recovery(recovery_patch):
         pass
 
     assert recovery_patch.get("was_called") is True
+
+
+def test_lifespan_recovers_in_background(monkeypatch):
+    import threading
+
+    from job_scheduler.main import app
+
+    recovered = threading.Event()
+    threads = []
+
+    def mock_recover():
+        threads.append(threading.current_thread().name)
+        recovered.set()
+
+    monkeypatch.setattr("job_scheduler.main.recover_scheduled_tasks", mock_recover)
+    monkeypatch.setattr("job_scheduler.main.settings.recovery_in_background", True)
+    # The scheduler is shared by the other tests
+    monkeypatch.setattr("job_scheduler.main.stop_scheduler", lambda: None)
+    monkeypatch.setattr("job_scheduler.main.fire_dispatcher.close", lambda: None)
+
+    with TestClient(app) as client:
+        assert client.get("/health").status_code == 200
+        assert recovered.wait(timeout=5)
+
+    assert threads == ["task-recovery"]
+
+
+def test_shutdown_stops_the_scheduler_before_closing_the_result_sink(monkeypatch):
+    from job_scheduler.main import app
+
+    stopped = []
+    monkeypatch.setattr("job_scheduler.main.recover_scheduled_tasks", lambda: None)
+    monkeypatch.setattr("job_scheduler.main.catch_up_missed_fires", lambda: None)
+    monkeypatch.setattr("job_scheduler.main.stop_scheduler", lambda: stopped.append("scheduler"))
+    monkeypatch.setattr("job_scheduler.main.fire_dispatcher.close", lambda: stopped.append("fire_dispatcher"))
+    monkeypatch.setattr("job_scheduler.main.handler_pool.stop", lambda: stopped.append("handler_pool"))
+    monkeypatch.setattr("job_scheduler.main.result_sink.close", lambda: stopped.append("result_sink"))
+
+    with TestClient(app):
+        pass
+
+    # Fires finishing during the scheduler's shutdown still have their handler workers and their results flushed
+    assert stopped == ["scheduler", "fire_dispatcher", "handler_pool", "result_sink"]
@@ -0,0 +1,64 @@
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from redis import RedisError
+
+from core.models import ScheduledTask
+from core.tasks import run_task
+from job_scheduler.main import app
+
+client = TestClient(app)
+
+
+def _sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+def _create_task(db):
+    task = ScheduledTask(name="measured task", cron_expression="*/5 * * * *")
+    db.add(task)
+    db.commit()
+    return task
+
+
+def test_metrics_endpoint_exports_scheduler_metrics():
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    for name in ("scheduler_fire_lag_seconds", "scheduler_executor_queued", "db_pool_checkout_seconds"):
+        assert name in response.text
+
+
+def test_run_task_counts_claim_outcomes(db):
+    task = _create_task(db)
+    acquired = _sample("scheduler_claims_total", outcome="acquired")
+    contended = _sample("scheduler_claims_total", outcome="contended")
+    fires = _sample("scheduler_fire_lag_seconds_count")
+
+    run_task(task.slug)
+    run_task(task.slug)
+
+    assert _sample("scheduler_claims_total", outcome="acquired") == acquired + 1
+    assert _sample("scheduler_claims_total", outcome="contended") == contended + 1
+    assert _sample("scheduler_fire_lag_seconds_count") == fires + 2
+
+
+def test_run_task_counts_failed_claims(db, monkeypatch):
+    task = _create_task(db)
+    failed = _sample("scheduler_claims_total", outcome="failed")
+
+    def failing_claim(key):
+        raise RedisError("down")
+
+    monkeypatch.setattr("core.tasks.claim_batcher.claim", failing_claim)
+    run_task(task.slug)
+
+    assert _sample("scheduler_claims_total", outcome="failed") == failed + 1
+
+
+def test_api_latency_is_recorded_per_route_template():
+    labels = {"method": "GET", "route": "/tasks/{task_slug}/results", "status": "404"}
+    before = _sample("http_request_duration_seconds_count", **labels)
+
+    client.get("/tasks/unknown-slug/results")
+
+    assert _sample("http_request_duration_seconds_count", **labels) == before + 1
@@ -0,0 +1,52 @@
+from sqlalchemy import create_engine, inspect, select, text
+from sqlalchemy.orm import Session
+
+from core.migrations import migrate_schema
+from core.models import Base, ScheduledTask
+
+# The tables as the first release created them
+FIRST_RELEASE_SCHEMA = [
+    """
+    CREATE TABLE scheduled_tasks (
+        scheduled_task_id CHAR(32) PRIMARY KEY,
+        slug VARCHAR UNIQUE,
+        name VARCHAR NOT NULL,
+        created_at DATETIME,
+        cron_expression VARCHAR NOT NULL,
+        next_run_at DATETIME
+    )
+    """,
+    """
+    CREATE TABLE executed_tasks (
+        executed_task_id CHAR(32) PRIMARY KEY,
+        task_id CHAR(32) REFERENCES scheduled_tasks (scheduled_task_id),
+        executed_at DATETIME,
+        status VARCHAR NOT NULL,
+        result VARCHAR NOT NULL
+    )
+    """,
+    """
+    INSERT INTO scheduled_tasks (scheduled_task_id, slug, name, created_at, cron_expression)
+    VALUES ('0123456789abcdef0123456789abcdef', 'old-task', 'Old task', '2025-07-01 00:00:00', '*/5 * * * *')
+    """,
+]
+
+
+def test_existing_tables_get_the_new_columns(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    with engine.begin() as connection:
+        for statement in FIRST_RELEASE_SCHEMA:
+            connection.execute(text(statement))
+
+    migrate_schema(engine)
+    # A second run finds nothing left to add
+    migrate_schema(engine)
+
+    for table in Base.metadata.sorted_tables:
+        assert {column["name"] for column in inspect(engine).get_columns(table.name)} == set(table.c.keys())
+    # The models read the migrated rows, with the defaults of the added columns
+    with Session(engine) as db:
+        task = db.scalars(select(ScheduledTask)).one()
+        assert task.slug == "old-task"
+        assert task.paused is False
+    engine.dispose()
@@ -0,0 +1,62 @@
+from fastapi.testclient import TestClient
+
+from core.models import ScheduledTask
+from core.tasks import scheduler
+from job_scheduler.main import app
+
+client = TestClient(app)
+
+
+def test_create_task_batch_works(db):
+    response = client.post(
+        "/tasks:batch",
+        json={"tasks": [{"name": f"Batch Task {i}", "cron_expression": "*/5 * * * *"} for i in range(20)]},
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["errors"] == []
+    assert len(data["created"]) == 20
+    assert all(task["next_run_at"] for task in data["created"])
+
+    slugs = [task["slug"] for task in data["created"]]
+    assert db.query(ScheduledTask).filter(ScheduledTask.slug.in_(slugs)).count() == 20
+    assert all(scheduler.get_job(task["slug"]) for task in data["created"])
+
+
+def test_create_task_batch_reports_invalid_items(db):
+    response = client.post(
+        "/tasks:batch",
+        json={
+            "tasks": [
+                {"name": "Good Task", "cron_expression": "*/5 * * * *"},
+                {"name": "Bad Cron", "cron_expression": "*/5 harry potter *"},
+                {"cron_expression": "*/5 * * * *"},
+            ]
+        },
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert [task["name"] for task in data["created"]] == ["Good Task"]
+    assert [error["index"] for error in data["errors"]] == [1, 2]
+    assert "Invalid cron expression" in data["errors"][0]["errors"][0]
+
+    assert db.query(ScheduledTask).filter(ScheduledTask.name.in_(["Good Task", "Bad Cron"])).count() == 1
+
+
+def test_create_task_batch_rolls_back_on_failure(db, monkeypatch):
+    def broken_schedule_tasks(tasks):
+        raise Exception("Simulated schedule_tasks failure")
+
+    monkeypatch.setattr("core.services.schedule_tasks", broken_schedule_tasks)
+
+    response = client.post(
+        "/tasks:batch", json={"tasks": [{"name": "Rolled Back Task", "cron_expression": "*/5 * * * *"}]}
+    )
+    assert response.status_code == 500
+    assert response.json()["detail"]["error_code"] == "TASK_CREATE_500"
+    assert db.query(ScheduledTask).filter(ScheduledTask.name == "Rolled Back Task").count() == 0
+
+
+def test_create_task_batch_rejects_empty_batch():
+    response = client.post("/tasks:batch", json={"tasks": []})
+    assert response.status_code == 422
@@ -14,30 +14,118 @@ def test_recovery_works(monkeypatch, db):
     _create_tasks(db)
     called = []
 
-    def fake_schedule(task):
+    def fake_add_task_job(task, trigger):
         called.append(task.name)
 
-    monkeypatch.setattr("core.recovery.schedule_task", fake_schedule)
+    monkeypatch.setattr("core.recovery.add_task_job", fake_add_task_job)
     recover_scheduled_tasks()
     assert "task 1" in called
     assert "task 2" in called
 
 
+def test_recovery_streams_in_chunks(monkeypatch, db):
+    db.add_all([ScheduledTask(name=f"chunked task {i}", cron_expression="*/5 * * * *") for i in range(7)])
+    db.commit()
+    called = []
+
+    def fake_add_task_job(task, trigger):
+        called.append(task.name)
+
+    monkeypatch.setattr("core.recovery.settings.recovery_chunk_size", 2)
+    monkeypatch.setattr("core.recovery.add_task_job", fake_add_task_job)
+    recover_scheduled_tasks()
+    assert sorted(called) == sorted(f"chunked task {i}" for i in range(7))
+
+
 def test_scheduler_failure_does_not_crash(monkeypatch, db):
     _create_tasks(db)
     called = []
 
-    def fake_schedule(task):
+    def fake_add_task_job(task, trigger):
         called.append(task.name)
         raise Exception("fail")
 
-    monkeypatch.setattr("core.recovery.schedule_task", fake_schedule)
+    monkeypatch.setattr("core.recovery.add_task_job", fake_add_task_job)
     recover_scheduled_tasks()
     assert "task 1" in called
     assert "task 2" in called
 
 
 def test_no_tasks_does_nothing(monkeypatch, db):
-    monkeypatch.setattr("core.recovery.schedule_task", lambda t: None)
+    monkeypatch.setattr("core.recovery.add_task_job", lambda task, trigger: None)
     recover_scheduled_tasks()
     assert db.query(ScheduledTask).count() == 0
+
+
+def test_rebalance_releases_and_takes_over_tasks(monkeypatch, db):
+    from core.recovery import rebalance_scheduled_tasks
+    from core.tasks import scheduler
+
+    task1, task2 = _create_tasks(db)
+    scheduler.add_job(lambda: None, trigger="interval", minutes=5, id=task1.slug)
+
+    class OwnsTask2:
+        def owns(self, task_slug):
+            return task_slug == task2.slug
+
+    monkeypatch.setattr("core.recovery.replica_membership", OwnsTask2())
+    added = []
+    monkeypatch.setattr("core.recovery.add_task_job", lambda task, trigger: added.append(task.slug))
+
+    rebalance_scheduled_tasks()
+
+    assert scheduler.get_job(task1.slug) is None
+    assert added == [task2.slug]
+
+
+def test_task_sync_removes_jobs_missing_on_two_syncs(monkeypatch, db):
+    from core.recovery import OwnedTaskSync
+    from core.tasks import scheduler
+
+    task1, _ = _create_tasks(db)
+    scheduler.add_job(lambda: None, trigger="interval", minutes=5, id=task1.slug)
+    scheduler.add_job(lambda: None, trigger="interval", minutes=5, id="deleted-task")
+    monkeypatch.setattr("core.recovery.add_task_job", lambda task, trigger: None)
+    sync = OwnedTaskSync()
+
+    # A single miss may be a task whose creation has not committed yet
+    sync.sync()
+    assert scheduler.get_job("deleted-task") is not None
+
+    sync.sync()
+    assert scheduler.get_job("deleted-task") is None
+    assert scheduler.get_job(task1.slug) is not None
+    scheduler.remove_job(task1.slug)
+
+
+def test_task_sync_readds_tasks_changed_since_last_sync(monkeypatch, db):
+    from datetime import timedelta
+
+    from sqlalchemy import update
+
+    from core.models import utc_now
+    from core.recovery import OwnedTaskSync
+    from core.results import ResultSink
+    from core.schemas import TaskSelection
+    from core.services import pause_tasks
+    from job_scheduler.constants import ResultStatus
+
+    task1, task2 = _create_tasks(db)
+    db.execute(update(ScheduledTask).values(config_changed_at=utc_now() - timedelta(hours=1)))
+    db.commit()
+    added = []
+    monkeypatch.setattr("core.recovery.add_task_job", lambda task, trigger: added.append(task.slug))
+    monkeypatch.setattr("core.services.pause_task_jobs", lambda task_slugs: None)
+    sync = OwnedTaskSync()
+
+    sync.sync()
+    assert added == []
+
+    # A fire writes the task's next run, which is not a change to apply
+    sink = ResultSink(flush_size=10, flush_interval=60, max_size=100)
+    sink.add(task1.scheduled_task_id, ResultStatus.Done, "ok", next_run_at=utc_now() + timedelta(minutes=2))
+    sink.close()
+    # A pause whose event never reached the owner
+    pause_tasks(db, TaskSelection(slugs=[task2.slug]))
+    sync.sync()
+    assert added == [task2.slug]
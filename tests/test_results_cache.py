@@ -0,0 +1,61 @@
+from datetime import datetime
+from uuid import uuid4
+
+from fastapi.testclient import TestClient
+
+from core.models import ExecutedTask
+from core.pagination import encode_cursor
+from core.results import result_sink
+from core.tasks import run_task
+from job_scheduler.config import settings
+from job_scheduler.constants import ResultStatus
+from job_scheduler.main import app
+
+client = TestClient(app)
+
+
+def _create_task():
+    return client.post("/tasks", json={"name": "Polled Task", "cron_expression": "*/5 * * * *"}).json()["slug"]
+
+
+def test_polled_page_is_served_from_cache(db, monkeypatch):
+    slug = _create_task()
+    first = client.get(f"/tasks/{slug}/results").json()
+
+    monkeypatch.setattr("core.services.paginate", lambda *args, **kwargs: (_ for _ in ()).throw(AssertionError))
+    assert client.get(f"/tasks/{slug}/results").json() == first
+
+
+def test_new_result_invalidates_cached_pages(db):
+    slug = _create_task()
+    assert client.get(f"/tasks/{slug}/results").json()["count"] == 0
+
+    run_task(slug)
+    result_sink.flush()
+
+    page = client.get(f"/tasks/{slug}/results").json()
+    assert page["count"] == 1
+    assert page["result"][0]["status"] == ResultStatus.Done
+    db.query(ExecutedTask).delete()
+
+
+def test_deleted_task_is_not_served_from_cache(db):
+    slug = _create_task()
+    client.get(f"/tasks/{slug}/results")
+
+    client.delete(f"/tasks/{slug}")
+
+    assert client.get(f"/tasks/{slug}/results").status_code == 404
+
+
+def test_cursor_and_deep_pages_are_not_cached(db, monkeypatch):
+    slug = _create_task()
+    calls = []
+    monkeypatch.setattr("core.services.store_page", lambda *args: calls.append(args))
+
+    client.get(f"/tasks/{slug}/results?skip={settings.results_cache_max_skip}")
+    client.get(f"/tasks/{slug}/results", params={"after": encode_cursor(datetime(2025, 1, 1), uuid4())})
+    assert calls == []
+
+    client.get(f"/tasks/{slug}/results")
+    assert len(calls) == 1
@@ -0,0 +1,105 @@
+from datetime import datetime
+
+import pytest
+
+from core.models import ExecutedTask, ScheduledTask
+from core.results import ResultSink
+from job_scheduler.constants import ResultStatus
+
+
+@pytest.fixture
+def sink():
+    sink = ResultSink(flush_size=3, flush_interval=60, max_size=5)
+    yield sink
+    sink.close()
+
+
+def _create_task(db):
+    task = ScheduledTask(name="sink task", cron_expression="*/5 * * * *")
+    db.add(task)
+    db.commit()
+    return task
+
+
+def test_flush_writes_results_and_next_run(db, sink):
+    task = _create_task(db)
+    next_run_at = datetime(2030, 1, 1, 12, 0)
+
+    sink.add(task.scheduled_task_id, ResultStatus.Done, "first")
+    sink.add(task.scheduled_task_id, ResultStatus.Failed, "second", next_run_at=next_run_at)
+    assert task.results.count() == 0
+
+    sink.flush()
+    db.refresh(task)
+
+    assert [result.result for result in task.results.order_by(ExecutedTask.executed_at)] == ["first", "second"]
+    assert task.next_run_at == next_run_at
+
+
+def test_full_buffer_is_flushed_in_background(db, sink):
+    task = _create_task(db)
+
+    for i in range(3):
+        sink.add(task.scheduled_task_id, ResultStatus.Done, f"result-{i}")
+
+    sink._stopped.set()
+    sink._wakeup.set()
+    sink._thread.join(timeout=5)
+
+    assert task.results.count() == 3
+
+
+def test_close_flushes_pending_results(db, sink):
+    task = _create_task(db)
+    sink.add(task.scheduled_task_id, ResultStatus.Done, "pending")
+
+    sink.close()
+
+    assert task.results.count() == 1
+
+
+def test_failed_flush_keeps_results(db, sink, monkeypatch):
+    task = _create_task(db)
+    sink.add(task.scheduled_task_id, ResultStatus.Done, "retried")
+
+    def broken_write(results, next_runs):
+        raise Exception("Simulated database outage")
+
+    monkeypatch.setattr(sink, "_write", broken_write)
+    sink.flush()
+    monkeypatch.undo()
+
+    sink.flush()
+    assert task.results.count() == 1
+
+
+def test_full_buffer_drops_the_oldest_results(db, sink, monkeypatch):
+    task = _create_task(db)
+
+    def broken_write(results, next_runs):
+        raise Exception("Simulated database outage")
+
+    monkeypatch.setattr(sink, "_write", broken_write)
+    # Flushes only happen when the test asks for them
+    monkeypatch.setattr(sink, "_start", lambda: None)
+
+    for i in range(4):
+        sink.add(task.scheduled_task_id, ResultStatus.Done, f"result-{i}")
+    sink.flush()
+    for i in range(4, 7):
+        sink.add(task.scheduled_task_id, ResultStatus.Done, f"result-{i}")
+    monkeypatch.undo()
+
+    sink.flush()
+    assert [result.result for result in task.results.order_by(ExecutedTask.executed_at)] == [
+        f"result-{i}" for i in range(2, 7)
+    ]
+
+
+def test_closed_sink_writes_late_results_directly(db, sink):
+    task = _create_task(db)
+    sink.close()
+
+    sink.add(task.scheduled_task_id, ResultStatus.Done, "late")
+    assert sink._thread is None
+    assert task.results.count() == 1
@@ -0,0 +1,126 @@
+from datetime import date, datetime
+
+import pytest
+from fastapi.testclient import TestClient
+from freezegun import freeze_time
+
+from core.maintenance import (
+    COUNTER_RECONCILIATION_JOB_ID,
+    RESULT_MAINTENANCE_JOB_ID,
+    schedule_internal_jobs,
+)
+from core.models import ExecutedTask, ExecutedTaskRollup, ScheduledTask
+from core.recovery import rebalance_scheduled_tasks
+from core.retention import expire_results, rollup_results
+from core.tasks import scheduler
+from job_scheduler.config import settings
+from job_scheduler.constants import ResultStatus
+from job_scheduler.main import app
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def history(db):
+    db.query(ExecutedTask).delete()
+    db.query(ExecutedTaskRollup).delete()
+    task = ScheduledTask(name="retention task", cron_expression="0 * * * *")
+    db.add(task)
+    db.commit()
+
+    for executed_at, status in [
+        (datetime(2030, 1, 1, 10), ResultStatus.Done),
+        (datetime(2030, 1, 1, 11), ResultStatus.Done),
+        (datetime(2030, 1, 1, 12), ResultStatus.Failed),
+        (datetime(2030, 1, 2, 10), ResultStatus.Done),
+        (datetime(2030, 1, 3, 10), ResultStatus.Done),
+    ]:
+        db.add(ExecutedTask(task_id=task.scheduled_task_id, executed_at=executed_at, status=status, result="ok"))
+    db.commit()
+
+    yield task
+    db.query(ExecutedTask).delete()
+    db.query(ExecutedTaskRollup).delete()
+
+
+def _rollups(db, task):
+    return {
+        (rollup.day, rollup.status): rollup.count
+        for rollup in db.query(ExecutedTaskRollup).filter(ExecutedTaskRollup.task_id == task.scheduled_task_id)
+    }
+
+
+def test_rollup_summarizes_finished_days(db, history):
+    rollup_results(db, date(2030, 1, 3))
+
+    assert _rollups(db, history) == {
+        (date(2030, 1, 1), ResultStatus.Done): 2,
+        (date(2030, 1, 1), ResultStatus.Failed): 1,
+        (date(2030, 1, 2), ResultStatus.Done): 1,
+    }
+
+
+def test_expired_results_are_removed_but_kept_in_rollups(db, history, monkeypatch):
+    monkeypatch.setattr(settings, "result_retention_days", 1)
+
+    rollup_results(db, date(2030, 1, 3))
+    expire_results(db, date(2030, 1, 3))
+
+    assert [result.executed_at.date() for result in history.results] == [date(2030, 1, 2), date(2030, 1, 3)]
+    assert _rollups(db, history)[(date(2030, 1, 1), ResultStatus.Done)] == 2
+
+
+def test_task_retention_shorter_than_global(db, history):
+    history.retention_days = 1
+    db.commit()
+
+    expire_results(db, date(2030, 1, 3))
+
+    assert [result.executed_at.date() for result in history.results] == [date(2030, 1, 2), date(2030, 1, 3)]
+
+
+def test_task_retention_expiry_is_capped_per_run(db, history, monkeypatch):
+    history.retention_days = 1
+    db.commit()
+    monkeypatch.setattr(settings, "result_expiry_batch_size", 1)
+    monkeypatch.setattr(settings, "result_expiry_max_rows", 2)
+
+    expire_results(db, date(2030, 1, 3))
+    # The oldest results go first, the rest waits for the next run
+    assert [result.executed_at for result in history.results] == [
+        datetime(2030, 1, 1, 12),
+        datetime(2030, 1, 2, 10),
+        datetime(2030, 1, 3, 10),
+    ]
+
+    expire_results(db, date(2030, 1, 3))
+    db.expire_all()
+    assert [result.executed_at.date() for result in history.results] == [date(2030, 1, 2), date(2030, 1, 3)]
+
+
+def test_daily_results_combine_rollups_and_live_results(db, history):
+    rollup_results(db, date(2030, 1, 3))
+
+    with freeze_time("2030-01-03 12:00:00"):
+        response = client.get(f"/tasks/{history.slug}/results/daily", params={"days": 2})
+
+    assert response.status_code == 200
+    assert [(item["day"], item["status"], item["count"]) for item in response.json()] == [
+        ("2030-01-02", ResultStatus.Done, 1),
+        ("2030-01-03", ResultStatus.Done, 1),
+    ]
+
+
+def test_daily_results_unknown_task():
+    response = client.get("/tasks/unknown/results/daily")
+    assert response.status_code == 404
+
+
+def test_rebalance_keeps_maintenance_job():
+    schedule_internal_jobs()
+
+    rebalance_scheduled_tasks()
+
+    assert scheduler.get_job(RESULT_MAINTENANCE_JOB_ID) is not None
+    for job_id in (RESULT_MAINTENANCE_JOB_ID, COUNTER_RECONCILIATION_JOB_ID):
+        scheduler.remove_job(job_id)
@@ -0,0 +1,95 @@
+from fastapi.testclient import TestClient
+
+from core.models import ScheduledTask
+from core.tasks import create_scheduler, remove_task, schedule_task, scheduler
+from job_scheduler.main import app
+
+client = TestClient(app)
+
+
+def test_scheduler_uses_configured_defaults(monkeypatch):
+    monkeypatch.setattr("core.tasks.settings.scheduler_max_workers", 3)
+    monkeypatch.setattr("core.tasks.settings.scheduler_coalesce", False)
+    monkeypatch.setattr("core.tasks.settings.scheduler_misfire_grace_time", 15)
+
+    configured = create_scheduler()
+
+    assert configured._lookup_executor("default")._pool._max_workers == 3
+    assert configured._job_defaults["coalesce"] is False
+    assert configured._job_defaults["misfire_grace_time"] == 15
+
+
+def test_task_options_override_job_defaults():
+    task = ScheduledTask(
+        slug="options-task",
+        name="options",
+        cron_expression="*/5 * * * *",
+        max_instances=4,
+        coalesce=False,
+        misfire_grace_time=120,
+    )
+    schedule_task(task)
+
+    job = scheduler.get_job("options-task")
+    assert job.max_instances == 4
+    assert job.coalesce is False
+    assert job.misfire_grace_time == 120
+    remove_task("options-task")
+
+
+def test_unset_task_options_use_defaults():
+    task = ScheduledTask(slug="default-options-task", name="defaults", cron_expression="*/5 * * * *")
+    schedule_task(task)
+
+    job = scheduler.get_job("default-options-task")
+    assert job.max_instances == scheduler._job_defaults["max_instances"]
+    assert job.misfire_grace_time == scheduler._job_defaults["misfire_grace_time"]
+    remove_task("default-options-task")
+
+
+def test_create_task_with_options(db):
+    response = client.post(
+        "/tasks",
+        json={"name": "Options Task", "cron_expression": "*/5 * * * *", "max_instances": 2, "misfire_grace_time": 30},
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["max_instances"] == 2
+    assert data["misfire_grace_time"] == 30
+    assert data["coalesce"] is None
+
+
+def test_create_task_rejects_invalid_options():
+    response = client.post("/tasks", json={"name": "Bad", "cron_expression": "*/5 * * * *", "max_instances": 0})
+    assert response.status_code == 422
+
+
+def test_scheduler_stats():
+    response = client.get("/scheduler/stats")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["executor"]["executor"] == "threadpool"
+    assert data["executor"]["queued"] >= 0
+    assert {"hits", "misses", "size", "max_size"} <= data["cron_cache"].keys()
+    assert data["dispatch"]["max_concurrency"] >= 1
+    assert data["dispatch"]["queued"] == {"high": 0, "normal": 0, "low": 0}
+
+
+def test_asyncio_scheduler_runs_on_app_loop(monkeypatch):
+    import asyncio
+
+    from apscheduler.schedulers.asyncio import AsyncIOScheduler
+
+    from job_scheduler.constants import SchedulerType
+
+    monkeypatch.setattr("core.tasks.settings.scheduler_type", SchedulerType.AsyncIO)
+    configured = create_scheduler()
+    assert isinstance(configured, AsyncIOScheduler)
+
+    async def start_on_loop():
+        configured.start()
+        assert configured._eventloop is asyncio.get_running_loop()
+        configured.shutdown(wait=False)
+        await asyncio.sleep(0)
+
+    asyncio.run(start_on_loop())
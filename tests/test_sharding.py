@@ -0,0 +1,103 @@
+import time
+
+import pytest
+
+from core.sharding import HashRing, ReplicaMembership
+from core.tasks import handle_task_event, remove_task, schedule_task, scheduler
+from job_scheduler.redis_client import redis_client
+
+TEST_REPLICAS_KEY = "test:scheduler:replicas"
+
+
+@pytest.fixture
+def replicas_key():
+    redis_client.delete(TEST_REPLICAS_KEY)
+    yield TEST_REPLICAS_KEY
+    redis_client.delete(TEST_REPLICAS_KEY)
+
+
+def _membership(replica_id, key):
+    return ReplicaMembership(
+        replica_id=replica_id, enabled=True, heartbeat_interval=1, lease_ttl=30, vnodes=64, key=key
+    )
+
+
+def test_hash_ring_moves_few_keys_when_node_joins():
+    keys = [f"task-{i}" for i in range(2000)]
+    before = HashRing(["a", "b", "c"], vnodes=64)
+    after = HashRing(["a", "b", "c", "d"], vnodes=64)
+
+    moved = [key for key in keys if before.get_node(key) != after.get_node(key)]
+
+    assert all(after.get_node(key) == "d" for key in moved)
+    assert len(moved) < len(keys) / 2
+    assert {before.get_node(key) for key in keys} == {"a", "b", "c"}
+
+
+def test_replicas_split_ownership(replicas_key):
+    first = _membership("replica-1", replicas_key)
+    second = _membership("replica-2", replicas_key)
+
+    first.heartbeat()
+    second.heartbeat()
+    assert first.heartbeat() is True
+
+    slugs = [f"task-{i}" for i in range(200)]
+    for slug in slugs:
+        assert first.owns(slug) != second.owns(slug)
+    assert any(first.owns(slug) for slug in slugs)
+    assert any(second.owns(slug) for slug in slugs)
+
+
+def test_expired_replica_leaves_ring(replicas_key):
+    first = _membership("replica-1", replicas_key)
+    redis_client.zadd(replicas_key, {"replica-gone": time.time() - 1})
+
+    first.heartbeat()
+
+    assert first.ring.nodes == {"replica-1"}
+    assert all(first.owns(f"task-{i}") for i in range(50))
+
+
+def test_disabled_membership_owns_everything():
+    membership = ReplicaMembership(replica_id="solo", enabled=False, heartbeat_interval=1, lease_ttl=1, vnodes=8)
+    assert membership.owns("any-task")
+
+
+def test_task_owned_by_other_replica_is_forwarded(monkeypatch):
+    published = []
+
+    class NotOwner:
+        def owns(self, task_slug):
+            return False
+
+        def publish(self, action, **payload):
+            published.append((action, payload))
+
+    monkeypatch.setattr("core.tasks.replica_membership", NotOwner())
+
+    from core.models import ScheduledTask
+
+    task = ScheduledTask(slug="forwarded-task", name="forwarded", cron_expression="*/5 * * * *")
+    schedule_task(task)
+    remove_task(task.slug)
+
+    assert scheduler.get_job("forwarded-task") is None
+    assert task.next_run_at is not None
+    assert [action for action, _ in published] == ["schedule", "remove"]
+    assert published[0][1]["tasks"][0]["slug"] == "forwarded-task"
+    assert published[0][1]["tasks"][0]["cron_expression"] == "*/5 * * * *"
+    assert published[1][1] == {"slugs": ["forwarded-task"]}
+
+
+def test_task_events_are_applied_by_owner():
+    handle_task_event({"action": "schedule", "tasks": [{"slug": "event-task", "cron_expression": "*/5 * * * *"}]})
+    assert scheduler.get_job("event-task") is not None
+
+    handle_task_event({"action": "pause", "slugs": ["event-task"]})
+    assert scheduler.get_job("event-task").next_run_time is None
+    handle_task_event({"action": "resume", "slugs": ["event-task"]})
+    assert scheduler.get_job("event-task").next_run_time is not None
+
+    handle_task_event({"action": "remove", "slugs": ["event-task"]})
+    assert scheduler.get_job("event-task") is None
@@ -0,0 +1,71 @@
+from uuid import uuid4
+
+from fastapi.testclient import TestClient
+
+from core.models import ScheduledTask
+from core.results import result_sink
+from core.slug_cache import SlugCache, slug_cache
+from core.tasks import get_task_next_run_at, run_task, scheduler
+from job_scheduler.main import app
+
+client = TestClient(app)
+
+
+def test_least_recently_used_slug_is_evicted():
+    cache = SlugCache(max_size=2, ttl=60)
+    first, second, third = uuid4(), uuid4(), uuid4()
+    cache.set("first", first)
+    cache.set("second", second)
+    assert cache.get("first") == first
+
+    cache.set("third", third)
+
+    assert cache.get("second") is None
+    assert cache.get("first") == first
+    assert cache.get("third") == third
+
+
+def test_expired_slug_is_resolved_again():
+    cache = SlugCache(max_size=10, ttl=-1)
+    cache.set("expired", uuid4())
+
+    assert cache.get("expired") is None
+
+
+def test_results_listing_resolves_slug_once(db, monkeypatch):
+    slug = client.post("/tasks", json={"name": "Cached Slug", "cron_expression": "*/5 * * * *"}).json()["slug"]
+    monkeypatch.setattr("job_scheduler.config.settings.results_cache_ttl", 0)
+    assert client.get(f"/tasks/{slug}/results").status_code == 200
+    task_id = slug_cache.get(slug)
+    assert task_id is not None
+
+    # Renaming the row behind the cache's back proves the second listing does not look the slug up again
+    db.query(ScheduledTask).filter(ScheduledTask.slug == slug).update({"slug": "renamed"})
+    db.commit()
+
+    assert client.get(f"/tasks/{slug}/results").status_code == 200
+
+
+def test_deleted_task_slug_is_invalidated(db):
+    slug = client.post("/tasks", json={"name": "Deleted Slug", "cron_expression": "*/5 * * * *"}).json()["slug"]
+    client.get(f"/tasks/{slug}/results")
+    assert slug_cache.get(slug) is not None
+
+    client.delete(f"/tasks/{slug}")
+
+    assert slug_cache.get(slug) is None
+    assert client.get(f"/tasks/{slug}/results").status_code == 404
+
+
+def test_job_runs_task_by_id(db):
+    slug = client.post("/tasks", json={"name": "By Id", "cron_expression": "*/5 * * * *"}).json()["slug"]
+    task = db.query(ScheduledTask).filter(ScheduledTask.slug == slug).first()
+    assert scheduler.get_job(slug).args == (slug, task.scheduled_task_id, "normal")
+
+    task.next_run_at = get_task_next_run_at(task)
+    db.commit()
+    # The id alone locates the task, so a stale slug in the job args does not matter
+    run_task(f"stale-{uuid4()}", task.scheduled_task_id)
+    result_sink.flush()
+    db.refresh(task)
+    assert task.results.count() == 1
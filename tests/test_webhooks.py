@@ -0,0 +1,190 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from fastapi.testclient import TestClient
+
+from core.handlers import HandlerContext, HandlerError, get_handler
+from core.models import ScheduledTask
+from core.results import result_sink
+from core.tasks import run_task
+from core.webhooks import WebhookClient, WebhookParams
+from job_scheduler.constants import ResultStatus
+from job_scheduler.main import app
+
+client = TestClient(app)
+
+CONTEXT = HandlerContext(task_slug="hook", task_name="Hook")
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    # Keep-alive needs HTTP/1.1
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.server.record(self)
+        if self.path == "/slow":
+            time.sleep(0.2)
+        status = 500 if self.path == "/broken" else 200
+        self.respond(status, "x" * 5000 if self.path == "/large" else "pong")
+
+    def do_POST(self):
+        self.server.record(self)
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        self.respond(201, json.dumps({"body": json.loads(body), "token": self.headers["X-Token"]}))
+
+    def respond(self, status: int, body: str):
+        content = body.encode()
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+        self.server.release()
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), StubHandler)
+        self.lock = threading.Lock()
+        self.client_ports = set()
+        self.active = 0
+        self.max_active = 0
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def record(self, handler: BaseHTTPRequestHandler):
+        with self.lock:
+            self.client_ports.add(handler.client_address[1])
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+
+    def release(self):
+        with self.lock:
+            self.active -= 1
+
+
+@pytest.fixture
+def server():
+    server = StubServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def webhook_client(monkeypatch):
+    webhook_client = WebhookClient(max_connections=10, max_keepalive_connections=5, max_connections_per_host=2)
+    monkeypatch.setattr("core.webhooks.webhook_client", webhook_client)
+    yield webhook_client
+    webhook_client.close()
+
+
+def call(params: dict) -> str:
+    return get_handler("webhook").func(CONTEXT, params)
+
+
+def test_webhook_result_has_status_latency_and_body(server, webhook_client):
+    assert call({"url": f"{server.url}/ping"}).startswith("HTTP 200 in ")
+    assert call({"url": f"{server.url}/ping"}).endswith("ms: pong")
+
+
+def test_webhook_sends_method_headers_and_json_body(server, webhook_client):
+    result = call({"url": server.url, "method": "POST", "headers": {"X-Token": "secret"}, "body": {"state": "done"}})
+
+    assert result.startswith("HTTP 201")
+    assert result.endswith(json.dumps({"body": {"state": "done"}, "token": "secret"}))
+
+
+def test_webhook_body_is_truncated(server, webhook_client):
+    result = call({"url": f"{server.url}/large"})
+
+    assert result.endswith("x" * 1000 + "... (5000 characters)")
+
+
+def test_webhook_error_status_fails(server, webhook_client):
+    with pytest.raises(HandlerError, match="HTTP 500 in .*ms: pong"):
+        call({"url": f"{server.url}/broken"})
+
+
+def test_webhook_unreachable_fails(webhook_client):
+    with pytest.raises(HandlerError, match="ConnectError"):
+        call({"url": "http://127.0.0.1:1/"})
+
+
+def test_webhook_connections_are_reused(server, webhook_client):
+    for _ in range(5):
+        call({"url": f"{server.url}/ping"})
+
+    assert len(server.client_ports) == 1
+
+
+def test_webhook_calls_are_limited_per_host(server, webhook_client):
+    threads = [threading.Thread(target=call, args=({"url": f"{server.url}/slow"},)) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert server.max_active == 2
+
+
+def test_timed_out_webhook_request_is_cancelled(webhook_client, monkeypatch):
+    cancelled = threading.Event()
+
+    async def stuck_request(params, timeout):
+        try:
+            await asyncio.sleep(60)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    monkeypatch.setattr(webhook_client, "_request", stuck_request)
+
+    with pytest.raises(TimeoutError):
+        webhook_client.request(WebhookParams(url="http://127.0.0.1:1/", timeout=0.1))
+    assert cancelled.wait(timeout=5)
+
+
+def test_invalid_webhook_params_are_rejected():
+    res = client.post(
+        "/tasks",
+        json={
+            "name": "Hook",
+            "cron_expression": "* * * * *",
+            "handler": "webhook",
+            "handler_params": {"url": "ftp://example.com", "method": "TRACE"},
+        },
+    )
+    assert res.status_code == 422
+
+
+def test_webhook_task_result_is_recorded(db, server, webhook_client):
+    res = client.post(
+        "/tasks",
+        json={
+            "name": "Hook",
+            "cron_expression": "* * * * *",
+            "handler": "webhook",
+            "handler_params": {"url": f"{server.url}/broken"},
+        },
+    )
+    task = db.query(ScheduledTask).filter(ScheduledTask.slug == res.json()["slug"]).one()
+
+    run_task(task.slug, task.scheduled_task_id)
+    result_sink.flush()
+
+    result = task.results.one()
+    assert result.status == ResultStatus.Failed
+    assert "HTTP 500" in result.result